@@ -0,0 +1,71 @@
+"""Measure how the banded analysis scales with the number of worker threads.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_analysis [rows] [cols] [max_workers]
+
+Every worker count is checked against the single-threaded result before it is timed.
+"""
+import os
+import sys
+import time
+import numpy as np
+from components.ThicknessIndex import ThicknessIndex
+from components.AnalysisContext import AnalysisContext
+from pages.results import ResultAnalyzerFixedRange, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED
+
+
+def synthetic_grid(rows: int, cols: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    grid = rng.normal(8.0, 2.0, size=(rows, cols)).astype(np.float32)
+    grid[rng.random(grid.shape) < 0.05] = np.nan
+    return grid
+
+
+def timed(run, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows: int = 2000, cols: int = 3000, max_workers: int = os.cpu_count() or 1) -> None:
+    grid = synthetic_grid(rows, cols)
+    context = AnalysisContext("mm", 6.0, 10.0, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED)
+    analyzer = ResultAnalyzerFixedRange
+
+    tasks = {
+        "index build": lambda w: ThicknessIndex(grid, workers=w),
+        "statistics": lambda w: analyzer.calculate_statistics(grid, context, workers=w),
+        "zone masks": lambda w: analyzer.calculate_fixed_range_zones(grid, context, workers=w),
+        "critical areas": lambda w: analyzer.find_critical_areas(grid, None, context, workers=w),
+    }
+
+    def comparable(name, result):
+        if name == "index build":
+            return result.values, result.prefix_sum[-1], result.overall_stats['total_valid_cells']
+        if name == "statistics":
+            return [(zone['count'], round(zone['avg_thickness'], 9)) for zone in result[0]]
+        if name == "zone masks":
+            return [zone['mask'] for zone in result[0]]
+        return result
+
+    worker_counts = sorted({1, 2, 4, 8, max_workers} & set(range(1, max_workers + 1)))
+    print(f"{rows}x{cols} grid, {os.cpu_count()} CPUs")
+    print(f"{'task':<16}" + "".join(f"{f'{w} thr':>10}" for w in worker_counts) + f"{'speedup':>10}")
+    for name, task in tasks.items():
+        reference = comparable(name, task(1))
+        times = []
+        for workers in worker_counts:
+            result = comparable(name, task(workers))
+            same = all(np.array_equal(a, b) for a, b in zip(result, reference)) if isinstance(result, (list, tuple)) else result == reference
+            if not same:
+                raise AssertionError(f"{name}: {workers} workers differ from the single-threaded result")
+            times.append(timed(lambda: task(workers)))
+        print(f"{name:<16}" + "".join(f"{t:>9.3f}s" for t in times) + f"{times[0] / min(times):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
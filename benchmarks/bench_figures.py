@@ -0,0 +1,92 @@
+"""Compare figure build time of the graph_objects path against the raw dict path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_figures [rows] [cols]
+
+tests/test_figures.py checks that both paths produce the same figure once serialized, so the
+dict path renders identically in the browser.
+"""
+import sys
+import json
+import time
+import base64
+import numpy as np
+import plotly.io as pio
+from components.Scan import Scan
+from components.Visualizer import Visualizer
+
+
+def synthetic_scan(rows: int, cols: int, seed: int = 0) -> Scan:
+    """A scan with a measured block covering most of the grid and a few blank cells."""
+    rng = np.random.default_rng(seed)
+    measured = rng.normal(10.0, 1.5, size=(rows - rows // 10, cols - cols // 10)).astype(np.float32)
+    measured[rng.random(measured.shape) < 0.02] = np.nan
+    return Scan(measured, (rows, cols))
+
+
+def decode(value):
+    """Turn typed array specs back into plain nested lists so both serializations compare equal."""
+    if isinstance(value, dict):
+        if "bdata" in value and "dtype" in value:
+            array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+            if "shape" in value:
+                array = array.reshape([int(n) for n in value["shape"].split(",")])
+            return array.tolist()
+        return {key: decode(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    return value
+
+
+def serialized(fig) -> dict:
+    return decode(json.loads(pio.to_json(fig, validate=False, engine="json")))
+
+
+# The graph_objects and dict builders of each figure, by case
+FIGURE_PATHS = {
+    "2d quantized": (lambda s: Visualizer.create_2d_figure(s, 12, 6, quantize=True),
+                     lambda s: Visualizer.create_2d_figure_dict(s, 12, 6, quantize=True)),
+    "3d quantized": (lambda s: Visualizer.create_3d_figure(s, 500, 12, 6, quantize=True),
+                     lambda s: Visualizer.create_3d_figure_dict(s, 500, 12, 6, quantize=True)),
+    "2d hover text": (lambda s: Visualizer.create_2d_figure(s, 12, 6),
+                      lambda s: Visualizer.create_2d_figure_dict(s, 12, 6)),
+    "3d hover text": (lambda s: Visualizer.create_3d_figure(s, 500, 12, 6),
+                      lambda s: Visualizer.create_3d_figure_dict(s, 500, 12, 6)),
+}
+
+
+def timed(build, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(rows: int = 800, cols: int = 2500) -> None:
+    # Hover text makes the unquantized paths slow, so they are measured on a smaller grid
+    sizes = {"2d quantized": (rows, cols), "3d quantized": (rows, cols),
+             "2d hover text": (120, 300), "3d hover text": (120, 300)}
+
+    print(f"{'case':<16}{'grid':>12}{'go.Figure':>12}{'dict':>12}{'speedup':>10}")
+    for name, (build_go, build_dict) in FIGURE_PATHS.items():
+        case_rows, case_cols = sizes[name]
+        scan = synthetic_scan(case_rows, case_cols)
+        go_time = timed(lambda: build_go(scan))
+        dict_time = timed(lambda: build_dict(scan))
+        print(f"{name:<16}{f'{case_rows}x{case_cols}':>12}{go_time:>11.3f}s{dict_time:>11.3f}s{go_time / dict_time:>9.1f}x")
+
+    # The Mesh3d engine trades the Surface grid for merged blocks, so report its size instead
+    scan = synthetic_scan(rows, cols)
+    start = time.perf_counter()
+    mesh = Visualizer.create_3d_mesh_figure_dict(scan, 500, 12, 6)["data"][0]
+    mesh_time = time.perf_counter() - start
+    triangles = len(base64.b64decode(mesh["i"]["bdata"])) // 4
+    print(f"{'3d mesh':<16}{f'{rows}x{cols}':>12}{'':>12}{mesh_time:>11.3f}s"
+          f"  {triangles} triangles vs {2 * (rows - 1) * (cols - 1)} in the surface")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,126 @@
+"""Run the results callback from many threads at once and check that sessions never mix.
+
+Run from the repository root:
+
+    python -m benchmarks.stress_concurrent_analysis [workers] [requests]
+
+Every request picks its own unit (mm or inch) and thresholds. Each response must label all
+values with its own unit and report the same zone counts as a sequential run, which fails if
+analysis state is shared between requests. tests/test_concurrent_analysis.py runs a smaller
+version of the same check; this script is for load numbers.
+"""
+import io
+import os
+import sys
+import time
+import base64
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+import numpy as np
+import pandas as pd
+
+# Every request is recorded in the scan catalogue, so the catalogue and logs go to a scratch
+# directory rather than the real ones; set before main reads them
+if "main" not in sys.modules:
+    SCRATCH_DIR = tempfile.mkdtemp(prefix="cyliviz-stress-")
+    os.environ["CYLIVIZ_CATALOG_DIR"] = os.path.join(SCRATCH_DIR, "catalog")
+    os.environ["CYLIVIZ_LOG_DIR"] = os.path.join(SCRATCH_DIR, "logs")
+
+import main
+from components.FileRegistry import file_registry
+from components.DataProcessor import DataProcessor
+from components.ThicknessIndex import ThicknessIndex
+from components.AnalysisContext import AnalysisContext
+from pages.results import ResultAnalyzerFixedRange, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED
+
+GEOMETRY = {"OD": 100, "TA": 100, "HE": 20, "TH": 40}
+
+
+def workbook_contents(rows: int = 60, cols: int = 90, seed: int = 0) -> str:
+    """A one-sheet workbook as a dcc.Upload data URL."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(np.round(rng.uniform(4, 12, (rows, cols)), 2), columns=[f"C{j}" for j in range(cols)])
+    df.insert(0, "Sr. No", range(1, rows + 1))
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="S0", index=False)
+    return "data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64," + base64.b64encode(buffer.getvalue()).decode()
+
+
+def results_output_spec():
+    """Callback ID and output list of update_results, as the browser would send them."""
+    output = next(key for key in main.app.callback_map if "thickness-stats" in key)
+    outputs = []
+    for part in output.strip(".").split("..."):
+        component, prop = part.rsplit(".", 1)
+        outputs.append({"id": component, "property": prop.split("@")[0]})
+    return output, outputs
+
+
+def stress(workers: int = 16, requests: int = 400) -> Tuple[List[str], float]:
+    """Send the requests from a pool of threads; returns the failures and the seconds taken."""
+    handle = file_registry.register(workbook_contents())
+    grid_key, scan = DataProcessor.load_scan(handle, 0, *GEOMETRY.values())
+    index = ThicknessIndex.for_scan(grid_key, scan)
+    output, outputs = results_output_spec()
+
+    rng = random.Random(0)
+    jobs = []
+    for _ in range(requests):
+        unit = rng.choice(["mm", "inch"])
+        low = round(rng.uniform(4, 7), 2)
+        jobs.append((unit, low, round(low + rng.uniform(1, 5), 2)))
+
+    # Sequential reference for the zone counts of every job
+    expected = {}
+    for unit, low, high in jobs:
+        context = AnalysisContext(unit, low, high, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED)
+        zone_stats, _ = ResultAnalyzerFixedRange.calculate_statistics(scan.measured, context, index=index)
+        expected[(unit, low, high)] = [zone['count'] for zone in zone_stats]
+
+    def run(job):
+        unit, low, high = job
+        client = main.server.test_client()
+        prop = {"grid_key": grid_key, "scan_id": "stress", "T": high, "TT": low}
+        info = {"unit": unit, "report_no": f"{unit}-{low}-{high}"}
+        body = {
+            "output": output, "outputs": outputs,
+            "inputs": [{"id": "prop-store", "property": "data", "value": prop},
+                       {"id": "analysis-store", "property": "data", "value": info}],
+            "state": [{"id": "data-store", "property": "data", "value": info}],
+            "changedPropIds": ["prop-store.data"]
+        }
+        response = client.post("/_dash-update-component", json=body)
+        if response.status_code != 200:
+            return f"{job}: HTTP {response.status_code}"
+        result = response.get_json()["response"]
+
+        other = "inch" if unit == "mm" else "mm"
+        header = result["distribution-header"]["children"]
+        labels = [row["threshold_value_range"] for row in result["area-summary-table"]["data"][:-1]]
+        if not header.endswith(f"{unit} Range") or any(f" {other}" in label for label in labels + [header]):
+            return f"{job}: wrong unit in {header!r} / {labels}"
+        counts = [row["count"] for row in result["area-summary-table"]["data"][:-1]]
+        if counts != expected[job]:
+            return f"{job}: counts {counts} != {expected[job]}"
+        return None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        failures = [failure for failure in pool.map(run, jobs) if failure]
+    return failures, time.perf_counter() - start
+
+
+def main_stress(workers: int = 16, requests: int = 400) -> int:
+    failures, elapsed = stress(workers, requests)
+    print(f"{requests} requests on {workers} threads in {elapsed:.2f}s ({requests / elapsed:.0f} req/s)")
+    for failure in failures[:10]:
+        print("FAIL", failure)
+    print(f"{len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_stress(*(int(arg) for arg in sys.argv[1:3])))
@@ -0,0 +1,26 @@
+from typing import Dict, List
+
+
+class AnalysisContext:
+    """Settings of one analysis request: unit, Min/Max thresholds and zone definitions.
+
+    Built per callback and passed explicitly, so concurrent sessions never share analysis state.
+    """
+
+    def __init__(self, unit: str, min_threshold: float, max_threshold: float,
+                 num_main_zones: int, zone_definitions: List[Dict[str, str]]):
+        if len(zone_definitions) != num_main_zones + 2:
+            raise ValueError("Zone definitions must cover Below Min, each main zone and Above Max.")
+        self.unit = unit
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.num_main_zones = num_main_zones
+        self.zone_definitions = zone_definitions
+
+    def with_thresholds(self, min_threshold: float, max_threshold: float) -> "AnalysisContext":
+        """Copy of this context with new Min/Max thresholds."""
+        return AnalysisContext(self.unit, min_threshold, max_threshold, self.num_main_zones, self.zone_definitions)
+
+    def __repr__(self) -> str:
+        return (f"AnalysisContext(unit={self.unit!r}, min={self.min_threshold}, max={self.max_threshold}, "
+                f"zones={self.num_main_zones})")
@@ -0,0 +1,146 @@
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from components.Scan import Scan
+
+# A window is averaged only if at least this fraction of its cells were measured
+MIN_WINDOW_COVERAGE = 0.5
+
+
+class Assessment:
+    """Area-averaged thickness assessment over inspection windows, in time linear in the grid size.
+
+    Window means come from summed-area tables of thickness and of measured cells, window minima from
+    the van Herk/Gil-Werman running minimum. Columns wrap around the circumference; rows do not.
+    NaN marks unmeasured cells throughout.
+    """
+
+    @staticmethod
+    def _wrap_columns(values: np.ndarray, window: int) -> np.ndarray:
+        """Append the first window - 1 columns, so windows can run past 360° back to 0°."""
+        if window <= 1:
+            return values
+        return np.concatenate([values, values[:, :window - 1]], axis=1)
+
+    @staticmethod
+    def window_sums(values: np.ndarray, win_rows: int, win_cols: int, wrap: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Sum and number of measured cells of every win_rows x win_cols window.
+
+        Window (r, c) covers rows r..r+win_rows-1 and columns c..c+win_cols-1. With wrap there is
+        one window per column; without it, only windows that fit inside the grid.
+        """
+        rows, cols = values.shape
+        win_rows, win_cols = min(win_rows, rows), min(win_cols, cols)
+        padded = Assessment._wrap_columns(values, win_cols) if wrap else values
+        measured = ~np.isnan(padded)
+
+        def summed_area(data):
+            table = np.zeros((data.shape[0] + 1, data.shape[1] + 1))
+            np.cumsum(data, axis=0, out=table[1:, 1:])
+            np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+            return table
+
+        def windows(table):
+            return (table[win_rows:, win_cols:] - table[:-win_rows, win_cols:]
+                    - table[win_rows:, :-win_cols] + table[:-win_rows, :-win_cols])
+
+        sums = windows(summed_area(np.where(measured, padded, 0.0)))
+        counts = np.rint(windows(summed_area(measured))).astype(np.int64)
+        return sums, counts
+
+    @staticmethod
+    def window_means(values: np.ndarray, win_rows: int, win_cols: int, wrap: bool = True,
+                     min_coverage: float = MIN_WINDOW_COVERAGE) -> np.ndarray:
+        """Mean measured thickness of every window; NaN where too few cells were measured."""
+        sums, counts = Assessment.window_sums(values, win_rows, win_cols, wrap)
+        size = min(win_rows, values.shape[0]) * min(win_cols, values.shape[1])
+        means = np.full(sums.shape, np.nan)
+        enough = (counts > 0) & (counts >= min_coverage * size)
+        means[enough] = sums[enough] / counts[enough]
+        return means
+
+    @staticmethod
+    def sliding_min(values: np.ndarray, window: int, axis: int = -1, wrap: bool = False) -> np.ndarray:
+        """Minimum of every run of `window` values along an axis, with three passes over the data.
+
+        The axis is cut into blocks of `window`; a window then spans the end of one block and the
+        start of the next, so its minimum is min(suffix minimum, prefix minimum). NaN is ignored.
+        """
+        data = np.moveaxis(np.asarray(values, dtype=float), axis, -1)
+        length = data.shape[-1]
+        window = max(1, min(window, length))
+        if wrap and window > 1:
+            data = np.concatenate([data, data[..., :window - 1]], axis=-1)
+        data = np.where(np.isnan(data), np.inf, data)
+        padded_length = -(-data.shape[-1] // window) * window
+        padded = np.full(data.shape[:-1] + (padded_length,), np.inf)
+        padded[..., :data.shape[-1]] = data
+
+        blocks = padded.reshape(data.shape[:-1] + (-1, window))
+        prefix = np.minimum.accumulate(blocks, axis=-1).reshape(padded.shape)
+        suffix = np.minimum.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+
+        count = length if wrap else length - window + 1
+        result = np.minimum(suffix[..., :count], prefix[..., window - 1:window - 1 + count])
+        result[np.isinf(result)] = np.nan
+        return np.moveaxis(result, -1, axis)
+
+    @staticmethod
+    def window_minimum(values: np.ndarray, win_rows: int, win_cols: int, wrap: bool = True) -> np.ndarray:
+        """Minimum of every window, with the same window layout as window_sums."""
+        by_column = Assessment.sliding_min(values, win_cols, axis=1, wrap=wrap)
+        return Assessment.sliding_min(by_column, win_rows, axis=0)
+
+    @staticmethod
+    def thickness_profiles(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Critical thickness profiles: the minimum of every row (axial) and every column (circumferential)."""
+        filled = np.where(np.isnan(values), np.inf, values)
+        axial, circumferential = filled.min(axis=1), filled.min(axis=0)
+        axial[np.isinf(axial)] = np.nan
+        circumferential[np.isinf(circumferential)] = np.nan
+        return axial, circumferential
+
+    @staticmethod
+    def scan_values(scan: Scan) -> np.ndarray:
+        """Measured rows over the full circumference, so windows wrap through the unmeasured arc."""
+        values = np.full((scan.measured.shape[0], scan.cols), np.nan)
+        values[:, :scan.measured.shape[1]] = scan.measured
+        return values
+
+    @staticmethod
+    def _lowest(means: np.ndarray) -> Optional[Tuple[float, Tuple[int, ...]]]:
+        if means.size == 0 or np.isnan(means).all():
+            return None
+        position = np.unravel_index(np.nanargmin(means), means.shape)
+        return float(means[position]), tuple(int(index) for index in position)
+
+    @staticmethod
+    def assess(scan: Scan, axial_length: float, circumferential_length: float,
+               axial_pitch: float, circumferential_pitch: float) -> Dict[str, Any]:
+        """Minimum area-averaged thickness over windows of the given lengths, and of both profiles.
+
+        Lengths and pitches (cell sizes) are in the same unit. Rows are reported in full-grid numbers
+        and columns as the window's first column and angle.
+        """
+        values = Assessment.scan_values(scan)
+        win_rows = max(1, int(round(axial_length / axial_pitch)))
+        win_cols = max(1, int(round(circumferential_length / circumferential_pitch)))
+        # The same angle step as the figures, so a reported angle matches the map
+        degrees_per_col = scan.degrees_per_col
+        result = {"window_rows": min(win_rows, values.shape[0]), "window_cols": min(win_cols, values.shape[1])}
+
+        lowest = Assessment._lowest(Assessment.window_means(values, win_rows, win_cols))
+        if lowest is not None:
+            value, (row, col) = lowest
+            window_min = Assessment.window_minimum(values, win_rows, win_cols)[row, col]
+            result["area"] = {"average": value, "minimum": float(window_min),
+                              "row": row + scan.row_offset, "col": col, "angle": col * degrees_per_col}
+
+        axial, circumferential = Assessment.thickness_profiles(values)
+        lowest = Assessment._lowest(Assessment.window_means(axial[:, None], win_rows, 1, wrap=False)[:, 0])
+        if lowest is not None:
+            result["axial_profile"] = {"average": lowest[0], "row": lowest[1][0] + scan.row_offset}
+        lowest = Assessment._lowest(Assessment.window_means(circumferential[None, :], 1, win_cols)[0])
+        if lowest is not None:
+            result["circumferential_profile"] = {"average": lowest[0], "col": lowest[1][0],
+                                                 "angle": lowest[1][0] * degrees_per_col}
+        return result
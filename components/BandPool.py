@@ -0,0 +1,42 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+
+ANALYSIS_WORKERS = int(os.environ.get("CYLIVIZ_ANALYSIS_WORKERS", str(os.cpu_count() or 1)))
+# Bands are at least this many cells, so per-band overhead stays small next to the NumPy work
+MIN_BAND_CELLS = 64 * 1024
+
+
+class BandPool:
+    """Runs per-band NumPy work on a shared thread pool. NumPy releases the GIL, so bands run in parallel."""
+
+    _executors: Dict[int, ThreadPoolExecutor] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _executor(workers: int) -> ThreadPoolExecutor:
+        with BandPool._lock:
+            if workers not in BandPool._executors:
+                BandPool._executors[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="band")
+            return BandPool._executors[workers]
+
+    @staticmethod
+    def band_slices(rows: int, cols: int, workers: int) -> List[slice]:
+        """Row slices covering the grid in order: a few bands per worker, none smaller than MIN_BAND_CELLS."""
+        if rows == 0:
+            return []
+        band_rows = max(-(-rows // (workers * 4)), -(-MIN_BAND_CELLS // max(cols, 1)), 1)
+        return [slice(start, min(start + band_rows, rows)) for start in range(0, rows, band_rows)]
+
+    @staticmethod
+    def map(func: Callable[[np.ndarray, slice], Any], array: np.ndarray, workers: Optional[int] = None) -> List[Any]:
+        """Call func(array[band], band) for every row band and return the results in band order."""
+        workers = ANALYSIS_WORKERS if workers is None else max(1, workers)
+        rows = array.shape[0]
+        cols = array.shape[1] if array.ndim > 1 else 1
+        bands = BandPool.band_slices(rows, cols, workers)
+        if workers == 1 or len(bands) <= 1:
+            return [func(array[band], band) for band in bands]
+        return list(BandPool._executor(workers).map(lambda band: func(array[band], band), bands))
@@ -0,0 +1,160 @@
+"""Re-analyze catalogued scans with new thresholds on a pool of processes.
+
+Run from the repository root:
+
+    python -m components.BatchAnalysis NAME [--min MIN] [--max MAX] [--client C] [--part P] [--workers N] [--apply]
+
+Thresholds left out keep each scan's recorded ones. Results go to the catalogue under the batch NAME;
+running the same NAME again resumes it, skipping the scans already done. --apply also makes the
+new zone statistics the scans' current ones, including those of scans done by earlier runs.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Dict, List, Optional
+import numpy as np
+from components.AnalysisContext import AnalysisContext
+from components.ScanCatalog import ScanCatalog, scan_catalog
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.environ.get("CYLIVIZ_BATCH_WORKERS", str(os.cpu_count() or 1)))
+# Finished scans are written to the catalogue in groups of this many
+BATCH_COMMIT_EVERY = 20
+# Seconds between progress reports
+BATCH_REPORT_EVERY = 5.0
+
+
+class BatchAnalysis:
+    """Fans catalogued scans out to worker processes and collects their zone statistics.
+
+    Workers memory-map the stored grids, so a scan is read straight from the page cache rather than
+    copied through the pool; only the small statistics dictionaries travel back. The parent process
+    is the only catalogue writer, which keeps SQLite free of lock contention.
+    """
+
+    @staticmethod
+    def analyze(task: Dict[str, Any]) -> Dict[str, Any]:
+        """Zone statistics of one stored grid; runs in a worker process."""
+        # Imported here so the module can be loaded without the Dash pages
+        from pages.results import ResultAnalyzerFixedRange, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED
+
+        result = {key: task[key] for key in ("scan_id", "min_threshold", "max_threshold")}
+        try:
+            if task["min_threshold"] is None or task["max_threshold"] is None:
+                raise ValueError("The scan has no recorded thresholds; give --min and --max.")
+            if task["max_threshold"] <= task["min_threshold"]:
+                raise ValueError(f"Max {task['max_threshold']} must be greater than Min {task['min_threshold']}.")
+            measured = np.load(task["path"], mmap_mode="r")
+            context = AnalysisContext(task["unit"] or "mm", task["min_threshold"], task["max_threshold"],
+                                      NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED)
+            # The pool already keeps every CPU busy, so each scan is analyzed on one thread
+            result["zone_stats"], _ = ResultAnalyzerFixedRange.calculate_statistics(measured, context, workers=1)
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        return result
+
+    @staticmethod
+    def tasks(rows: List[Dict[str, Any]], min_threshold: Optional[float], max_threshold: Optional[float],
+              catalog: ScanCatalog) -> List[Dict[str, Any]]:
+        return [{
+            "scan_id": row["id"],
+            "path": os.path.join(catalog.directory, row["grid_path"]),
+            "unit": row["unit"],
+            "min_threshold": row["min_threshold"] if min_threshold is None else float(min_threshold),
+            "max_threshold": row["max_threshold"] if max_threshold is None else float(max_threshold),
+            # Biggest first, so a large scan does not finish the batch alone
+            "cells": row["block_rows"] * row["block_cols"],
+        } for row in rows]
+
+    @staticmethod
+    def run(name: str, min_threshold: Optional[float] = None, max_threshold: Optional[float] = None,
+            client: Optional[str] = None, part: Optional[str] = None, workers: int = BATCH_WORKERS,
+            apply: bool = False, catalog: ScanCatalog = scan_catalog, report=print) -> Dict[str, Any]:
+        """Run (or resume) the named batch over the matching scans; returns its counts and rate."""
+        batch_id = catalog.start_batch(name, min_threshold, max_threshold)
+        done = catalog.batch_done(batch_id)
+        rows = [row for row in catalog.search(client=client, part=part, limit=-1) if row["id"] not in done]
+        tasks = sorted(BatchAnalysis.tasks(rows, min_threshold, max_threshold, catalog),
+                       key=lambda task: -task["cells"])
+        report(f"Batch {name!r}: {len(tasks)} scans to analyze, {len(done)} already done, {workers} workers")
+        if apply and done:
+            # Scans finished by an earlier run, which may not have applied them, take their results too
+            catalog.apply_batch(batch_id)
+
+        summary = {"batch_id": batch_id, "analyzed": 0, "failed": 0, "skipped": len(done)}
+        pending_results = []
+        started = last_report = time.perf_counter()
+
+        def flush():
+            if not pending_results:
+                return
+            catalog.record_batch_results(batch_id, pending_results, apply=apply)
+            pending_results.clear()
+
+        queue = iter(tasks)
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            try:
+                # A few tasks per worker in flight keeps the pool busy without queuing the whole archive
+                in_flight = {pool.submit(BatchAnalysis.analyze, task) for task in
+                             (next(queue, None) for _ in range(2 * max(1, workers))) if task is not None}
+                while in_flight:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        result = future.result()
+                        if "error" in result:
+                            summary["failed"] += 1
+                            logger.warning("Batch %s: scan %s failed: %s", name, result["scan_id"], result["error"])
+                        else:
+                            summary["analyzed"] += 1
+                        pending_results.append(result)
+                        task = next(queue, None)
+                        if task is not None:
+                            in_flight.add(pool.submit(BatchAnalysis.analyze, task))
+                    if len(pending_results) >= BATCH_COMMIT_EVERY:
+                        flush()
+                    now = time.perf_counter()
+                    if now - last_report >= BATCH_REPORT_EVERY:
+                        last_report = now
+                        count = summary["analyzed"] + summary["failed"]
+                        report(f"  {count}/{len(tasks)} scans, {count / (now - started):.1f} scans/s")
+            except KeyboardInterrupt:
+                # Keep what has finished; running the batch again picks up from here
+                pool.shutdown(wait=False, cancel_futures=True)
+                report("Interrupted; run the same batch again to resume.")
+                raise
+            finally:
+                flush()
+
+        elapsed = time.perf_counter() - started
+        summary["seconds"] = elapsed
+        summary["scans_per_second"] = (summary["analyzed"] + summary["failed"]) / elapsed if elapsed > 0 else 0.0
+        report(f"Batch {name!r}: {summary['analyzed']} analyzed, {summary['failed']} failed in "
+               f"{elapsed:.1f} s ({summary['scans_per_second']:.1f} scans/s)")
+        return summary
+
+
+def main(argv: List[str]) -> None:
+    parser = argparse.ArgumentParser(description="Re-analyze catalogued scans with new thresholds.")
+    parser.add_argument("name", help="batch name; reuse it to resume")
+    parser.add_argument("--min", type=float, dest="min_threshold", help="new Min threshold")
+    parser.add_argument("--max", type=float, dest="max_threshold", help="new Max threshold")
+    parser.add_argument("--client", help="only clients starting with this")
+    parser.add_argument("--part", help="only parts or drawings starting with this")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--apply", action="store_true", help="make the results the scans' current statistics")
+    args = parser.parse_args(argv)
+    try:
+        BatchAnalysis.run(args.name, args.min_threshold, args.max_threshold, args.client, args.part,
+                          args.workers, args.apply)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except ValueError as e:
+        sys.exit(str(e))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,68 @@
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from components.Scan import Scan
+from components.ScanCache import scan_cache
+from components.Registration import Registration
+
+DAYS_PER_YEAR = 365.25
+
+
+class Comparison:
+    """Wall loss and corrosion rate between two inspections of the same vessel.
+
+    Both scans must have the same geometry, so their measured blocks line up cell for cell.
+    A cell unmeasured in either scan is NaN in the result, which the array arithmetic gives for free.
+    """
+
+    @staticmethod
+    def years_between(earlier: str, later: str) -> float:
+        """Years from one ISO inspection date to a later one."""
+        days = (date.fromisoformat(str(later)[:10]) - date.fromisoformat(str(earlier)[:10])).days
+        if days <= 0:
+            raise ValueError("The previous inspection must be dated before the current one.")
+        return days / DAYS_PER_YEAR
+
+    @staticmethod
+    def wall_loss(previous: Scan, current: Scan) -> Scan:
+        """Thickness lost since the previous inspection (negative where the wall reads thicker)."""
+        if previous.shape != current.shape or previous.measured.shape != current.measured.shape:
+            raise ValueError(
+                f"The scans do not match: {previous.measured.shape[0]}x{previous.measured.shape[1]} and "
+                f"{current.measured.shape[0]}x{current.measured.shape[1]} measured cells. "
+                "Compare sheets of the same vessel and geometry."
+            )
+        return Scan(previous.measured - current.measured, current.shape)
+
+    @staticmethod
+    def corrosion_rate(loss: Scan, years: float) -> Scan:
+        """Wall loss per year."""
+        return Scan(loss.measured / np.float32(years), loss.shape)
+
+    @staticmethod
+    def align(previous: Scan, current: Scan, axial: bool = False) -> Tuple[Scan, Dict[str, Any]]:
+        """Previous scan shifted onto the current one, and the registration that found the shift.
+
+        Both are registered over the full circumference, so a shift can carry data across 0°.
+        """
+        def full_width(scan):
+            values = np.full((scan.measured.shape[0], scan.cols), np.nan)
+            values[:, :scan.measured.shape[1]] = scan.measured
+            return values
+
+        registration = Registration.register(full_width(current), full_width(previous), axial=axial)
+        aligned = registration.pop("aligned")[:, :previous.measured.shape[1]]
+        return Scan(aligned.astype(np.float32), previous.shape), registration
+
+    @staticmethod
+    def for_scans(previous_key: str, previous: Scan, current_key: str, current: Scan,
+                  align: str = "") -> Tuple[Scan, Optional[Dict[str, Any]]]:
+        """Cached wall loss between two cached scans, after aligning them if align is "angular" or "axial"."""
+        def build():
+            registration = None
+            source = previous
+            if align:
+                source, registration = Comparison.align(previous, current, axial=align == "axial")
+            return Comparison.wall_loss(source, current), registration
+
+        return scan_cache.get_or_compute(("loss", previous_key, current_key, align), build)
@@ -0,0 +1,84 @@
+from typing import List, Tuple
+import numpy as np
+
+
+class CylinderMesh:
+    """Adaptive triangulation of the cylinder grid for a single Mesh3d trace.
+
+    Grid points are vertices, as in the Surface view, and the quads between them are merged
+    bottom-up into square blocks (a quadtree) wherever all their corners share a colour zone.
+    Quads touching a pinned point are never merged, so those areas keep full resolution.
+    """
+
+    @staticmethod
+    def quad_zones(zones: np.ndarray, pinned: np.ndarray) -> np.ndarray:
+        """Zone of each quad between grid points, or -1 when its corners differ or are pinned."""
+        zones = zones.astype(np.int16)
+        corner = zones[:-1, :-1]
+        uniform = (corner == zones[:-1, 1:]) & (corner == zones[1:, :-1]) & (corner == zones[1:, 1:])
+        touches_pinned = pinned[:-1, :-1] | pinned[:-1, 1:] | pinned[1:, :-1] | pinned[1:, 1:]
+        return np.where(uniform & ~touches_pinned, corner, -1).astype(np.int16)
+
+    @staticmethod
+    def merge_quads(quad_zone: np.ndarray, max_level: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Cover the quad grid with uniform square blocks of up to 2**max_level quads a side.
+
+        Returns the first quad row, first quad column and side length of every block.
+        """
+        quad_rows, quad_cols = quad_zone.shape
+        block = 2 ** max_level
+        padded = np.full((-(-quad_rows // block) * block, -(-quad_cols // block) * block), -1, dtype=np.int16)
+        padded[:quad_rows, :quad_cols] = quad_zone
+
+        # levels[k] holds the zone of each 2**k block, or -1 if it is not uniform
+        levels = [padded]
+        for _ in range(max_level):
+            prev = levels[-1]
+            a, b = prev[0::2, 0::2], prev[0::2, 1::2]
+            c, d = prev[1::2, 0::2], prev[1::2, 1::2]
+            levels.append(np.where((a == b) & (a == c) & (a == d) & (a >= 0), a, -1).astype(np.int16))
+
+        # Take the largest uniform blocks first, then fill what is left from the level below
+        starts_r: List[np.ndarray] = []
+        starts_c: List[np.ndarray] = []
+        sizes: List[np.ndarray] = []
+        covered = np.zeros(levels[max_level].shape, dtype=bool)
+        for level in range(max_level, -1, -1):
+            size = 2 ** level
+            leaf = ~covered & (levels[level] >= 0) if level > 0 else ~covered
+            rs, cs = np.nonzero(leaf)
+            if level == 0:
+                inside = (rs < quad_rows) & (cs < quad_cols)
+                rs, cs = rs[inside], cs[inside]
+            starts_r.append(rs * size)
+            starts_c.append(cs * size)
+            sizes.append(np.full(rs.size, size))
+            if level > 0:
+                covered = np.repeat(np.repeat(covered | leaf, 2, axis=0), 2, axis=1)
+
+        return np.concatenate(starts_r), np.concatenate(starts_c), np.concatenate(sizes)
+
+    @staticmethod
+    def triangulate(zones: np.ndarray, pinned: np.ndarray, max_level: int = 6):
+        """Triangulate a grid of colour zones.
+
+        Returns the row and column of each used grid point and the i, j, k vertex indices of
+        each triangle. Vertices are shared between neighbouring blocks.
+        """
+        rows, cols = zones.shape
+        r0, c0, size = CylinderMesh.merge_quads(CylinderMesh.quad_zones(zones, pinned), max_level)
+
+        # Corner points of every block as flat grid indices, then renumbered to the used points
+        corners = np.stack([
+            r0 * cols + c0,
+            r0 * cols + c0 + size,
+            (r0 + size) * cols + c0,
+            (r0 + size) * cols + c0 + size
+        ])
+        used, inverse = np.unique(corners, return_inverse=True)
+        v00, v01, v10, v11 = inverse.reshape(corners.shape)
+
+        i = np.concatenate([v00, v00])
+        j = np.concatenate([v01, v11])
+        k = np.concatenate([v11, v10])
+        return used // cols, used % cols, i, j, k
@@ -1,9 +1,18 @@
 import io
 import sys
 import base64
-from typing import List, Tuple, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Any, Optional, Sequence
 import pandas as pd
 import numpy as np
+from components.ScanCache import scan_cache
+from components.Scan import Scan
+from components.FileRegistry import file_registry
+from components.MemoryBudget import memory_budget
+from components.BandPool import ANALYSIS_WORKERS
+
+# Rough peak bytes per workbook byte while pandas and openpyxl parse a sheet
+PARSE_BYTES_PER_FILE_BYTE = 12
 
 class DataProcessor:
     """Class to process data, including Excel file handling and data expansion."""
@@ -12,6 +21,11 @@ class DataProcessor:
         """Process uploaded Excel file and return dataframe and sheet options."""
         content_type, content_string = contents.split(",")
         decoded = base64.b64decode(content_string)
+        return DataProcessor.read_excel_bytes(decoded, sheet_index)
+
+    @staticmethod
+    def read_excel_bytes(decoded: bytes, sheet_index: int) -> Tuple[pd.DataFrame, List[Dict[str, str]]]:
+        """Parse one sheet of a decoded Excel file and return dataframe and sheet options."""
         file_data = io.BytesIO(decoded)
 
         ef = pd.ExcelFile(file_data)
@@ -29,16 +43,114 @@ class DataProcessor:
     def expand_data(df: pd.DataFrame, outer_dia: int, test_area: int, height: int, total_height: int) -> pd.DataFrame:
         """Expand the input data based on given parameters."""
         pv = df.to_numpy()
-        total_circumference = np.pi * outer_dia
-        expansion_factor_cols = total_circumference / test_area
-        expansion_factor_rows = total_height / height
-
         rows, cols = pv.shape
-        num_cols = int(expansion_factor_cols * cols)
-        num_rows = int(expansion_factor_rows * rows)
+        num_rows, num_cols = DataProcessor.expanded_shape(rows, cols, outer_dia, test_area, height, total_height)
 
         expanded_df = pd.DataFrame(columns=range(num_cols), index=range(num_rows))
         expanded_df.iloc[:rows, :cols] = df.values
         expanded_df.fillna(-1, inplace=True)
 
-        return expanded_df
\ No newline at end of file
+        return expanded_df
+
+    @staticmethod
+    def expanded_shape(rows: int, cols: int, outer_dia: int, test_area: int,
+                       height: int, total_height: int) -> Tuple[int, int]:
+        """Return the (rows, cols) of the full cylinder grid for a measured block."""
+        total_circumference = np.pi * outer_dia
+        expansion_factor_cols = total_circumference / test_area
+        expansion_factor_rows = total_height / height
+        return int(expansion_factor_rows * rows), int(expansion_factor_cols * cols)
+
+    @staticmethod
+    def build_scan(df: pd.DataFrame, outer_dia: int, test_area: int, height: int, total_height: int) -> Scan:
+        """Build a Scan from a sheet without materializing the unmeasured expansion region."""
+        measured = df.to_numpy(dtype=np.float32)[::-1]
+        shape = DataProcessor.expanded_shape(*measured.shape, outer_dia, test_area, height, total_height)
+        return Scan(measured, shape)
+
+    @staticmethod
+    def grid_key(file_hash: str, sheet_index: int, outer_dia: int, test_area: int,
+                 height: int, total_height: int) -> str:
+        """Build the cache key of an expanded grid from everything it depends on."""
+        return f"{file_hash}/{sheet_index}/{outer_dia}x{test_area}x{height}x{total_height}"
+
+    @staticmethod
+    def load_sheet(handle: str, sheet_index: int) -> Tuple[pd.DataFrame, List[Dict[str, str]]]:
+        """Parse a sheet of a registered upload, reusing the cached result when available."""
+        def parse():
+            decoded = file_registry.get(handle)
+            if decoded is None:
+                raise ValueError("The uploaded file is no longer available. Please upload it again.")
+            with memory_budget.reserve(len(decoded) * PARSE_BYTES_PER_FILE_BYTE, "Reading the sheet"):
+                return DataProcessor.read_excel_bytes(decoded, sheet_index)
+
+        return scan_cache.get_or_compute(("sheet", handle, sheet_index), parse)
+
+    @staticmethod
+    def load_scan(handle: str, sheet_index: int, outer_dia: int, test_area: int,
+                  height: int, total_height: int) -> Tuple[str, Scan]:
+        """Return the grid key and the Scan of a sheet, reusing the cached Scan when available."""
+        grid_key = DataProcessor.grid_key(handle, sheet_index,
+                                          outer_dia, test_area, height, total_height)
+
+        def build() -> Scan:
+            df, _ = DataProcessor.load_sheet(handle, sheet_index)
+            return DataProcessor.build_scan(df, outer_dia, test_area, height, total_height)
+
+        return grid_key, scan_cache.get_or_compute(("scan", grid_key), build)
+
+    @staticmethod
+    def load_courses(handle: str, sheet_indices: Sequence[int], outer_dia: int, test_area: int,
+                     height: int, total_height: int, workers: Optional[int] = None) -> Tuple[str, Scan]:
+        """Return the grid key and Scan of several shell-course sheets stacked along the vessel axis.
+
+        Sheets are given bottom course first and each covers `height`. They are parsed concurrently;
+        each is turned into a float32 block on its thread, then copied into one preallocated measured
+        block at its course offset and released. No padded grid is built per course.
+        """
+        sheet_indices = [int(index) for index in sheet_indices]
+        grid_key = DataProcessor.grid_key(handle, "+".join(str(index) for index in sheet_indices),
+                                          outer_dia, test_area, height, total_height)
+
+        def parse(sheet_index: int) -> Tuple[np.ndarray, str]:
+            decoded = file_registry.get(handle)
+            if decoded is None:
+                raise ValueError("The uploaded file is no longer available. Please upload it again.")
+            df, sheet_options = DataProcessor.read_excel_bytes(decoded, sheet_index)
+            return df.to_numpy(dtype=np.float32), sheet_options[sheet_index]["label"]
+
+        def build() -> Scan:
+            decoded = file_registry.get(handle)
+            if decoded is None:
+                raise ValueError("The uploaded file is no longer available. Please upload it again.")
+            threads = max(1, min(ANALYSIS_WORKERS if workers is None else workers, len(sheet_indices)))
+            with memory_budget.reserve(len(decoded) * PARSE_BYTES_PER_FILE_BYTE * threads, "Reading the courses"):
+                with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="course") as pool:
+                    parsed = list(pool.map(parse, sheet_indices))
+
+            block_rows = sum(values.shape[0] for values, _ in parsed)
+            block_cols = max(values.shape[1] for values, _ in parsed)
+            shape = DataProcessor.expanded_shape(block_rows, block_cols, outer_dia, test_area,
+                                                 height * len(parsed), total_height)
+            if shape[0] < block_rows:
+                raise ValueError(f"{len(parsed)} courses of Height {height} do not fit in the Total Height {total_height}.")
+
+            # Higher rows plot higher, so the bottom course fills the first block rows and each
+            # course above it follows; each sheet is flipped like a single sheet in build_scan
+            measured = np.full((block_rows, block_cols), np.nan, dtype=np.float32)
+            courses, start = [], 0
+            for k, (values, label) in enumerate(parsed):
+                stop = start + values.shape[0]
+                measured[start:stop, :values.shape[1]] = values[::-1]
+                courses.append({"sheet": label, "index": sheet_indices[k],
+                                "start": start + shape[0] - block_rows, "stop": stop + shape[0] - block_rows})
+                parsed[k] = None
+                start = stop
+            return Scan(measured, shape, courses)
+
+        return grid_key, scan_cache.get_or_compute(("scan", grid_key), build)
+
+    @staticmethod
+    def get_scan(grid_key: str) -> Any:
+        """Return a previously built Scan, or None if it is no longer cached."""
+        return scan_cache.get(("scan", grid_key))
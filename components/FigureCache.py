@@ -0,0 +1,58 @@
+import gzip
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Optional, Sequence
+from plotly.io.json import to_json_plotly
+from components.ScanCache import ScanCache
+from components.MemoryBudget import memory_budget
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+class FigureCache:
+    """Serialized figures stored pre-compressed, so repeat views skip both building and encoding."""
+
+    def __init__(self, max_figures: int = 16):
+        self._figures = ScanCache(max_entries=max_figures, budget=memory_budget, name="figure")
+
+    @staticmethod
+    def figure_id(grid_key: str, view_type: str, variant: str = "", thresholds: Optional[Sequence[float]] = None) -> str:
+        """Stable ID of a figure from the scan (hash, sheet and geometry) and view.
+
+        Thresholds only go into the ID of figures whose content depends on them beyond the colours.
+        """
+        name = f"{grid_key}|{view_type}|{variant}"
+        if thresholds is not None:
+            name += "|" + "|".join(str(float(value)) for value in thresholds)
+        return hashlib.sha1(name.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def encode(figure: Dict[str, Any]) -> Dict[str, Any]:
+        """Serialize a figure once and keep its gzip and, if available, brotli encodings."""
+        body = to_json_plotly(figure).encode()
+        return {
+            "etag": hashlib.sha1(body).hexdigest()[:20],
+            "size": len(body),
+            "gzip": gzip.compress(body, compresslevel=6),
+            "br": brotli.compress(body, quality=5) if brotli is not None else None
+        }
+
+    def get(self, figure_id: str) -> Optional[Dict[str, Any]]:
+        return self._figures.get(figure_id)
+
+    def get_or_build(self, figure_id: str, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the encoded figure, building and compressing it on a miss."""
+        def build_encoded():
+            encoded = FigureCache.encode(build())
+            logger.info("Cached figure %s (%d bytes, %d gzipped)", figure_id, encoded["size"], len(encoded["gzip"]))
+            return encoded
+        return self._figures.get_or_compute(figure_id, build_encoded)
+
+
+# Shared by all sessions served by this process
+figure_cache = FigureCache()
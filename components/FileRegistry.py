@@ -0,0 +1,34 @@
+import base64
+import hashlib
+import logging
+from typing import Optional
+from components.ScanCache import ScanCache
+from components.MemoryBudget import MemoryBudgetExceeded, memory_budget
+
+logger = logging.getLogger(__name__)
+
+
+class FileRegistry:
+    """Holds one decoded copy of each uploaded workbook, addressed by a short content handle."""
+
+    def __init__(self, max_files: int = 8):
+        self._files = ScanCache(max_entries=max_files, budget=memory_budget, name="upload")
+
+    def register(self, contents: str) -> str:
+        """Decode a dcc.Upload data URL once and return its handle."""
+        _, content_string = contents.split(",", 1)
+        data = base64.b64decode(content_string)
+        handle = hashlib.sha1(data).hexdigest()[:12]
+        if self._files.get(handle) is None:
+            if not self._files.put(handle, data):
+                raise MemoryBudgetExceeded(f"The file is too large for the server's memory budget ({len(data) / 2**20:.0f} MB).")
+            logger.info("Registered upload %s (%d bytes)", handle, len(data))
+        return handle
+
+    def get(self, handle: str) -> Optional[bytes]:
+        """Return the decoded file for a handle, or None if it was evicted."""
+        return self._files.get(handle) if handle else None
+
+
+# Shared by all sessions served by this process
+file_registry = FileRegistry()
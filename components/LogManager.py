@@ -0,0 +1,85 @@
+import os
+import uuid
+import queue
+import atexit
+import logging
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_DIR = os.environ.get("CYLIVIZ_LOG_DIR", "logs")
+LOG_LEVEL = os.environ.get("CYLIVIZ_LOG_LEVEL", "INFO")
+LOG_FORMAT = "%(asctime)s %(levelname)-7s [req=%(request_id)s scan=%(scan_id)s] %(name)s: %(message)s"
+
+_request_id = contextvars.ContextVar("request_id", default="-")
+_scan_id = contextvars.ContextVar("scan_id", default="-")
+
+
+class ContextFilter(logging.Filter):
+    """Attach the current request and scan IDs to every log record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        record.scan_id = _scan_id.get()
+        return True
+
+
+class LogManager:
+    """Class to configure application logging with a non-blocking file writer."""
+
+    _listener = None
+
+    @staticmethod
+    def configure(log_dir: str = LOG_DIR, level: str = LOG_LEVEL,
+                  max_bytes: int = 5 * 1024 * 1024, backup_count: int = 5) -> None:
+        """Route all records through a queue to a rotating log file. Safe to call twice."""
+        if LogManager._listener is not None:
+            return
+
+        os.makedirs(log_dir, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            os.path.join(log_dir, "cyliviz.log"),
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            encoding="utf-8"
+        )
+        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        # Callers only enqueue the record; the listener thread does the file I/O.
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(ContextFilter())
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+
+        LogManager._listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        LogManager._listener.start()
+        atexit.register(LogManager.shutdown)
+
+    @staticmethod
+    def shutdown() -> None:
+        """Flush queued records and stop the listener thread."""
+        if LogManager._listener is not None:
+            LogManager._listener.stop()
+            LogManager._listener = None
+
+    @staticmethod
+    def start_request() -> contextvars.Token:
+        """Assign a fresh request ID to the current context."""
+        return _request_id.set(uuid.uuid4().hex[:8])
+
+    @staticmethod
+    def end_request(token: contextvars.Token) -> None:
+        _request_id.reset(token)
+
+    @staticmethod
+    @contextmanager
+    def scan_context(scan_id: str):
+        """Tag every record logged inside the block with the given scan ID."""
+        token = _scan_id.set(scan_id)
+        try:
+            yield
+        finally:
+            _scan_id.reset(token)
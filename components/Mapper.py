@@ -1,4 +1,8 @@
 import math
+import logging
+
+logger = logging.getLogger(__name__)
+
 class Mapper:
     @staticmethod
     def mapper(colormap,values):
@@ -46,9 +50,9 @@ class Mapper:
 
 
         # For clearer representation:
-        for value, color in mapped_colors.items():
-            norm_val_display = (value - min_val) / val_range if val_range != 0 else 0.5
-            print(f"{value}: '{color}'")
+        if logger.isEnabledFor(logging.DEBUG):
+            for value, color in mapped_colors.items():
+                logger.debug("%s: '%s'", value, color)
 
 
         return mapped_colors  
@@ -0,0 +1,125 @@
+import os
+import time
+import logging
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MEMORY_BUDGET_MB = int(os.environ.get("CYLIVIZ_MEMORY_MB", "1024"))
+# How long a heavy job waits for other jobs to release memory before it is turned away
+ADMISSION_TIMEOUT = float(os.environ.get("CYLIVIZ_ADMISSION_TIMEOUT", "30"))
+
+
+class MemoryBudgetExceeded(RuntimeError):
+    """A heavy job could not be admitted within the process memory budget."""
+
+
+class MemoryBudget:
+    """Process-wide accountant for the bytes held by cached artifacts and by jobs in flight.
+
+    Caches attached to the budget share its lock and report the size of every entry. When the
+    total goes over the budget, the least recently used entry across all of them is evicted.
+    Heavy jobs reserve their estimated peak first and wait, or are rejected, when it does not fit.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+        self._released = threading.Condition(self.lock)
+        self._caches: List[Any] = []
+        self._ticks = itertools.count()
+        self.cached = 0
+        self.reserved = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    @staticmethod
+    def sizeof(value: Any) -> int:
+        """Approximate bytes held by a cached value: arrays, frames, bytes and containers of them."""
+        if value is None:
+            return 0
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        if isinstance(value, np.ndarray):
+            return value.nbytes
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=False).sum())
+        if isinstance(value, dict):
+            return sum(MemoryBudget.sizeof(item) for item in value.values())
+        if isinstance(value, (list, tuple)):
+            return sum(MemoryBudget.sizeof(item) for item in value)
+        if hasattr(value, "nbytes"):
+            return int(value.nbytes)
+        return 0
+
+    def tick(self) -> int:
+        """Next use stamp; entries with the smallest stamp were used least recently."""
+        return next(self._ticks)
+
+    def attach(self, cache: Any) -> None:
+        with self.lock:
+            self._caches.append(cache)
+
+    def charge(self, delta: int) -> None:
+        with self.lock:
+            self.cached += delta
+            if delta < 0:
+                self._released.notify_all()
+
+    def make_room(self, needed: int = 0, keep: Any = None) -> bool:
+        """Evict least recently used entries until `needed` more bytes fit. Never evicts `keep`."""
+        with self.lock:
+            while self.cached + self.reserved + needed > self.max_bytes:
+                candidates = [cache for cache in self._caches if cache.oldest_tick(keep) is not None]
+                if not candidates:
+                    return False
+                victim = min(candidates, key=lambda cache: cache.oldest_tick(keep))
+                victim.evict_oldest(keep)
+                self.evictions += 1
+            return True
+
+    @contextmanager
+    def reserve(self, nbytes: int, label: str):
+        """Hold `nbytes` for a job, evicting cached artifacts or waiting for other jobs as needed."""
+        # A job larger than the whole budget is admitted only when it can run alone
+        nbytes = min(int(nbytes), self.max_bytes)
+        with self.lock:
+            deadline = time.monotonic() + ADMISSION_TIMEOUT
+            # Cached artifacts are only evicted once the jobs in flight leave enough room
+            while self.reserved + nbytes > self.max_bytes or not self.make_room(nbytes):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejections += 1
+                    raise MemoryBudgetExceeded(
+                        f"The server is busy with other large scans ({self.reserved / 2**20:.0f} MB in use). "
+                        f"Please try again in a moment."
+                    )
+                logger.info("Waiting for memory: %s needs %d bytes, %d reserved", label, nbytes, self.reserved)
+                self._released.wait(remaining)
+            self.reserved += nbytes
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.reserved -= nbytes
+                self._released.notify_all()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "max_bytes": self.max_bytes,
+                "cached": self.cached,
+                "reserved": self.reserved,
+                "evictions": self.evictions,
+                "rejections": self.rejections
+            }
+
+
+# Shared by all sessions served by this process
+memory_budget = MemoryBudget(MEMORY_BUDGET_MB * 2**20)
@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import time
+import zlib
+import logging
+import functools
+import threading
+from collections import Counter
+from html import escape
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.environ.get("CYLIVIZ_PROFILE_DIR", "profiles")
+PROFILE_INTERVAL_MS = float(os.environ.get("CYLIVIZ_PROFILE_INTERVAL_MS", "2"))
+# Older profiles are deleted once there are more than this many
+PROFILE_KEEP = int(os.environ.get("CYLIVIZ_PROFILE_KEEP", "20"))
+PROFILE_TARGETS = ("update_visualization", "update_results")
+
+FLAME_WIDTH = 1200
+FLAME_ROW = 17
+
+
+class Profiler:
+    """Sampling profiler for the next call of an armed callback.
+
+    Callbacks are wrapped with `profiled(target)`. While nothing is armed the wrapper only checks
+    an empty set. Once armed, the next call runs with a sampler thread recording the stack of the
+    calling thread; the samples are saved as folded stacks, a flame graph SVG and a JSON summary.
+    Work handed to the band pool shows up as time spent waiting for it.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.directory = directory
+        self.interval = interval_ms / 1000
+        self._armed = set()
+        self._lock = threading.Lock()
+
+    def arm(self, target: str) -> None:
+        if target not in PROFILE_TARGETS:
+            raise ValueError(f"Unknown profile target {target!r}")
+        with self._lock:
+            self._armed.add(target)
+        logger.info("Profiling armed for the next %s call", target)
+
+    def armed(self) -> List[str]:
+        with self._lock:
+            return sorted(self._armed)
+
+    def profiled(self, target: str) -> Callable:
+        """Decorator that profiles the call following `arm(target)`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self._armed:
+                    return func(*args, **kwargs)
+                with self._lock:
+                    if target not in self._armed:
+                        claimed = False
+                    else:
+                        self._armed.discard(target)
+                        claimed = True
+                if not claimed:
+                    return func(*args, **kwargs)
+                return self._run(target, func, args, kwargs)
+            return wrapper
+        return decorator
+
+    def _run(self, target: str, func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        thread_id = threading.get_ident()
+        stacks = Counter()
+        stop = threading.Event()
+        # Stacks start at the profiled callback, below the web server and this wrapper
+        run_code = Profiler._run.__code__
+
+        def sample():
+            while not stop.wait(self.interval):
+                frame = sys._current_frames().get(thread_id)
+                stack = []
+                while frame is not None and frame.f_code is not run_code:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack and not stop.is_set():
+                    stacks[tuple(reversed(stack))] += 1
+
+        sampler = threading.Thread(target=sample, name="profiler", daemon=True)
+        # The sampler needs the GIL to read the stack, so hand it over more often while profiling
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, self.interval / 4))
+        started = time.time()
+        sampler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stop.set()
+            sampler.join()
+            sys.setswitchinterval(switch_interval)
+            duration = time.time() - started
+            try:
+                self.save(target, started, duration, stacks)
+            except OSError:
+                logger.exception("Could not save the %s profile", target)
+
+    def save(self, target: str, started: float, duration: float, stacks: Counter) -> str:
+        """Write the folded stacks, flame graph and summary of one profile and return its name."""
+        os.makedirs(self.directory, exist_ok=True)
+        name = time.strftime("%Y%m%d-%H%M%S", time.localtime(started)) + f"-{int(started * 1000) % 1000:03d}-{target}"
+        base = os.path.join(self.directory, name)
+
+        with open(base + ".folded", "w", encoding="utf-8") as file:
+            for stack, count in stacks.most_common():
+                file.write(";".join(frame.replace(";", ",") for frame in stack) + f" {count}\n")
+        with open(base + ".svg", "w", encoding="utf-8") as file:
+            file.write(Profiler.flame_graph(stacks, f"{target} - {duration * 1000:.0f} ms"))
+
+        # Self time of the hottest functions, for a quick look without opening the graph
+        self_samples = Counter()
+        for stack, count in stacks.items():
+            self_samples[stack[-1]] += count
+        summary = {
+            "name": name,
+            "target": target,
+            "started": started,
+            "duration": duration,
+            "samples": sum(stacks.values()),
+            "interval_ms": self.interval * 1000,
+            "top": self_samples.most_common(15)
+        }
+        with open(base + ".json", "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=1)
+        logger.info("Saved profile %s (%d samples over %.0f ms)", name, summary["samples"], duration * 1000)
+        self.prune()
+        return name
+
+    def prune(self) -> None:
+        for summary in self.recent()[PROFILE_KEEP:]:
+            for extension in (".json", ".folded", ".svg"):
+                try:
+                    os.remove(os.path.join(self.directory, summary["name"] + extension))
+                except FileNotFoundError:
+                    pass
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Summaries of the saved profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        summaries = []
+        for entry in os.listdir(self.directory):
+            if entry.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, entry), encoding="utf-8") as file:
+                        summaries.append(json.load(file))
+                except (OSError, ValueError):
+                    continue
+        return sorted(summaries, key=lambda summary: summary["started"], reverse=True)
+
+    @staticmethod
+    def flame_graph(stacks: Counter, title: str) -> str:
+        """Render sampled stacks as a flame graph SVG: callers below, callees stacked on top."""
+        tree = {}
+        for stack, count in stacks.items():
+            node = tree
+            for frame in stack:
+                entry = node.setdefault(frame, [0, {}])
+                entry[0] += count
+                node = entry[1]
+
+        def depth(node):
+            return 1 + max((depth(child[1]) for child in node.values()), default=0)
+
+        total = max(sum(stacks.values()), 1)
+        rows = depth(tree)
+        height = (rows + 2) * FLAME_ROW
+        scale = FLAME_WIDTH / total
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{FLAME_WIDTH}" height="{height}" '
+            f'font-family="Verdana, sans-serif" font-size="11">',
+            f'<rect width="100%" height="100%" fill="#fafafa"/>',
+            f'<text x="{FLAME_WIDTH / 2}" y="{FLAME_ROW - 4}" text-anchor="middle" font-size="13">'
+            f'{escape(title)} ({total} samples)</text>'
+        ]
+
+        def draw(node, x, level):
+            for frame, (count, children) in sorted(node.items()):
+                width = count * scale
+                if width >= 0.5:
+                    y = height - (level + 1) * FLAME_ROW
+                    # Warm colours, stable per function
+                    hue = zlib.crc32(frame.encode()) % 50
+                    if len(frame) * 7 < width:
+                        label = frame
+                    elif width > 21:
+                        label = frame[:int(width / 7) - 2] + ".."
+                    else:
+                        label = ""
+                    parts.append(
+                        f'<g><title>{escape(frame)} - {count} samples ({100 * count / total:.1f}%)</title>'
+                        f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{FLAME_ROW - 1}" '
+                        f'fill="hsl({hue}, 85%, 60%)" rx="2"/>'
+                        f'<text x="{x + 3:.1f}" y="{y + FLAME_ROW - 5}">{escape(label)}</text></g>'
+                    )
+                    draw(children, x, level + 1)
+                x += width
+
+        draw(tree, 0.0, 0)
+        parts.append("</svg>")
+        return "\n".join(parts)
+
+
+# Shared by all sessions served by this process
+profiler = Profiler()
@@ -0,0 +1,165 @@
+import math
+from typing import Any, Dict, Iterable, List, Tuple
+import numpy as np
+from components.Scan import Scan
+
+# The minimum table may hold at most this many values per grid cell; it is built over square tiles
+# just large enough to stay within it, since a full-resolution 2D sparse table needs log(rows) * log(cols)
+MIN_TABLE_VALUES_PER_CELL = 1.0
+
+
+class RegionIndex:
+    """Statistics of any rectangle of a scan's measured block from tables built once.
+
+    Sums, measured counts and per-zone counts come from summed-area tables, so a rectangle costs
+    four lookups each. Minima come from a 2D sparse table of tile minima (four lookups for the
+    tiles inside the rectangle) plus a pass over the partial tiles along its edges.
+    """
+
+    def __init__(self, values: np.ndarray):
+        """Build the tables from the measured block; NaN marks unmeasured cells."""
+        self.values = values
+        self.shape = values.shape
+        measured = ~np.isnan(values)
+        self.sum_table = RegionIndex.summed_area(np.where(measured, values, 0.0))
+        self.count_table = RegionIndex.summed_area(measured, np.int32)
+
+        rows, cols = self.shape
+        self.tile = 1
+        while RegionIndex._table_values(rows, cols, self.tile) > MIN_TABLE_VALUES_PER_CELL * max(rows * cols, 1):
+            self.tile *= 2
+        self.levels = RegionIndex._sparse_table(RegionIndex._tile_minima(values, self.tile))
+
+    @property
+    def nbytes(self) -> int:
+        return (self.sum_table.nbytes + self.count_table.nbytes
+                + sum(table.nbytes for level in self.levels for table in level))
+
+    @staticmethod
+    def summed_area(data: np.ndarray, dtype=np.float64) -> np.ndarray:
+        """(rows + 1) x (cols + 1) table whose [r, c] is the sum of data[:r, :c]."""
+        table = np.zeros((data.shape[0] + 1, data.shape[1] + 1), dtype=dtype)
+        np.cumsum(data, axis=0, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        return table
+
+    @staticmethod
+    def rectangle_sum(table: np.ndarray, row0: int, row1: int, col0: int, col1: int):
+        """Sum over rows row0..row1 - 1 and columns col0..col1 - 1 of a summed-area table."""
+        return table[row1, col1] - table[row0, col1] - table[row1, col0] + table[row0, col0]
+
+    @staticmethod
+    def _table_values(rows: int, cols: int, tile: int) -> int:
+        """Values in the sparse table of a grid cut into tile x tile tiles."""
+        tile_rows, tile_cols = -(-rows // tile), -(-cols // tile)
+        return sum(max(tile_rows - 2 ** k + 1, 0) for k in range(tile_rows.bit_length())) * \
+            sum(max(tile_cols - 2 ** l + 1, 0) for l in range(tile_cols.bit_length()))
+
+    @staticmethod
+    def _tile_minima(values: np.ndarray, tile: int) -> np.ndarray:
+        """Minimum of every tile x tile tile, with +inf for tiles without a measured cell."""
+        rows, cols = values.shape
+        padded = np.full((-(-rows // tile) * tile, -(-cols // tile) * tile), np.inf, dtype=np.float32)
+        padded[:rows, :cols] = np.where(np.isnan(values), np.inf, values)
+        return padded.reshape(padded.shape[0] // tile, tile, padded.shape[1] // tile, tile).min(axis=(1, 3))
+
+    @staticmethod
+    def _sparse_table(minima: np.ndarray) -> List[List[np.ndarray]]:
+        """levels[k][l][i, j] is the minimum of minima[i:i + 2**k, j:j + 2**l]."""
+        levels = [[minima]]
+        for k in range(1, minima.shape[0].bit_length()):
+            above, half = levels[k - 1][0], 2 ** (k - 1)
+            levels.append([np.minimum(above[:-half], above[half:])])
+        for level in levels:
+            for l in range(1, minima.shape[1].bit_length()):
+                left, half = level[l - 1], 2 ** (l - 1)
+                level.append(np.minimum(left[:, :-half], left[:, half:]))
+        return levels
+
+    def _sparse_min(self, row0: int, row1: int, col0: int, col1: int) -> float:
+        """Minimum of the tiles row0..row1 - 1 by col0..col1 - 1, from four overlapping lookups."""
+        k, l = (row1 - row0).bit_length() - 1, (col1 - col0).bit_length() - 1
+        table = self.levels[k][l]
+        last_row, last_col = row1 - 2 ** k, col1 - 2 ** l
+        return float(min(table[row0, col0], table[last_row, col0], table[row0, last_col], table[last_row, last_col]))
+
+    def minimum(self, row0: int, row1: int, col0: int, col1: int) -> float:
+        """Minimum measured value of a rectangle of the block; +inf if none was measured."""
+        tile = self.tile
+        tile_row0, tile_row1 = -(-row0 // tile), row1 // tile
+        tile_col0, tile_col1 = -(-col0 // tile), col1 // tile
+        if tile_row0 >= tile_row1 or tile_col0 >= tile_col1:
+            # No whole tile inside; the rectangle is at most a few tiles thick
+            return RegionIndex._edge_min(self.values[row0:row1, col0:col1])
+
+        inner_row0, inner_row1 = tile_row0 * tile, tile_row1 * tile
+        return min(
+            self._sparse_min(tile_row0, tile_row1, tile_col0, tile_col1),
+            RegionIndex._edge_min(self.values[row0:inner_row0, col0:col1]),
+            RegionIndex._edge_min(self.values[inner_row1:row1, col0:col1]),
+            RegionIndex._edge_min(self.values[inner_row0:inner_row1, col0:tile_col0 * tile]),
+            RegionIndex._edge_min(self.values[inner_row0:inner_row1, tile_col1 * tile:col1]),
+        )
+
+    @staticmethod
+    def _edge_min(values: np.ndarray) -> float:
+        # fmin skips NaN; a slice with nothing measured gives NaN, which is treated as +inf
+        value = float(np.fmin.reduce(values, axis=None)) if values.size > 0 else np.nan
+        return np.inf if np.isnan(value) else value
+
+    def zone_tables(self, masks: Iterable[np.ndarray]) -> np.ndarray:
+        """Stacked summed-area tables counting the cells of each zone mask (zones x rows + 1 x cols + 1)."""
+        return np.stack([RegionIndex.summed_area(mask, np.int32) for mask in masks])
+
+    @staticmethod
+    def column_spans(scan: Scan, col0: int, col1: int) -> List[Tuple[int, int]]:
+        """Block column ranges of full-grid columns col0..col1 - 1, wrapping past 360° back to 0°."""
+        block_cols = scan.measured.shape[1]
+        if col1 - col0 >= scan.cols:
+            return [(0, block_cols)]
+        start, stop = col0 % scan.cols, col0 % scan.cols + (col1 - col0)
+        spans = [(start, min(stop, scan.cols))]
+        if stop > scan.cols:
+            spans.append((0, stop - scan.cols))
+        # Columns past the measured block are unmeasured, so only the part inside it is kept
+        return [(low, min(high, block_cols)) for low, high in spans if low < min(high, block_cols)]
+
+    def stats(self, scan: Scan, row0: int, row1: int, col0: int, col1: int, zone_tables: np.ndarray = None) -> Dict[str, Any]:
+        """Cells, measured cells, mean, minimum and per-zone counts of full-grid rows row0..row1 - 1
+        and columns col0..col1 - 1. Columns may run past either end of the circumference."""
+        row0, row1, col0, col1 = int(row0), int(row1), int(col0), int(col1)
+        block_row0 = min(max(row0 - scan.row_offset, 0), self.shape[0])
+        block_row1 = min(max(row1 - scan.row_offset, 0), self.shape[0])
+        total, count, minimum = 0.0, 0, np.inf
+        zones = np.zeros(0 if zone_tables is None else zone_tables.shape[0], dtype=np.int64)
+        if block_row1 > block_row0:
+            for low, high in RegionIndex.column_spans(scan, col0, col1):
+                total += RegionIndex.rectangle_sum(self.sum_table, block_row0, block_row1, low, high)
+                count += int(RegionIndex.rectangle_sum(self.count_table, block_row0, block_row1, low, high))
+                minimum = min(minimum, self.minimum(block_row0, block_row1, low, high))
+                if zone_tables is not None:
+                    zones += RegionIndex.rectangle_sum(zone_tables.transpose(1, 2, 0), block_row0, block_row1, low, high)
+        return {
+            "cells": max(row1 - row0, 0) * min(max(col1 - col0, 0), scan.cols),
+            "measured": count,
+            "mean": total / count if count > 0 else None,
+            "min": minimum if count > 0 else None,
+            "zone_counts": zones.tolist()
+        }
+
+    @staticmethod
+    def selection_cells(scan: Scan, x_range: List[float], y_range: List[float]) -> Tuple[int, int, int, int]:
+        """Full-grid rows row0..row1 - 1 and columns col0..col1 - 1 whose centres lie in a 2D view box.
+
+        Columns are not clipped, so a box dragged past either end of the angle axis wraps around.
+        """
+        # Figures place row i at height i * rows / (rows - 1) and column j at angle j * 2pi / (cols - 1)
+        col_step = 2 * np.pi / (scan.cols - 1) if scan.cols > 1 else 1.0
+        row_step = scan.rows / (scan.rows - 1) if scan.rows > 1 else 1.0
+        x0, x1 = sorted(x_range)
+        y0, y1 = sorted(y_range)
+        row0 = min(max(math.ceil(y0 / row_step), 0), scan.rows)
+        row1 = min(max(math.floor(y1 / row_step) + 1, row0), scan.rows)
+        col0 = math.ceil(x0 / col_step)
+        col1 = max(math.floor(x1 / col_step) + 1, col0)
+        return row0, row1, col0, col1
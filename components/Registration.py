@@ -0,0 +1,124 @@
+from typing import Any, Dict, Optional, Union
+import numpy as np
+import pandas as pd
+
+# Shifts whose grids overlap on fewer than this fraction of the best overlap are not considered
+MIN_OVERLAP = 0.5
+# Shifts within this many cells of the peak are part of the peak when finding the runner-up
+PEAK_RADIUS = 2
+
+
+class Registration:
+    """Finds the shift between two thickness grids of the same vessel by FFT cross-correlation.
+
+    Columns go around the circumference, so they are correlated circularly; rows are zero-padded,
+    since the vessel axis does not wrap. The score is the normalized cross-correlation over the
+    cells measured in both grids (masked NCC), built from six correlations of the values, their
+    squares and the measured masks, so unmeasured cells never count. Everything is O(n log n).
+    """
+
+    @staticmethod
+    def as_array(grid: Union[np.ndarray, pd.DataFrame]) -> np.ndarray:
+        """Float grid with NaN for unmeasured cells; accepts DataProcessor.expand_data output (-1 = unmeasured)."""
+        values = np.array(grid.to_numpy() if isinstance(grid, pd.DataFrame) else grid, dtype=float)
+        values[values == -1] = np.nan
+        return values
+
+    @staticmethod
+    def _spectrum(values: np.ndarray, axial: bool) -> np.ndarray:
+        """Forward FFT along the columns, and along zero-padded rows when axial."""
+        if axial:
+            return np.fft.rfft2(values, (2 * values.shape[0], values.shape[1]))
+        return np.fft.rfft(values, axis=1)
+
+    @staticmethod
+    def _correlate(spectrum_a: np.ndarray, spectrum_b: np.ndarray, shape, axial: bool) -> np.ndarray:
+        """sum_x a[x] * b[x + shift] for every shift: circular in columns, linear in rows when axial.
+
+        The result is indexed [row shift, column shift], negative row shifts counting from the end.
+        Without axial only the row shift 0 is computed.
+        """
+        rows, cols = shape
+        if axial:
+            return np.fft.irfft2(np.conj(spectrum_a) * spectrum_b, (2 * rows, cols))
+        return np.fft.irfft((np.conj(spectrum_a) * spectrum_b).sum(axis=0), cols)[None, :]
+
+    @staticmethod
+    def correlation(reference: np.ndarray, moving: np.ndarray, axial: bool = False) -> np.ndarray:
+        """Masked normalized cross-correlation for every shift; NaN where the overlap is too small."""
+        mask_a, mask_b = ~np.isnan(reference), ~np.isnan(moving)
+        a, b = np.where(mask_a, reference, 0.0), np.where(mask_b, moving, 0.0)
+
+        # Six forward transforms, each reused by the correlations that need it
+        f_mask_a, f_a, f_aa = (Registration._spectrum(x, axial) for x in (mask_a.astype(float), a, a * a))
+        f_mask_b, f_b, f_bb = (Registration._spectrum(x, axial) for x in (mask_b.astype(float), b, b * b))
+
+        def correlate(spectrum_a, spectrum_b):
+            return Registration._correlate(spectrum_a, spectrum_b, reference.shape, axial)
+
+        overlap = np.rint(correlate(f_mask_a, f_mask_b))
+        sum_a = correlate(f_a, f_mask_b)
+        sum_b = correlate(f_mask_a, f_b)
+        sum_aa = correlate(f_aa, f_mask_b)
+        sum_bb = correlate(f_mask_a, f_bb)
+        sum_ab = correlate(f_a, f_b)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = sum_ab - sum_a * sum_b / overlap
+            variance = (sum_aa - sum_a ** 2 / overlap) * (sum_bb - sum_b ** 2 / overlap)
+            ncc = covariance / np.sqrt(np.maximum(variance, 0))
+        ncc[(overlap < MIN_OVERLAP * overlap.max()) | ~np.isfinite(ncc)] = np.nan
+        return ncc
+
+    @staticmethod
+    def register(reference: Union[np.ndarray, pd.DataFrame], moving: Union[np.ndarray, pd.DataFrame],
+                 axial: bool = False, max_axial_shift: Optional[int] = None) -> Dict[str, Any]:
+        """Shift of `moving` relative to `reference`, the aligned grid and a confidence score.
+
+        moving[row + row_shift, (col + col_shift) % cols] matches reference[row, col]. The aligned
+        grid is moving shifted back onto the reference, with rows shifted in from outside unmeasured.
+        Confidence is how far the peak stands above the best correlation away from it:
+        (peak - runner_up) / (1 - runner_up), from 0 (ambiguous) to 1.
+        """
+        reference, moving = Registration.as_array(reference), Registration.as_array(moving)
+        if reference.shape != moving.shape:
+            raise ValueError(f"Grids of different sizes cannot be registered: {reference.shape} and {moving.shape}")
+        rows, cols = reference.shape
+
+        ncc = Registration.correlation(reference, moving, axial)
+        # Signed row shift of every row of ncc
+        row_shifts = np.rint(np.fft.fftfreq(ncc.shape[0], 1 / ncc.shape[0])).astype(int)
+        if axial and max_axial_shift is not None:
+            ncc[np.abs(row_shifts) > max_axial_shift] = np.nan
+        if np.isnan(ncc).all():
+            raise ValueError("The grids do not share enough measured cells to be registered.")
+
+        peak_row, col_shift = np.unravel_index(np.nanargmax(ncc), ncc.shape)
+        peak = float(ncc[peak_row, col_shift])
+        row_shift = int(row_shifts[peak_row])
+
+        # Runner-up: the best correlation outside the peak's neighbourhood (columns wrap, rows do not)
+        col_distance = np.abs((np.arange(cols) - col_shift + cols // 2) % cols - cols // 2)
+        row_distance = np.abs(row_shifts - row_shift)
+        near = (row_distance[:, None] <= PEAK_RADIUS) & (col_distance[None, :] <= PEAK_RADIUS)
+        away = np.where(near, np.nan, ncc)
+        runner_up = float(np.nanmax(away)) if not np.isnan(away).all() else -1.0
+        confidence = float(np.clip((peak - runner_up) / max(1.0 - runner_up, 1e-12), 0.0, 1.0))
+
+        aligned = np.roll(moving, -int(col_shift), axis=1)
+        if row_shift:
+            shifted = np.full_like(aligned, np.nan)
+            if row_shift > 0:
+                shifted[:rows - row_shift] = aligned[row_shift:]
+            else:
+                shifted[-row_shift:] = aligned[:rows + row_shift]
+            aligned = shifted
+
+        return {
+            "col_shift": int(col_shift),
+            "row_shift": row_shift,
+            "angle": float(col_shift) * 360.0 / cols,
+            "correlation": peak,
+            "confidence": confidence,
+            "aligned": aligned
+        }
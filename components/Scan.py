@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+
+class Scan:
+    """Expanded thickness grid stored as its measured block plus the shape of the whole cylinder.
+
+    Row 0 is the bottom of the vessel and plots at height 0. Sheets are flipped when loaded, so the
+    measured block occupies the last (top) rows and the first columns. Everything outside it is
+    unmeasured and is never stored; blank cells inside the block are NaN and are also recorded in a
+    packed validity bitmap.
+    """
+
+    def __init__(self, measured: np.ndarray, shape: Tuple[int, int], courses: Optional[List[Dict[str, Any]]] = None):
+        self.measured = np.ascontiguousarray(measured, dtype=np.float32)
+        self.shape = (int(shape[0]), int(shape[1]))
+        # Sheets stitched into this scan, each with its full-grid rows start..stop - 1
+        self.courses = courses or []
+        block_rows, block_cols = self.measured.shape
+        if block_rows > self.shape[0] or block_cols > self.shape[1]:
+            raise ValueError("Measured data does not fit in the expanded grid. Check Outer Diameter, Test Area and Heights.")
+
+        self.row_offset = self.shape[0] - block_rows
+        valid_mask = ~np.isnan(self.measured)
+        self._valid_bits = np.packbits(valid_mask, axis=None)
+        self.valid_values = self.measured[valid_mask]
+        self.max_value = float(self.valid_values.max()) if self.valid_values.size > 0 else None
+
+    @property
+    def rows(self) -> int:
+        return self.shape[0]
+
+    @property
+    def cols(self) -> int:
+        return self.shape[1]
+
+    @property
+    def degrees_per_col(self) -> float:
+        """Angle between neighbouring columns; figures place column j at j * 360 / (cols - 1) degrees."""
+        return 360.0 / (self.cols - 1) if self.cols > 1 else 0.0
+
+    @property
+    def valid_mask(self) -> np.ndarray:
+        """Boolean mask of measured cells within the measured block.
+
+        Only the packed bitmap is kept, so every access unpacks a new mask; hold on to the result
+        rather than reading the property in a loop.
+        """
+        return np.unpackbits(self._valid_bits, count=self.measured.size).reshape(self.measured.shape).astype(bool)
+
+    @property
+    def nbytes(self) -> int:
+        return self.measured.nbytes + self._valid_bits.nbytes + self.valid_values.nbytes
+
+    def grid(self, fill: float = -1) -> np.ndarray:
+        """Materialize the full expanded grid, with unmeasured cells set to fill."""
+        full = np.full(self.shape, fill, dtype=np.float32)
+        block = full[self.row_offset:, :self.measured.shape[1]]
+        np.copyto(block, self.measured, where=self.valid_mask)
+        return full
+
+    def value_at(self, row: int, col: int) -> float:
+        """Thickness at a cell of the full grid, or NaN if it was not measured."""
+        block_row = row - self.row_offset
+        if 0 <= block_row < self.measured.shape[0] and 0 <= col < self.measured.shape[1]:
+            return float(self.measured[block_row, col])
+        return float("nan")
+
+    def course_at(self, row: int) -> Optional[str]:
+        """Sheet name of the stitched course containing a full-grid row, if any."""
+        for course in self.courses:
+            if course["start"] <= row < course["stop"]:
+                return course["sheet"]
+        return None
+
+    def cell_at(self, theta: float, height: float) -> Tuple[int, int]:
+        """Row and column of the figure point at angle theta (radians) and plotted height."""
+        # Figures place row i at height i * rows / (rows - 1) and column j at angle j * 2pi / (cols - 1)
+        theta = theta + 2 * np.pi if theta < 0 else theta
+        row = int(round(height * (self.rows - 1) / self.rows)) if self.rows > 1 else 0
+        col = int(round(theta * (self.cols - 1) / (2 * np.pi))) if self.cols > 1 else 0
+        return min(max(row, 0), self.rows - 1), min(max(col, 0), self.cols - 1)
@@ -0,0 +1,125 @@
+import threading
+import logging
+from concurrent.futures import Future
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from components.MemoryBudget import MemoryBudget, memory_budget
+
+logger = logging.getLogger(__name__)
+
+
+class ScanCache:
+    """Thread-safe LRU cache for parsed sheets, expanded grids and other per-scan artifacts.
+
+    With a memory budget, the cache shares the budget's lock and reports the size of every entry,
+    so entries can also be evicted to make room for other caches and jobs.
+    """
+
+    def __init__(self, max_entries: int = 32, budget: Optional[MemoryBudget] = None, name: str = "scan"):
+        self.max_entries = max_entries
+        self.name = name
+        self.budget = budget
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._ticks = {}
+        # Futures of the values being computed, by key
+        self._pending = {}
+        self._lock = budget.lock if budget is not None else threading.RLock()
+        if budget is not None:
+            budget.attach(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return a cached value and mark it as recently used."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            if self.budget is not None:
+                self._ticks[key] = self.budget.tick()
+            return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> bool:
+        """Store a value, evicting the least recently used entries when full.
+
+        Returns False if the value alone is larger than the memory budget and was not stored.
+        """
+        with self._lock:
+            size = MemoryBudget.sizeof(value) if self.budget is not None else 0
+            if self.budget is not None and size > self.budget.max_bytes:
+                logger.warning("Not caching %s in %s cache: %d bytes exceed the memory budget", key, self.name, size)
+                self._remove(key)
+                return False
+            self._remove(key)
+            self._entries[key] = value
+            if self.budget is not None:
+                self._sizes[key] = size
+                self._ticks[key] = self.budget.tick()
+                self.budget.charge(size)
+            while len(self._entries) > self.max_entries:
+                self.evict_oldest()
+            if self.budget is not None:
+                self.budget.make_room(keep=(self, key))
+            return True
+
+    def get_or_compute(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Concurrent misses on the same key wait for the one computation already in flight.
+        """
+        with self._lock:
+            value = self.get(key)
+            if value is not None:
+                return value
+            pending = self._pending.get(key)
+            computing = pending is None
+            if computing:
+                pending = self._pending[key] = Future()
+        if not computing:
+            return pending.result()
+
+        try:
+            logger.debug("Scan cache miss for %s", key)
+            value = factory()
+            self.put(key, value)
+            pending.set_result(value)
+            return value
+        except BaseException as e:
+            # Threads waiting on this key get the same error rather than retrying at once
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._pending[key]
+
+    def _remove(self, key: Hashable) -> None:
+        if key in self._entries:
+            del self._entries[key]
+            if self.budget is not None:
+                self.budget.charge(-self._sizes.pop(key))
+                del self._ticks[key]
+
+    def oldest_tick(self, keep: Any = None) -> Optional[int]:
+        """Use stamp of the least recently used entry, skipping `keep` = (cache, key)."""
+        with self._lock:
+            for key in self._entries:
+                if keep != (self, key):
+                    return self._ticks.get(key, -1)
+            return None
+
+    def evict_oldest(self, keep: Any = None) -> None:
+        """Drop the least recently used entry, skipping `keep` = (cache, key)."""
+        with self._lock:
+            for key in self._entries:
+                if keep != (self, key):
+                    self._remove(key)
+                    logger.debug("Evicted %s from %s cache", key, self.name)
+                    return
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+
+# Shared by all sessions served by this process
+scan_cache = ScanCache(budget=memory_budget)
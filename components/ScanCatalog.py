@@ -0,0 +1,306 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+from typing import Any, Dict, List, Optional
+import numpy as np
+from components.Scan import Scan
+
+CATALOG_DIR = os.environ.get("CYLIVIZ_CATALOG_DIR", "catalog")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    grid_key TEXT NOT NULL UNIQUE,
+    report_no TEXT, client_name TEXT COLLATE NOCASE, address TEXT, report_date TEXT, po_number TEXT,
+    date_inspection TEXT, part_name TEXT COLLATE NOCASE, material TEXT, drawing_number TEXT COLLATE NOCASE,
+    make TEXT, model TEXT, sr_no TEXT, unit TEXT,
+    outer_dia REAL, test_area REAL, height REAL, total_height REAL,
+    nominal_thickness REAL, design_thickness REAL, threshold_thickness REAL, threshold_type TEXT,
+    rows INTEGER, cols INTEGER, block_rows INTEGER, block_cols INTEGER, row_offset INTEGER,
+    grid_path TEXT NOT NULL,
+    min_thickness REAL, max_thickness REAL, mean_thickness REAL, median_thickness REAL, std_thickness REAL,
+    valid_cells INTEGER,
+    min_threshold REAL, max_threshold REAL, below_min_coverage REAL,
+    recorded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS zone_coverage (
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    zone INTEGER NOT NULL,
+    name TEXT, value_range TEXT, coverage REAL, cell_count INTEGER, avg_thickness REAL,
+    PRIMARY KEY (scan_id, zone)
+);
+CREATE TABLE IF NOT EXISTS batches (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    min_threshold REAL, max_threshold REAL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS batch_scans (
+    batch_id INTEGER NOT NULL REFERENCES batches(id) ON DELETE CASCADE,
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    status TEXT NOT NULL, error TEXT,
+    min_threshold REAL, max_threshold REAL, below_min_coverage REAL,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (batch_id, scan_id)
+);
+CREATE TABLE IF NOT EXISTS batch_zone_coverage (
+    batch_id INTEGER NOT NULL REFERENCES batches(id) ON DELETE CASCADE,
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    zone INTEGER NOT NULL,
+    name TEXT, value_range TEXT, coverage REAL, cell_count INTEGER, avg_thickness REAL,
+    PRIMARY KEY (batch_id, scan_id, zone)
+);
+CREATE INDEX IF NOT EXISTS scans_client ON scans(client_name, date_inspection);
+CREATE INDEX IF NOT EXISTS scans_part ON scans(part_name, date_inspection);
+CREATE INDEX IF NOT EXISTS scans_drawing ON scans(drawing_number, date_inspection);
+CREATE INDEX IF NOT EXISTS scans_min ON scans(min_thickness);
+CREATE INDEX IF NOT EXISTS scans_date ON scans(date_inspection);
+"""
+
+# Report fields of data-store and the catalogue columns they go to
+REPORT_COLUMNS = {
+    "report_no": "report_no", "client_name": "client_name", "address": "address", "date": "report_date",
+    "po_number": "po_number", "date_inspection": "date_inspection", "part_name": "part_name",
+    "material": "material", "drawing_number": "drawing_number", "make": "make", "model": "model",
+    "sr_no": "sr_no", "unit": "unit", "OD": "outer_dia", "TA": "test_area", "HE": "height",
+    "TH": "total_height", "NT": "nominal_thickness", "DT": "design_thickness", "TT": "threshold_thickness",
+    "threshold_type": "threshold_type"
+}
+
+
+class ScanCatalog:
+    """Embedded SQLite catalogue of processed scans with their summary statistics.
+
+    Each scan's measured block is stored once as a .npy file next to the database, so fleet-wide
+    queries and later re-analysis never reopen the original workbooks.
+    """
+
+    def __init__(self, directory: str = CATALOG_DIR):
+        self.directory = directory
+        self.path = os.path.join(directory, "scans.sqlite3")
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _setup(self) -> None:
+        """Create the directories and schema on first use."""
+        if self._ready:
+            return
+        with self._lock:
+            if not self._ready:
+                os.makedirs(os.path.join(self.directory, "grids"), exist_ok=True)
+                with closing(sqlite3.connect(self.path)) as connection:
+                    # WAL lets the history page read while a scan is being recorded
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.executescript(SCHEMA)
+                self._ready = True
+
+    def connect(self) -> sqlite3.Connection:
+        self._setup()
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys=ON")
+        return connection
+
+    def grid_path(self, grid_key: str) -> str:
+        return os.path.join("grids", hashlib.sha1(grid_key.encode()).hexdigest()[:20] + ".npy")
+
+    def save_grid(self, grid_key: str, scan: Scan) -> str:
+        """Write the measured block once; the grid key already names its content."""
+        self._setup()
+        relative = self.grid_path(grid_key)
+        path = os.path.join(self.directory, relative)
+        if not os.path.exists(path):
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as file:
+                np.save(file, scan.measured)
+            os.replace(temp_path, path)
+        return relative
+
+    def load_grid(self, row: Dict[str, Any], mmap: bool = True) -> Scan:
+        """The Scan of a catalogue row, memory-mapping its measured block by default."""
+        measured = np.load(os.path.join(self.directory, row["grid_path"]), mmap_mode="r" if mmap else None)
+        return Scan(measured, (row["rows"], row["cols"]))
+
+    def record(self, grid_key: str, scan: Scan, info: Dict[str, Any], overall_stats: Dict[str, Any],
+               zone_stats: List[Dict[str, Any]], min_threshold: float, max_threshold: float) -> int:
+        """Insert or update a scan and its zone coverage; returns the scan ID."""
+        values = {column: info.get(field) for field, column in REPORT_COLUMNS.items()}
+        values.update({
+            "grid_key": grid_key,
+            "rows": scan.rows, "cols": scan.cols,
+            "block_rows": scan.measured.shape[0], "block_cols": scan.measured.shape[1],
+            "row_offset": scan.row_offset,
+            "grid_path": self.save_grid(grid_key, scan),
+            "min_thickness": float(overall_stats["min"]), "max_thickness": float(overall_stats["max"]),
+            "mean_thickness": float(overall_stats["mean"]), "median_thickness": float(overall_stats["median"]),
+            "std_thickness": float(overall_stats["std"]), "valid_cells": int(overall_stats["total_valid_cells"]),
+            "min_threshold": float(min_threshold), "max_threshold": float(max_threshold),
+            "below_min_coverage": float(zone_stats[0]["coverage"]) if zone_stats else None,
+            "recorded_at": time.time()
+        })
+        columns = ", ".join(values)
+        updates = ", ".join(f"{column} = excluded.{column}" for column in values if column != "grid_key")
+        with closing(self.connect()) as connection, connection:
+            # RETURNING needs SQLite 3.35, so the id is read back in the same transaction instead
+            connection.execute(
+                f"INSERT INTO scans ({columns}) VALUES ({', '.join('?' * len(values))}) "
+                f"ON CONFLICT(grid_key) DO UPDATE SET {updates}",
+                list(values.values())
+            )
+            scan_id = connection.execute("SELECT id FROM scans WHERE grid_key = ?", (grid_key,)).fetchone()[0]
+            ScanCatalog._write_zones(connection, scan_id, zone_stats)
+        return scan_id
+
+    @staticmethod
+    def _zone_rows(zone_stats: List[Dict[str, Any]]) -> List[tuple]:
+        return [(i, zone["name"], zone["threshold_value_range_str_mm"], float(zone["coverage"]),
+                 int(zone["count"]), float(zone["avg_thickness"])) for i, zone in enumerate(zone_stats)]
+
+    @staticmethod
+    def _write_zones(connection: sqlite3.Connection, scan_id: int, zone_stats: List[Dict[str, Any]]) -> None:
+        connection.execute("DELETE FROM zone_coverage WHERE scan_id = ?", (scan_id,))
+        connection.executemany(
+            "INSERT INTO zone_coverage (scan_id, zone, name, value_range, coverage, cell_count, avg_thickness) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(scan_id,) + row for row in ScanCatalog._zone_rows(zone_stats)]
+        )
+
+    def update_statistics(self, scan_id: int, zone_stats: List[Dict[str, Any]],
+                          min_threshold: float, max_threshold: float) -> None:
+        """Replace the zone coverage of a scan after re-analysis with new thresholds."""
+        with closing(self.connect()) as connection, connection:
+            connection.execute(
+                "UPDATE scans SET min_threshold = ?, max_threshold = ?, below_min_coverage = ? WHERE id = ?",
+                (float(min_threshold), float(max_threshold),
+                 float(zone_stats[0]["coverage"]) if zone_stats else None, scan_id)
+            )
+            ScanCatalog._write_zones(connection, scan_id, zone_stats)
+
+    def search(self, client: Optional[str] = None, part: Optional[str] = None,
+               below: Optional[float] = None, since: Optional[str] = None, until: Optional[str] = None,
+               limit: int = 500) -> List[Dict[str, Any]]:
+        """Scans matching all given filters, newest inspection first.
+
+        client and part match as prefixes (so the indexes apply); below keeps scans whose minimum
+        thickness is under the value; since/until bound the inspection date (ISO strings).
+        """
+        clauses, parameters = [], []
+        if client:
+            clauses.append("client_name LIKE ? ESCAPE '\\'")
+            parameters.append(ScanCatalog._prefix(client))
+        if part:
+            clauses.append("(part_name LIKE ? ESCAPE '\\' OR drawing_number LIKE ? ESCAPE '\\')")
+            parameters += [ScanCatalog._prefix(part)] * 2
+        if below is not None:
+            clauses.append("min_thickness < ?")
+            parameters.append(float(below))
+        if since:
+            clauses.append("date_inspection >= ?")
+            parameters.append(since)
+        if until:
+            clauses.append("date_inspection <= ?")
+            parameters.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self.connect()) as connection:
+            rows = connection.execute(
+                f"SELECT * FROM scans {where} ORDER BY date_inspection DESC, recorded_at DESC LIMIT ?",
+                parameters + [int(limit)]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def zones(self, scan_id: int) -> List[Dict[str, Any]]:
+        with closing(self.connect()) as connection:
+            rows = connection.execute("SELECT * FROM zone_coverage WHERE scan_id = ? ORDER BY zone", (scan_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def start_batch(self, name: str, min_threshold: Optional[float], max_threshold: Optional[float]) -> int:
+        """ID of the named re-analysis batch, created if new.
+
+        Reusing a name resumes that batch, so its thresholds must match the ones it was started with.
+        """
+        with closing(self.connect()) as connection, connection:
+            row = connection.execute("SELECT * FROM batches WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                return connection.execute(
+                    "INSERT INTO batches (name, min_threshold, max_threshold, created_at) VALUES (?, ?, ?, ?)",
+                    (name, min_threshold, max_threshold, time.time())
+                ).lastrowid
+        if (row["min_threshold"], row["max_threshold"]) != (min_threshold, max_threshold):
+            raise ValueError(f"Batch {name!r} was started with Min {row['min_threshold']} and Max "
+                             f"{row['max_threshold']}; use a new name for other thresholds.")
+        return row["id"]
+
+    def batch_done(self, batch_id: int) -> set:
+        """IDs of the scans a batch has already analyzed; failed scans are retried."""
+        with closing(self.connect()) as connection:
+            rows = connection.execute("SELECT scan_id FROM batch_scans WHERE batch_id = ? AND status = 'done'",
+                                      (batch_id,)).fetchall()
+        return {row[0] for row in rows}
+
+    def record_batch_results(self, batch_id: int, results: List[Dict[str, Any]], apply: bool = False) -> None:
+        """Store the outcome of several scans of a batch in one transaction.
+
+        Each result has scan_id, min_threshold, max_threshold and either zone_stats or error. With
+        apply, the successful results also become the scans' current statistics in the same
+        transaction, so a scan is never marked done without being applied.
+        """
+        now = time.time()
+        with closing(self.connect()) as connection, connection:
+            for result in results:
+                zone_stats = result.get("zone_stats") or []
+                connection.execute(
+                    "INSERT OR REPLACE INTO batch_scans (batch_id, scan_id, status, error, min_threshold, "
+                    "max_threshold, below_min_coverage, finished_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (batch_id, result["scan_id"], "failed" if result.get("error") else "done", result.get("error"),
+                     result["min_threshold"], result["max_threshold"],
+                     float(zone_stats[0]["coverage"]) if zone_stats else None, now)
+                )
+                connection.execute("DELETE FROM batch_zone_coverage WHERE batch_id = ? AND scan_id = ?",
+                                   (batch_id, result["scan_id"]))
+                connection.executemany(
+                    "INSERT INTO batch_zone_coverage (batch_id, scan_id, zone, name, value_range, coverage, "
+                    "cell_count, avg_thickness) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(batch_id, result["scan_id"]) + row for row in ScanCatalog._zone_rows(zone_stats)]
+                )
+            if apply:
+                ScanCatalog._apply_batch(connection, batch_id, [result["scan_id"] for result in results])
+
+    def apply_batch(self, batch_id: int) -> None:
+        """Make every scan a batch has analyzed take the batch's results as its current statistics."""
+        with closing(self.connect()) as connection, connection:
+            ScanCatalog._apply_batch(connection, batch_id)
+
+    @staticmethod
+    def _apply_batch(connection: sqlite3.Connection, batch_id: int, scan_ids: Optional[List[int]] = None) -> None:
+        """Copy the thresholds and zone coverage of a batch's done scans (or those of scan_ids) to the scans."""
+        selected = "SELECT scan_id FROM batch_scans WHERE batch_id = ? AND status = 'done'"
+        parameters = [batch_id]
+        if scan_ids is not None:
+            selected += f" AND scan_id IN ({', '.join('?' * len(scan_ids))})"
+            parameters += list(scan_ids)
+        # Correlated subqueries rather than UPDATE ... FROM, which needs SQLite 3.33
+        connection.execute(
+            "UPDATE scans SET (min_threshold, max_threshold, below_min_coverage) = ("
+            "SELECT min_threshold, max_threshold, below_min_coverage FROM batch_scans "
+            f"WHERE batch_id = ? AND scan_id = scans.id) WHERE id IN ({selected})",
+            [batch_id] + parameters
+        )
+        connection.execute(f"DELETE FROM zone_coverage WHERE scan_id IN ({selected})", parameters)
+        connection.execute(
+            "INSERT INTO zone_coverage (scan_id, zone, name, value_range, coverage, cell_count, avg_thickness) "
+            "SELECT scan_id, zone, name, value_range, coverage, cell_count, avg_thickness FROM batch_zone_coverage "
+            f"WHERE batch_id = ? AND scan_id IN ({selected})",
+            [batch_id] + parameters
+        )
+
+    @staticmethod
+    def _prefix(text: str) -> str:
+        """LIKE pattern matching values that start with text, with wildcards in text escaped."""
+        return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+# Shared by all sessions served by this process
+scan_catalog = ScanCatalog()
@@ -0,0 +1,119 @@
+from typing import Any, Dict, Tuple
+import numpy as np
+from components.ScanCache import scan_cache
+from components.Scan import Scan
+from components.BandPool import BandPool
+
+
+class ThicknessIndex:
+    """Sorted valid thickness values with prefix sums, answering range statistics in O(log n)."""
+
+    def __init__(self, property_value: np.ndarray, workers: int = None):
+        """Build the index from thickness values; NaN marks unmeasured cells.
+
+        Bands of values are sorted and summarized on the thread pool, then merged: the sorted runs
+        with one stable (run-merging) sort, the moments with the parallel variance formula.
+        """
+        data = np.asarray(property_value, dtype=float).ravel()
+        parts = BandPool.map(ThicknessIndex._band_summary, data, workers)
+        runs = [part[0] for part in parts]
+        self.values = np.sort(np.concatenate(runs), kind='stable') if len(runs) > 1 else (runs[0] if runs else data[:0])
+        self.prefix_sum = ThicknessIndex._prefix_sum(self.values, workers)
+
+        # Overall statistics do not depend on thresholds, so compute them exactly once
+        if self.values.size > 0:
+            count, mean, m2 = 0, 0.0, 0.0
+            for _, part_count, part_mean, part_m2 in parts:
+                if part_count == 0:
+                    continue
+                combined = count + part_count
+                delta = part_mean - mean
+                mean += delta * part_count / combined
+                m2 += part_m2 + delta ** 2 * count * part_count / combined
+                count = combined
+            self.overall_stats = {
+                'min': self.values[0],
+                'max': self.values[-1],
+                'mean': mean,
+                'median': self.percentile(50),
+                'std': np.sqrt(m2 / count),
+                'total_valid_cells': self.values.size
+            }
+        else:
+            self.overall_stats = {'min': 0, 'max': 0, 'mean': 0, 'median': 0, 'std': 0, 'total_valid_cells': 0}
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.prefix_sum.nbytes
+
+    @staticmethod
+    def _band_summary(band_values: np.ndarray, band: slice) -> Tuple[np.ndarray, int, float, float]:
+        """Sorted valid values of one band with their count, mean and sum of squared deviations."""
+        valid = band_values[~np.isnan(band_values)]
+        if valid.size == 0:
+            return valid, 0, 0.0, 0.0
+        mean = float(valid.mean())
+        return np.sort(valid), int(valid.size), mean, float(((valid - mean) ** 2).sum())
+
+    @staticmethod
+    def _prefix_sum(values: np.ndarray, workers: int = None) -> np.ndarray:
+        """[0, cumsum(values)], with each band summed on the pool and offset by the bands before it."""
+        prefix = np.empty(values.size + 1)
+        prefix[0] = 0.0
+
+        def band_cumsum(band_values, band):
+            np.cumsum(band_values, out=prefix[band.start + 1:band.stop + 1])
+            return band
+
+        bands = BandPool.map(band_cumsum, values, workers)
+        # Each band is then offset by the running total of the bands before it
+        offsets, total = {}, 0.0
+        for band in bands:
+            offsets[band.start] = total
+            total += prefix[band.stop]
+
+        def add_offset(band_values, band):
+            prefix[band.start + 1:band.stop + 1] += offsets[band.start]
+
+        BandPool.map(add_offset, values, workers)
+        return prefix
+
+    @staticmethod
+    def for_scan(grid_key: str, scan: Scan) -> "ThicknessIndex":
+        """Return the cached index of a scan, building it from its valid values on first use."""
+        return scan_cache.get_or_compute(("index", grid_key), lambda: ThicknessIndex(scan.valid_values))
+
+    @property
+    def size(self) -> int:
+        return self.values.size
+
+    def range_bounds(self, low: float, high: float,
+                     low_inclusive: bool = True, high_inclusive: bool = True) -> Tuple[int, int]:
+        """Return the [start, end) slice of sorted values that lies within the given range."""
+        start = np.searchsorted(self.values, low, side='left' if low_inclusive else 'right')
+        end = np.searchsorted(self.values, high, side='right' if high_inclusive else 'left')
+        return int(start), int(max(start, end))
+
+    def range_stats(self, low: float, high: float,
+                    low_inclusive: bool = True, high_inclusive: bool = True) -> Dict[str, Any]:
+        """Count, coverage and mean thickness of the values within a range."""
+        start, end = self.range_bounds(low, high, low_inclusive, high_inclusive)
+        count = end - start
+        return {
+            'count': count,
+            'coverage': count / self.size if self.size > 0 else 0.0,
+            'avg_thickness': (self.prefix_sum[end] - self.prefix_sum[start]) / count if count > 0 else 0.0
+        }
+
+    def percentile(self, q: float) -> float:
+        """Percentile of the valid values, using the same linear interpolation as np.percentile."""
+        if self.size == 0:
+            return 0.0
+        rank = (q / 100) * (self.size - 1)
+        lower = int(np.floor(rank))
+        upper = min(lower + 1, self.size - 1)
+        fraction = rank - lower
+        return self.values[lower] + (self.values[upper] - self.values[lower]) * fraction
+
+    def median(self) -> float:
+        return self.percentile(50)
@@ -0,0 +1,89 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+TILE_DIR = os.environ.get("CYLIVIZ_TILE_DIR", "tile_cache")
+TILE_CACHE_MB = int(os.environ.get("CYLIVIZ_TILE_CACHE_MB", "256"))
+
+
+class TileCache:
+    """Rendered tiles on local disk, evicted least recently used first once over the size limit."""
+
+    def __init__(self, directory: str = TILE_DIR, max_bytes: int = TILE_CACHE_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> size in bytes, oldest first
+        self._total = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".png")
+
+    def _load(self) -> None:
+        """Pick up tiles left by a previous run, oldest first by modification time."""
+        if self._loaded:
+            return
+        self._loaded = True
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".png"):
+                    stat = os.stat(os.path.join(root, name))
+                    found.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            logger.debug("Evicted tile %s", key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached tile and mark it as recently used."""
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), "rb") as tile_file:
+                data = tile_file.read()
+            # mtime carries the LRU order over to the next run
+            os.utime(self._path(key))
+            return data
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(key, 0)
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Write a tile, evicting the least recently used tiles when over the limit."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial tile
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as tile_file:
+            tile_file.write(data)
+        os.replace(temp_path, path)
+
+        with self._lock:
+            self._load()
+            self._total += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+
+# Shared by all sessions served by this process
+tile_cache = TileCache()
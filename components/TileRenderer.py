@@ -0,0 +1,157 @@
+import math
+import struct
+import zlib
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+import numpy as np
+import plotly.colors
+import plotly.express as px
+from components.Scan import Scan
+from components.ScanCache import scan_cache
+from components.MemoryBudget import memory_budget
+from components.TileCache import tile_cache
+from components.Visualizer import Visualizer
+
+TILE_SIZE = 256
+# Roughly the graph width in screen pixels; the zoom level is picked so a tile pixel is about one screen pixel
+TARGET_PIXELS = 1024
+# Cells per axis of the invisible heatmap that turns cursor positions into hover events
+HOVER_SAMPLES = 256
+# Rough peak bytes per grid cell while the palette indices of the whole grid are computed
+COLOR_INDICES_BYTES_PER_CELL = 16
+
+
+class TileRenderer:
+    """Renders the colour-mapped 2D grid as a pyramid of palette PNG tiles.
+
+    Level 0 is full resolution; each level up samples every other row and column of the one below.
+    Tiles are numbered from the bottom-left of the unrolled map, like the grid rows and columns.
+    """
+
+    @staticmethod
+    def max_level(scan: Scan) -> int:
+        """Coarsest level, at which the whole grid fits in a single tile."""
+        return max(0, math.ceil(math.log2(max(scan.rows, scan.cols) / TILE_SIZE)))
+
+    @staticmethod
+    def palette_rgb() -> List[Tuple[int, int, int]]:
+        """RGB colours of the palette indices produced by Visualizer.set_color_indices."""
+        return [(128, 128, 128)] + [plotly.colors.hex_to_rgb(color) for color in px.colors.sequential.Turbo_r]
+
+    @staticmethod
+    def color_indices(grid_key: str, scan: Scan, thickness: float, threshold_thickness: float):
+        """Cached Visualizer.set_color_indices output for the whole grid."""
+        def build():
+            # The full grid and its palette positions, on top of the indices that are kept
+            with memory_budget.reserve(COLOR_INDICES_BYTES_PER_CELL * scan.rows * scan.cols, "Colouring the tiles of this scan"):
+                return Visualizer.set_color_indices(scan.grid(fill=np.nan), threshold_thickness, thickness)
+        return scan_cache.get_or_compute(("tile-indices", grid_key, thickness, threshold_thickness), build)
+
+    @staticmethod
+    def encode_png(indices: np.ndarray, palette: List[Tuple[int, int, int]]) -> bytes:
+        """Encode a 2D uint8 array as an 8-bit palette PNG. Row 0 is the top of the image."""
+        height, width = indices.shape
+
+        def chunk(tag: bytes, data: bytes) -> bytes:
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+        # Every scanline starts with filter type 0 (none)
+        scanlines = np.zeros((height, width + 1), dtype=np.uint8)
+        scanlines[:, 1:] = indices
+        return b"".join([
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+            chunk(b"PLTE", bytes(channel for color in palette for channel in color)),
+            chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 6)),
+            chunk(b"IEND", b"")
+        ])
+
+    @staticmethod
+    def tile_bounds(scan: Scan, level: int, tile_x: int, tile_y: int) -> Tuple[int, int, int, int]:
+        """First row, first column and the sampled height and width of a tile, in cells and pixels."""
+        stride = 2 ** level
+        span = TILE_SIZE * stride
+        row0, col0 = tile_y * span, tile_x * span
+        height = len(range(row0, min(row0 + span, scan.rows), stride))
+        width = len(range(col0, min(col0 + span, scan.cols), stride))
+        return row0, col0, height, width
+
+    @staticmethod
+    def tile_png(grid_key: str, scan: Optional[Scan], thickness: float, threshold_thickness: float,
+                 level: int, tile_x: int, tile_y: int) -> Optional[bytes]:
+        """Return a tile from the disk cache, rendering it if the scan is available."""
+        key = hashlib.sha1(
+            f"{grid_key}|{thickness}|{threshold_thickness}|{level}|{tile_x}|{tile_y}".encode()
+        ).hexdigest()
+        cached = tile_cache.get(key)
+        if cached is not None or scan is None:
+            return cached
+
+        if not 0 <= level <= TileRenderer.max_level(scan):
+            return None
+        row0, col0, height, width = TileRenderer.tile_bounds(scan, level, tile_x, tile_y)
+        if tile_x < 0 or tile_y < 0 or height == 0 or width == 0:
+            return None
+
+        indices = TileRenderer.color_indices(grid_key, scan, thickness, threshold_thickness)[0]
+        stride = 2 ** level
+        tile = indices[row0:row0 + height * stride:stride, col0:col0 + width * stride:stride]
+        # Grid rows go up the map, image rows go down
+        png = TileRenderer.encode_png(np.flipud(tile), TileRenderer.palette_rgb())
+        tile_cache.put(key, png)
+        return png
+
+    @staticmethod
+    def cell_window(scan: Scan, x_range: Optional[List[float]], y_range: Optional[List[float]]) -> Tuple[int, int, int, int]:
+        """Rows and columns [row_lo, row_hi) x [col_lo, col_hi) visible for the given axis ranges."""
+        col_step = 2 * np.pi / (scan.cols - 1) if scan.cols > 1 else 1.0
+        row_step = scan.rows / (scan.rows - 1) if scan.rows > 1 else 1.0
+
+        def span(axis_range, step, count):
+            if not axis_range:
+                return 0, count
+            low, high = sorted(axis_range)
+            return (min(max(int(np.floor(low / step)), 0), count - 1),
+                    min(max(int(np.ceil(high / step)) + 1, 1), count))
+
+        row_lo, row_hi = span(y_range, row_step, scan.rows)
+        col_lo, col_hi = span(x_range, col_step, scan.cols)
+        return row_lo, row_hi, col_lo, col_hi
+
+    @staticmethod
+    def layout_images(grid_key: str, scan: Scan, thickness: float, threshold_thickness: float,
+                      x_range: Optional[List[float]] = None, y_range: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """Layout images for the tiles covering the visible window, at about one cell per screen pixel."""
+        row_lo, row_hi, col_lo, col_hi = TileRenderer.cell_window(scan, x_range, y_range)
+        visible = max(row_hi - row_lo, col_hi - col_lo)
+        level = min(max(math.ceil(math.log2(max(visible / TARGET_PIXELS, 1))), 0), TileRenderer.max_level(scan))
+        span = TILE_SIZE * 2 ** level
+
+        col_step = 2 * np.pi / (scan.cols - 1) if scan.cols > 1 else 1.0
+        row_step = scan.rows / (scan.rows - 1) if scan.rows > 1 else 1.0
+        query = urlencode({"key": grid_key, "t": thickness, "tt": threshold_thickness})
+
+        images = []
+        for tile_y in range(row_lo // span, (row_hi - 1) // span + 1):
+            for tile_x in range(col_lo // span, (col_hi - 1) // span + 1):
+                row0, col0, height, width = TileRenderer.tile_bounds(scan, level, tile_x, tile_y)
+                stride = 2 ** level
+                images.append(dict(
+                    source=f"/tiles/{level}/{tile_x}/{tile_y}.png?{query}",
+                    xref="x", yref="y",
+                    x=(col0 - 0.5) * col_step, y=(row0 + height * stride - 0.5) * row_step,
+                    sizex=width * stride * col_step, sizey=height * stride * row_step,
+                    xanchor="left", yanchor="top",
+                    sizing="stretch", layer="below"
+                ))
+        return images
+
+    @staticmethod
+    def hover_samples(scan: Scan, x_range: Optional[List[float]] = None,
+                      y_range: Optional[List[float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column numbers sampled across the visible window for the hover heatmap."""
+        row_lo, row_hi, col_lo, col_hi = TileRenderer.cell_window(scan, x_range, y_range)
+        rows = np.arange(row_lo, row_hi, max(1, -(-(row_hi - row_lo) // HOVER_SAMPLES)))
+        cols = np.arange(col_lo, col_hi, max(1, -(-(col_hi - col_lo) // HOVER_SAMPLES)))
+        return rows, cols
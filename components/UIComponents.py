@@ -130,8 +130,11 @@ from dash import html, dcc
 
 class UIComponents:
     @staticmethod
-    def create_input_field(label: str, input_id: str) -> html.Div:
-        """Create a styled input field with label with increased breadth and modern look, ensuring two items fit in a line."""
+    def create_input_field(label: str, input_id: str, debounce: bool = True) -> html.Div:
+        """Create a styled input field with label with increased breadth and modern look, ensuring two items fit in a line.
+
+        With debounce enabled the value is only sent when the field loses focus or Enter is pressed.
+        """
         return html.Div([
             html.Label(f"{label}:", style={
                 "font-size": "12px",
@@ -143,6 +146,7 @@ class UIComponents:
             dcc.Input(
                 id=input_id,
                 type='text',
+                debounce=debounce,
                 placeholder=f'Enter {label}',
                 style={
                     "font-size": "14px",
@@ -1,17 +1,29 @@
+import base64
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
 import numpy as np
 import plotly.graph_objects as go
+import plotly.io as pio
 import plotly.colors
 import plotly.express as px
+from dash import Patch
 from components.Mapper import Mapper
+from components.Scan import Scan
+from components.CylinderMesh import CylinderMesh
+
+# Largest gap, as a fraction of the radius, allowed between a merged mesh block's edge and the true arc
+MESH_MAX_SAGITTA = 5e-4
+MESH_MAX_LEVEL = 6
 
 class Visualizer:
     """Class to create 2D and 3D visualizations with configurable value ranges."""
 
     @staticmethod
-    def set_color_ranges(property_value, min_thickness, design_thickness, percent_gap=25):
+    def set_color_ranges(property_value, min_thickness, design_thickness, percent_gap=25, colors=None):
+        """Build the colorscale and colorbar ticks. Unmeasured cells in property_value are NaN."""
         # Create custom colorscale
         zmin, zmax = min_thickness, design_thickness
-        colors = px.colors.sequential.Turbo_r
+        colors = colors or px.colors.sequential.Turbo_r
         
         # Create colorscale with gray for -1
         custom_colorscale = [
@@ -30,8 +42,8 @@ class Visualizer:
         # Add the end of the colorscale
         custom_colorscale.append([1, colors[len(colors)-1]])
 
-        # Find max value in actual data (excluding -1 values)
-        max_data_value = np.max(property_value[property_value != -1]) if np.any(property_value != -1) else zmax
+        # Find max value in actual data (excluding unmeasured cells)
+        max_data_value = np.nanmax(property_value) if not np.all(np.isnan(property_value)) else zmax
         
         # Create ticks for the colorbar based on percent_gap
         if max_data_value > zmax:
@@ -58,9 +70,103 @@ class Visualizer:
         return custom_colorscale, zmin, zmax, tickvals, ticktext, max_data_value
 
     @staticmethod
-    def create_3d_figure(property_value: np.ndarray, radius: float, rows: int, cols: int,
-                        thickness: float, threshold_thickness: float) -> go.Figure:
-        """Generate 3D visualization with configurable value ranges."""
+    def typed_array(values: np.ndarray) -> Dict[str, str]:
+        """Encode an array as a plotly.js typed array spec so it is sent as base64 in its own dtype."""
+        values = np.ascontiguousarray(values)
+        return {
+            "dtype": values.dtype.str[1:],
+            "bdata": base64.b64encode(values.tobytes()).decode(),
+            "shape": ", ".join(str(n) for n in values.shape)
+        }
+
+    @staticmethod
+    def set_color_indices(property_value: np.ndarray, min_thickness: float, design_thickness: float,
+                          percent_gap=25, colors=None) -> Tuple[np.ndarray, List[List[Any]], float, float, List[float], List[str]]:
+        """Quantize cells to indices into a discrete palette (grey + Turbo_r) for compact transport.
+
+        Matches set_color_ranges: unmeasured cells and values at or below the minimum are grey, and
+        each Turbo_r colour covers an equal share of the range. Returns the uint8 indices, the
+        discrete colorscale, its zmin/zmax and the colorbar tick positions and labels.
+        """
+        _, zmin, zmax, tickvals, ticktext, max_data_value = Visualizer.set_color_ranges(
+            property_value, min_thickness, design_thickness, percent_gap
+        )
+        colors = colors or px.colors.sequential.Turbo_r
+        palette = ["grey"] + list(colors)
+        cmax = max(zmax, max_data_value)
+
+        with np.errstate(invalid='ignore'):
+            position = (property_value - zmin) / (cmax - zmin)
+            indices = np.clip(np.ceil(position * len(colors)), 1, len(colors))
+            indices[~(position > 0)] = 0  # NaN and values at or below the minimum
+        indices = indices.astype(np.uint8)
+
+        discrete_colorscale = []
+        for i, color in enumerate(palette):
+            discrete_colorscale.append([i / len(palette), color])
+            discrete_colorscale.append([(i + 1) / len(palette), color])
+
+        # Index i spans [i - 0.5, i + 0.5], so a value at fraction p of the range sits at 0.5 + p * N
+        tick_positions = [float(0.5 + (val - zmin) / (cmax - zmin) * len(colors)) for val in tickvals]
+        return indices, discrete_colorscale, -0.5, len(palette) - 0.5, tick_positions, ticktext
+
+    @staticmethod
+    def color_layer(view_type: str, scan: Scan, thickness: float, threshold_thickness: float,
+                    quantize: bool = False) -> Dict[str, Any]:
+        """Properties of the cell trace that depend on the thresholds, to merge over a figure built with others.
+
+        Plain figures only need the colour range and colorbar ticks; palette-index figures also need
+        their cells re-quantized.
+        """
+        if quantize:
+            indices, _, _, _, tick_positions, ticktext = Visualizer.set_color_indices(
+                scan.grid(fill=np.nan), threshold_thickness, thickness
+            )
+            return {
+                "surfacecolor" if view_type == '3d' else "z": Visualizer.typed_array(indices),
+                "colorbar": {"tickvals": tick_positions, "ticktext": ticktext}
+            }
+        _, zmin, zmax, tickvals, ticktext, max_data_value = Visualizer.set_color_ranges(
+            scan.measured, threshold_thickness, thickness
+        )
+        low, high = ("cmin", "cmax") if view_type == '3d' else ("zmin", "zmax")
+        return {
+            low: zmin,
+            high: max(zmax, max_data_value),
+            "colorbar": {"tickvals": tickvals, "ticktext": ticktext}
+        }
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _default_template() -> Dict[str, Any]:
+        """The default plotly template as plain JSON, which go.Figure would otherwise attach."""
+        return pio.templates[pio.templates.default].to_plotly_json()
+
+    @staticmethod
+    def _encode_arrays(value: Any) -> Any:
+        """Recursively replace numpy arrays with typed array specs (or lists, for text)."""
+        if isinstance(value, dict):
+            return {key: Visualizer._encode_arrays(item) for key, item in value.items()}
+        if isinstance(value, np.ndarray):
+            if value.dtype.kind in "OSU":
+                return value.tolist()
+            return Visualizer.typed_array(value)
+        return value
+
+    @staticmethod
+    def _figure_dict(traces: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Assemble a figure dict from (type, properties) pairs without graph_objects validation."""
+        return {
+            "data": [{"type": trace_type, **Visualizer._encode_arrays(props)} for trace_type, props in traces],
+            "layout": {"template": Visualizer._default_template()}
+        }
+
+    @staticmethod
+    def _surface_trace(scan: Scan, radius: float, thickness: float, threshold_thickness: float,
+                       quantize: bool) -> Tuple[Dict[str, Any], np.ndarray, np.ndarray, np.ndarray]:
+        """Properties of the cylinder surface, plus the x, y and z coordinates for the grid lines."""
+        rows, cols = scan.shape
+        property_value = scan.grid()
         # Add second surface for actual values
         theta = np.linspace(0, 2 * np.pi, cols)
         z = np.linspace(0, rows, rows)
@@ -70,24 +176,32 @@ class Visualizer:
         y = radius * np.sin(theta)
         angle = theta*(180/np.pi)
 
+        if quantize:
+            indices, colorscale, cmin, cmax, tick_positions, ticktext = Visualizer.set_color_indices(
+                scan.grid(fill=np.nan), threshold_thickness, thickness
+            )
+            surface = dict(
+                z=z_grid, x=x, y=y,
+                cmin=cmin, cmax=cmax,
+                colorscale=colorscale,
+                surfacecolor=indices,
+                colorbar=dict(title=dict(text="Property Values"), tickvals=tick_positions, ticktext=ticktext, tickmode="array"),
+                hoverinfo='none'
+            )
+            return surface, x, y, z
+
         # Create hover text
         hover_text = np.empty_like(x, dtype=object)
         for i in range(rows):
             for j in range(cols):
                 value = property_value[i][j]
-                if value == -1: 
-                    status = "Not Measured"
-                else: 
-                    status = "Above threshold"
                 hover_text[i, j] = (f"Angle: {angle[i][j]//1} "
                                     f"Row: {i}, Column: {j}, "
                                     f"Value: {value:.2f}")
         
-        custom_colorscale, zmin, zmax, tickvals, ticktext, max_data_value = Visualizer.set_color_ranges(property_value,threshold_thickness,thickness)
-        
+        custom_colorscale, zmin, zmax, tickvals, ticktext, max_data_value = Visualizer.set_color_ranges(scan.measured,threshold_thickness,thickness)
         
-        fig = go.Figure()
-        fig.add_trace(go.Surface(
+        surface = dict(
             z=z_grid,
             x=x,
             y=y,
@@ -96,38 +210,58 @@ class Visualizer:
             colorscale=custom_colorscale,
             surfacecolor=property_value,
             colorbar=dict(
-                title="Property Values",
+                title=dict(text="Property Values"),
                 tickvals=tickvals,
                 ticktext=ticktext,
                 tickmode="array"
             ),
             text=hover_text,
             hoverinfo='text'
-        ))
-        
-        # Add grid lines
+        )
+        return surface, x, y, z
+
+    @staticmethod
+    def _grid_line_traces(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> List[Dict[str, Any]]:
+        """Properties of the Scatter3d traces drawing the row and column lines of the cylinder grid."""
+        rows, cols = x.shape
+        lines = []
         for i in range(rows):
-            fig.add_trace(go.Scatter3d(
+            lines.append(dict(
                 x=x[i, :], y=y[i, :], z=np.full(cols, z[i]),
                 mode='lines', line=dict(color='black', width=2),
                 showlegend=False
             ))
 
         for j in range(cols):
-            fig.add_trace(go.Scatter3d(
+            lines.append(dict(
                 x=x[:, j], y=y[:, j], z=z,
                 mode='lines', line=dict(color='black', width=1),
                 showlegend=False
             ))
 
-        return fig
+        return lines
 
     @staticmethod
-    def create_2d_figure(df: np.ndarray, property_value: np.ndarray, rows: int, cols: int, 
-                    thickness: float, threshold_thickness: float) -> go.Figure:
-        """Generate 2D visualization with configurable value ranges."""
+    def _heatmap_trace(scan: Scan, thickness: float, threshold_thickness: float, quantize: bool,
+                       title: str = "Property Values", colors=None) -> Dict[str, Any]:
+        """Properties of the unrolled 2D heatmap."""
+        rows, cols = scan.shape
         theta = np.linspace(0, 2 * np.pi, cols)
         z = np.linspace(0, rows, rows)
+
+        if quantize:
+            indices, colorscale, zmin, zmax, tick_positions, ticktext = Visualizer.set_color_indices(
+                scan.grid(fill=np.nan), threshold_thickness, thickness, colors=colors
+            )
+            return dict(
+                x=theta, y=z, z=indices,
+                zmin=zmin, zmax=zmax,
+                colorscale=colorscale,
+                colorbar=dict(title=dict(text=title), tickvals=tick_positions, ticktext=ticktext, tickmode="array"),
+                hoverinfo='none'
+            )
+
+        property_value = scan.grid()
         theta, z_grid = np.meshgrid(theta, z)
         hover_text = []
         
@@ -138,12 +272,9 @@ class Visualizer:
                 row_text.append(f"Row: {i}, Column: {j}, Value: {value:.2f}")
             hover_text.append(row_text) 
         
-        custom_colorscale, zmin, zmax, tickvals, ticktext, max_data_value = Visualizer.set_color_ranges(property_value, threshold_thickness,thickness)
+        custom_colorscale, zmin, zmax, tickvals, ticktext, max_data_value = Visualizer.set_color_ranges(scan.measured, threshold_thickness,thickness, colors=colors)
     
-        
-        # Create figure
-        fig = go.Figure()
-        fig.add_trace(go.Heatmap(
+        return dict(
             x=np.ravel(theta),
             y=np.ravel(z_grid),
             z=np.ravel(property_value),
@@ -151,13 +282,136 @@ class Visualizer:
             zmax=max(zmax, max_data_value),  # Ensure colorbar covers all data
             colorscale=custom_colorscale,
             colorbar=dict(
-                title="Property Values",
+                title=dict(text=title),
                 tickvals=tickvals,
                 ticktext=ticktext,
                 tickmode="array"
             ),
             text=np.ravel(hover_text),
             hoverinfo='text'
-        ))
-        
-        return fig
\ No newline at end of file
+        )
+
+    @staticmethod
+    def create_3d_figure(scan: Scan, radius: float,
+                        thickness: float, threshold_thickness: float, quantize: bool = False) -> go.Figure:
+        """Generate 3D visualization with configurable value ranges.
+
+        With quantize, cells are sent as uint8 palette indices without hover text; exact values
+        are looked up on hover instead.
+        """
+        surface, x, y, z = Visualizer._surface_trace(scan, radius, thickness, threshold_thickness, quantize)
+        fig = go.Figure(go.Surface(**surface))
+        for line in Visualizer._grid_line_traces(x, y, z):
+            fig.add_trace(go.Scatter3d(**line))
+        return fig
+
+    @staticmethod
+    def create_3d_figure_dict(scan: Scan, radius: float, thickness: float, threshold_thickness: float,
+                              quantize: bool = False) -> Dict[str, Any]:
+        """Same figure as create_3d_figure, built as a plain dict with arrays pre-encoded for transport."""
+        surface, x, y, z = Visualizer._surface_trace(scan, radius, thickness, threshold_thickness, quantize)
+        lines = Visualizer._grid_line_traces(x, y, z)
+        return Visualizer._figure_dict([("surface", surface)] + [("scatter3d", line) for line in lines])
+
+    @staticmethod
+    def create_2d_figure(scan: Scan, thickness: float, threshold_thickness: float, quantize: bool = False) -> go.Figure:
+        """Generate 2D visualization with configurable value ranges.
+
+        With quantize, cells are sent as a 2D uint8 palette-index array on shared axes and
+        without hover text; exact values are looked up on hover instead.
+        """
+        return go.Figure(go.Heatmap(**Visualizer._heatmap_trace(scan, thickness, threshold_thickness, quantize)))
+
+    @staticmethod
+    def create_2d_figure_dict(scan: Scan, thickness: float, threshold_thickness: float,
+                              quantize: bool = False, title: str = "Property Values", colors=None) -> Dict[str, Any]:
+        """Same figure as create_2d_figure, built as a plain dict with arrays pre-encoded for transport.
+
+        title labels the colorbar; colors replaces the Turbo_r scale, e.g. with Turbo where high values are bad.
+        """
+        heatmap = Visualizer._heatmap_trace(scan, thickness, threshold_thickness, quantize, title, colors)
+        return Visualizer._figure_dict([("heatmap", heatmap)])
+
+    @staticmethod
+    def mesh_level(cols: int, max_sagitta: float = MESH_MAX_SAGITTA) -> int:
+        """Deepest merge level whose blocks keep their chord within max_sagitta of the arc."""
+        if cols < 2:
+            return 0
+        column_angle = 2 * np.pi / (cols - 1)
+        max_columns = 2 * np.arccos(1 - max_sagitta) / column_angle
+        return int(np.clip(np.floor(np.log2(max(max_columns, 1))), 0, MESH_MAX_LEVEL))
+
+    @staticmethod
+    def create_3d_mesh_figure_dict(scan: Scan, radius: float, thickness: float, threshold_thickness: float,
+                                   max_sagitta: float = MESH_MAX_SAGITTA) -> Dict[str, Any]:
+        """3D view as a single decimated Mesh3d, for grids too large for the Surface view.
+
+        Areas of one colour zone are merged into larger blocks; measured cells at or below the
+        threshold keep full resolution. Grid lines are left out and exact values come from the
+        hover lookup.
+        """
+        rows, cols = scan.shape
+        grid = scan.grid(fill=np.nan)
+        indices, colorscale, cmin, cmax, tick_positions, ticktext = Visualizer.set_color_indices(
+            grid, threshold_thickness, thickness
+        )
+        with np.errstate(invalid='ignore'):
+            pinned = grid <= threshold_thickness
+
+        vertex_rows, vertex_cols, i, j, k = CylinderMesh.triangulate(
+            indices, pinned, Visualizer.mesh_level(cols, max_sagitta)
+        )
+        theta = np.linspace(0, 2 * np.pi, cols)[vertex_cols]
+        z = np.linspace(0, rows, rows)[vertex_rows]
+
+        mesh = dict(
+            x=radius * np.cos(theta), y=radius * np.sin(theta), z=z,
+            i=i.astype(np.int32), j=j.astype(np.int32), k=k.astype(np.int32),
+            intensity=indices[vertex_rows, vertex_cols],
+            intensitymode='vertex',
+            cmin=cmin, cmax=cmax,
+            colorscale=colorscale,
+            colorbar=dict(title=dict(text="Property Values"), tickvals=tick_positions, ticktext=ticktext, tickmode="array"),
+            flatshading=True,
+            hoverinfo='none'
+        )
+        return Visualizer._figure_dict([("mesh3d", mesh)])
+
+    @staticmethod
+    def _tile_hover_trace(scan: Scan, color_indices, sample_rows: np.ndarray, sample_cols: np.ndarray) -> Dict[str, Any]:
+        """Invisible heatmap over sampled cells that provides hover events and the colorbar for tiles."""
+        indices, colorscale, zmin, zmax, tick_positions, ticktext = color_indices
+        theta = np.linspace(0, 2 * np.pi, scan.cols)
+        z = np.linspace(0, scan.rows, scan.rows)
+        return dict(
+            x=theta[sample_cols], y=z[sample_rows], z=indices[np.ix_(sample_rows, sample_cols)],
+            zmin=zmin, zmax=zmax,
+            colorscale=colorscale,
+            colorbar=dict(title=dict(text="Property Values"), tickvals=tick_positions, ticktext=ticktext, tickmode="array"),
+            opacity=0,
+            hoverinfo='none'
+        )
+
+    @staticmethod
+    def create_2d_tiled_figure_dict(scan: Scan, color_indices, images: List[Dict[str, Any]],
+                                    sample_rows: np.ndarray, sample_cols: np.ndarray, uirevision: str) -> Dict[str, Any]:
+        """2D view drawn from server-rendered PNG tiles, for grids too large to send as a heatmap.
+
+        color_indices is the output of set_color_indices for the whole grid. uirevision keeps the
+        zoom when the tiles are swapped for a new window.
+        """
+        hover = Visualizer._tile_hover_trace(scan, color_indices, sample_rows, sample_cols)
+        fig = Visualizer._figure_dict([("heatmap", hover)])
+        fig["layout"].update(images=images, uirevision=uirevision)
+        return fig
+
+    @staticmethod
+    def patch_tile_window(scan: Scan, color_indices, images: List[Dict[str, Any]],
+                          sample_rows: np.ndarray, sample_cols: np.ndarray, patch: Patch = None) -> Patch:
+        """Build a partial update that swaps in the tiles and hover samples of a new window."""
+        patch = Patch() if patch is None else patch
+        hover = Visualizer._tile_hover_trace(scan, color_indices, sample_rows, sample_cols)
+        for prop in ("x", "y", "z"):
+            patch["data"][0][prop] = Visualizer.typed_array(hover[prop])
+        patch["layout"]["images"] = images
+        return patch
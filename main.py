@@ -1,14 +1,25 @@
 # app.py - Main application file
+import os
+from urllib.parse import parse_qs
 import dash
 from dash import dcc, html, callback, Input, Output, State
+from flask import g
+from components.LogManager import LogManager
 
 # Import page modules
-from pages import home, view, results
+from pages import home, view, results, diagnostics, compare, history
+from components.Profiler import profiler
 
 # Import all callbacks
 from pages.home import register_callbacks as register_home_callbacks
 from pages.view import register_callbacks as register_view_callbacks
+from pages.view import register_routes as register_view_routes
 from pages.results import register_callbacks as register_results_callbacks
+from pages.results import register_routes as register_results_routes
+from pages.compare import register_callbacks as register_compare_callbacks
+from pages.history import register_callbacks as register_history_callbacks
+from pages.diagnostics import register_callbacks as register_diagnostics_callbacks
+from pages.diagnostics import register_routes as register_diagnostics_routes
 
 # Initialize the Dash app
 app = dash.Dash(__name__, 
@@ -17,6 +28,22 @@ app = dash.Dash(__name__,
 
 server = app.server
 
+# Callbacks keep no module-level state, so requests can run on several waitress threads
+SERVER_THREADS = int(os.environ.get("CYLIVIZ_THREADS", "8"))
+
+# Send log records through a background writer and tag them with a request ID
+LogManager.configure()
+
+@server.before_request
+def start_request_log_context():
+    g.log_token = LogManager.start_request()
+
+@server.teardown_request
+def end_request_log_context(exc):
+    token = g.pop("log_token", None)
+    if token is not None:
+        LogManager.end_request(token)
+
 # Define the layout with multiple pages
 app.layout = html.Div([
     # Location component tracks URL
@@ -24,6 +51,8 @@ app.layout = html.Div([
     
     # Store component for data
     dcc.Store(id='data-store', storage_type='session'),
+    # Analysis-relevant subset of data-store; only changes when those fields change
+    dcc.Store(id='analysis-store', storage_type='session'),
     dcc.Store(id='prop-store', storage_type='session'),
     
     # Content will be rendered here
@@ -31,17 +60,29 @@ app.layout = html.Div([
 ])
 
 # Callback to render different page content based on URL
+# Opening /view?profile=1 or /results?profile=1 profiles the next call of that page's main callback
+PROFILE_PAGES = {'/view': 'update_visualization', '/results': 'update_results'}
+
 @callback(
     Output('page-content', 'children'),
-    Input('url', 'pathname')
+    Input('url', 'pathname'),
+    State('url', 'search')
 )
-def display_page(pathname):
+def display_page(pathname, search):
+    if pathname in PROFILE_PAGES and parse_qs((search or '').lstrip('?')).get('profile') == ['1']:
+        profiler.arm(PROFILE_PAGES[pathname])
     if pathname == '/' or pathname == '/home':
         return home.layout
     if pathname == '/view':
         return view.layout
     if pathname == '/results':
         return results.layout    
+    if pathname == '/compare':
+        return compare.layout
+    if pathname == '/diagnostics':
+        return diagnostics.layout
+    if pathname == '/history':
+        return history.layout
 
     return html.Div([
         html.H2('404 - Page not found', className='text-danger'),
@@ -51,7 +92,13 @@ def display_page(pathname):
 # Register callbacks
 register_home_callbacks(app)
 register_view_callbacks(app)
+register_view_routes(server)
 register_results_callbacks(app)
+register_results_routes(server)
+register_compare_callbacks(app)
+register_history_callbacks(app)
+register_diagnostics_callbacks(app)
+register_diagnostics_routes(server)
 
 class StandaloneRunner:
     """Class to run the Dash app standalone with webview."""
@@ -66,7 +113,7 @@ class StandaloneRunner:
         from waitress import serve
 
         def run_server():
-            serve(self.app.server, host="127.0.0.1", port=8080)
+            serve(self.app.server, host="127.0.0.1", port=8080, threads=SERVER_THREADS)
 
         # Start the Dash server in a background thread.
         threading.Thread(target=run_server, daemon=True).start()
@@ -0,0 +1,195 @@
+import dash
+import numpy as np
+import plotly.express as px
+import logging
+from dash import html, dcc, Output, Input, State
+from components.UIComponents import UIComponents
+from components.DataProcessor import DataProcessor
+from components.Visualizer import Visualizer
+from components.Comparison import Comparison
+from components.FileRegistry import file_registry
+from components.AnalysisContext import AnalysisContext
+from components.LogManager import LogManager
+from components.MemoryBudget import MemoryBudgetExceeded, memory_budget
+from pages.view import COLOR_INDEX_MIN_CELLS, FIGURE_BYTES_PER_CELL
+from pages.results import (ResultAnalyzerFixedRange, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED,
+                           build_zone_distribution, modern_style)
+
+logger = logging.getLogger(__name__)
+
+layout = html.Div([
+    html.Div([
+        dcc.Link(html.Button("← Back to Visualization", style=modern_style["back_button"]), href="/view"),
+    ], style={"textAlign": "left"}),
+    html.H3("Compare Inspections", style=modern_style["header"]),
+    html.P("Upload the workbook of a previous inspection of the same vessel. Wall loss is the previous "
+           "thickness minus the current one; the corrosion rate divides it by the years between the "
+           "inspection dates.", style={"textAlign": "center"}),
+
+    dcc.Upload(
+        id="compare-upload",
+        children=UIComponents.create_button("Upload Previous Inspection", "compare-upload-button"),
+        multiple=False,
+        style={"textAlign": "center", "marginBottom": "20px"}
+    ),
+    dcc.Store(id="compare-handle"),
+    html.Div([
+        dcc.Dropdown(id="compare-sheet", placeholder="Select the previous inspection sheet",
+                     style={"width": "400px"}),
+        UIComponents.create_date_picker("Previous inspection date", "compare-date"),
+        html.Div([
+            html.Label("Maximum allowed rate:", style={"fontSize": "12px", "display": "block"}),
+            dcc.Input(id="compare-max-rate", type="number", min=0, debounce=True,
+                      placeholder="highest measured"),
+        ]),
+        # Successive inspections rarely start at the same 0° reference
+        dcc.RadioItems(id="compare-align", value="angular", options=[
+            {"label": "No alignment", "value": ""},
+            {"label": "Align around the circumference", "value": "angular"},
+            {"label": "Align around the circumference and along the axis", "value": "axial"},
+        ]),
+    ], style={"display": "flex", "gap": "20px", "justifyContent": "center", "alignItems": "flex-end",
+              "marginBottom": "20px"}),
+
+    html.Div(id="compare-status", style={"color": "#D32F2F", "textAlign": "center", "margin": "20px 0", "fontWeight": "bold"}),
+    html.Div([
+        dcc.RadioItems(id="compare-map", value="rate", inline=True, options=[
+            {"label": "Corrosion rate", "value": "rate"},
+            {"label": "Wall loss", "value": "loss"},
+        ], style={"textAlign": "center"}),
+        dcc.Graph(id="compare-graph", style={"height": "70vh", "width": "100%"}),
+        html.Div(id="compare-summary", className="p-3", style=modern_style["stats_section"]),
+    ], id="compare-results", style={"display": "none"}),
+], style={"padding": "20px"})
+
+
+# Alignments scoring below this are flagged as unreliable
+LOW_CONFIDENCE = 0.3
+# Rough peak bytes per full-circumference cell of a registration with axial shifts (six padded FFTs)
+REGISTRATION_BYTES_PER_CELL = 400
+
+
+def comparison_summary(loss, rate, years, unit, registration, color_distribution):
+    """Headline numbers of a comparison above the zone distribution of the corrosion rate."""
+    measured = ~np.isnan(loss.measured)
+    count = int(measured.sum())
+    rows = []
+    if registration is not None:
+        rows.append(("Previous inspection shifted by",
+                     f"{registration['angle']:.1f}° ({registration['col_shift']} columns), {registration['row_shift']} rows"))
+        rows.append(("Alignment correlation / confidence",
+                     f"{registration['correlation']:.3f} / {registration['confidence']:.2f}"
+                     + (" - low, check the alignment" if registration['confidence'] < LOW_CONFIDENCE else "")))
+    rows += [
+        ("Years between inspections", f"{years:.2f}"),
+        ("Cells measured in both", f"{count}"),
+        (f"Mean wall loss ({unit})", f"{float(loss.measured[measured].mean()):.3f}"),
+        (f"Largest wall loss ({unit})", f"{float(loss.measured[measured].max()):.3f}"),
+        (f"Largest corrosion rate ({unit}/yr)", f"{float(rate.measured[measured].max()):.3f}"),
+    ]
+    return html.Div([
+        html.Table(html.Tbody([html.Tr([html.Td(label), html.Td(value)]) for label, value in rows]),
+                   className="table table-sm table-borderless"),
+        html.H4(f"Corrosion Rate by Zone ({unit}/yr)", style=modern_style["section_header"]),
+        color_distribution
+    ])
+
+
+def register_callbacks(app):
+    @app.callback(
+        [Output("compare-handle", "data"),
+         Output("compare-upload", "contents"),
+         Output("compare-sheet", "options"),
+         Output("compare-sheet", "value"),
+         Output("compare-status", "children", allow_duplicate=True)],
+        [Input("compare-upload", "contents")],
+        prevent_initial_call=True
+    )
+    def ingest_compare_upload(contents):
+        """Register the previous inspection's workbook and list its sheets."""
+        if not contents:
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+        try:
+            handle = file_registry.register(contents)
+            _, sheet_options = DataProcessor.load_sheet(handle, 0)
+        except MemoryBudgetExceeded as e:
+            return None, None, [], None, f"Server busy: {e}"
+        except Exception as e:
+            logger.exception("Could not read the previous inspection")
+            return None, None, [], None, f"Error: {e}"
+        return handle, None, sheet_options, "0", ""
+
+    @app.callback(
+        [Output("compare-graph", "figure"),
+         Output("compare-summary", "children"),
+         Output("compare-results", "style"),
+         Output("compare-status", "children")],
+        [Input("compare-handle", "data"),
+         Input("compare-sheet", "value"),
+         Input("compare-date", "date"),
+         Input("compare-max-rate", "value"),
+         Input("compare-align", "value"),
+         Input("compare-map", "value")],
+        [State("prop-store", "data"),
+         State("data-store", "data")],
+        prevent_initial_call=True
+    )
+    def update_comparison(handle, sheet_value, previous_date, max_rate, align, map_value, prop_data, info_data):
+        """Wall loss and corrosion rate of the current scan against the previous inspection."""
+        hidden = {"display": "none"}
+        no_result = (dash.no_update, dash.no_update, hidden)
+        current_key = (prop_data or {}).get("grid_key")
+        current = DataProcessor.get_scan(current_key)
+        if not info_data or current is None:
+            return *no_result, "Open the current inspection in the visualization first."
+        if not handle or sheet_value is None:
+            return *no_result, "Upload the previous inspection and select its sheet."
+        if not info_data.get("date_inspection") or not previous_date:
+            return *no_result, "Both inspection dates are needed: set the current one on the input form and the previous one above."
+
+        unit = info_data.get("unit", "mm")
+        with LogManager.scan_context(f"{current_key} vs {handle}/{sheet_value}"):
+            try:
+                years = Comparison.years_between(previous_date, info_data["date_inspection"])
+                previous_key, previous = DataProcessor.load_scan(
+                    handle, int(sheet_value), int(info_data["OD"]), int(info_data["TA"]),
+                    int(info_data["HE"]), int(info_data["TH"])
+                )
+                with memory_budget.reserve(REGISTRATION_BYTES_PER_CELL * current.measured.shape[0] * current.cols if align else 0,
+                                           "Aligning the inspections"):
+                    loss, registration = Comparison.for_scans(previous_key, previous, current_key, current, align or "")
+                rate = Comparison.corrosion_rate(loss, years)
+                if np.isnan(rate.measured).all():
+                    return *no_result, "No cell was measured in both inspections."
+
+                highest = float(np.nanmax(rate.measured))
+                max_rate = float(max_rate) if max_rate else max(highest, 1e-6)
+                quantize = rate.rows * rate.cols >= COLOR_INDEX_MIN_CELLS
+                peak = FIGURE_BYTES_PER_CELL[("2d", "quantized" if quantize else "")] * rate.rows * rate.cols
+                with memory_budget.reserve(peak, "The comparison map"):
+                    # Turbo (not reversed), so heavy loss shows red; no loss and unmeasured cells are grey.
+                    # The loss map tops out at the loss the allowed rate gives over the interval
+                    if map_value == "loss":
+                        figure = Visualizer.create_2d_figure_dict(
+                            loss, max_rate * years, 0.0, quantize=quantize,
+                            title=f"Wall loss ({unit})", colors=px.colors.sequential.Turbo
+                        )
+                    else:
+                        figure = Visualizer.create_2d_figure_dict(
+                            rate, max_rate, 0.0, quantize=quantize,
+                            title=f"Corrosion rate ({unit}/yr)", colors=px.colors.sequential.Turbo
+                        )
+                    # Below Min is no measurable loss and Above Max is faster than allowed
+                    context = AnalysisContext(f"{unit}/yr", 0.0, max_rate, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED)
+                    zone_stats, overall_stats = ResultAnalyzerFixedRange.calculate_statistics(rate.measured, context)
+                color_distribution, _, _ = build_zone_distribution(zone_stats, overall_stats, f"{unit}/yr")
+            except MemoryBudgetExceeded as e:
+                return *no_result, f"Server busy: {e}"
+            except (KeyError, ValueError) as e:
+                return *no_result, f"Error: {e}"
+            except Exception as e:
+                logger.exception("Comparison failed")
+                return *no_result, f"Error: {e}"
+
+        summary = comparison_summary(loss, rate, years, unit, registration, color_distribution)
+        return figure, summary, {"display": "block"}, ""
@@ -0,0 +1,95 @@
+import os
+import time
+import dash
+from dash import html, dcc, Output, Input, callback_context
+from flask import abort, send_from_directory
+from components.Profiler import profiler
+from components.MemoryBudget import memory_budget
+
+PROFILE_FILES = {".svg": "image/svg+xml", ".folded": "text/plain", ".json": "application/json"}
+
+button_style = {
+    "backgroundColor": "#f0f0f0",
+    "border": "1px solid #ccc",
+    "borderRadius": "4px",
+    "padding": "8px 15px",
+    "cursor": "pointer",
+    "fontSize": "14px",
+    "fontWeight": "600",
+    "color": "#333",
+}
+cell_style = {"padding": "6px 12px", "borderBottom": "1px solid #eee", "textAlign": "left"}
+
+layout = html.Div([
+    dcc.Link(html.Button("← Back to Input Form", style=button_style), href="/"),
+    html.H2("Diagnostics", style={"color": "#2E3A59", "textAlign": "center"}),
+    html.Div(id="memory-summary", style={"textAlign": "center", "marginBottom": "20px"}),
+
+    html.H4("Profiling"),
+    html.P("Arm the profiler, then use the app as usual: the next call of the armed callback is sampled "
+           "and saved below. Opening /view?profile=1 or /results?profile=1 does the same."),
+    html.Div([
+        html.Button("Profile next visualization", id="profile-visualization", style=button_style),
+        html.Button("Profile next results analysis", id="profile-results", style=button_style),
+    ], style={"display": "flex", "gap": "20px", "marginBottom": "10px"}),
+    html.Div(id="profile-armed", style={"color": "#D32F2F", "marginBottom": "20px"}),
+    html.Div(id="profile-list"),
+    dcc.Interval(id="diagnostics-refresh", interval=5000)
+], style={"padding": "20px"})
+
+
+def profile_table(summaries):
+    if not summaries:
+        return html.P("No profiles recorded yet.")
+    header = html.Tr([html.Th(title, style=cell_style) for title in
+                      ["Recorded", "Callback", "Duration", "Samples", "Hottest function", "Files"]])
+    rows = []
+    for summary in summaries:
+        link = f"/diagnostics/profiles/{summary['name']}"
+        hottest = summary["top"][0][0] if summary["top"] else "-"
+        rows.append(html.Tr([
+            html.Td(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(summary["started"])), style=cell_style),
+            html.Td(summary["target"], style=cell_style),
+            html.Td(f"{summary['duration'] * 1000:.0f} ms", style=cell_style),
+            html.Td(summary["samples"], style=cell_style),
+            html.Td(hottest, style=cell_style),
+            html.Td([html.A("flame graph", href=f"{link}.svg", target="_blank"), " · ",
+                     html.A("stacks", href=f"{link}.folded", target="_blank"), " · ",
+                     html.A("summary", href=f"{link}.json", target="_blank")], style=cell_style),
+        ]))
+    return html.Table([header] + rows, style={"width": "100%", "borderCollapse": "collapse"})
+
+
+def register_routes(server):
+    @server.route("/diagnostics/profiles/<name>")
+    def serve_profile(name):
+        extension = os.path.splitext(name)[1]
+        if extension not in PROFILE_FILES:
+            abort(404)
+        return send_from_directory(os.path.abspath(profiler.directory), name, mimetype=PROFILE_FILES[extension])
+
+
+def register_callbacks(app):
+    @app.callback(
+        [Output("profile-armed", "children"),
+         Output("profile-list", "children"),
+         Output("memory-summary", "children")],
+        [Input("profile-visualization", "n_clicks"),
+         Input("profile-results", "n_clicks"),
+         Input("diagnostics-refresh", "n_intervals")]
+    )
+    def update_diagnostics(n_visualization, n_results, n_intervals):
+        """Arm the profiler on a button click and refresh the profile list and memory use."""
+        trigger_id = callback_context.triggered_id
+        if trigger_id == "profile-visualization":
+            profiler.arm("update_visualization")
+        elif trigger_id == "profile-results":
+            profiler.arm("update_results")
+
+        armed = profiler.armed()
+        armed_text = f"Armed: {', '.join(armed)}" if armed else ""
+        memory = memory_budget.snapshot()
+        memory_text = (f"Memory budget: {memory['cached'] / 2**20:.0f} MB cached, {memory['reserved'] / 2**20:.0f} MB "
+                       f"reserved by running jobs, of {memory['max_bytes'] / 2**20:.0f} MB "
+                       f"({memory['evictions']} evictions, {memory['rejections']} jobs turned away)")
+        return armed_text, profile_table(profiler.recent()), memory_text
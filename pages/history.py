@@ -0,0 +1,92 @@
+import time
+import logging
+from dash import html, dcc, dash_table, Output, Input
+from components.ScanCatalog import scan_catalog
+
+logger = logging.getLogger(__name__)
+
+# Most scans a search lists; narrow the filters to see older ones
+HISTORY_LIMIT = 500
+
+button_style = {
+    "backgroundColor": "#f0f0f0",
+    "border": "1px solid #ccc",
+    "borderRadius": "4px",
+    "padding": "8px 15px",
+    "cursor": "pointer",
+    "fontSize": "14px",
+    "fontWeight": "600",
+    "color": "#333",
+}
+filter_style = {"display": "flex", "flexDirection": "column", "fontSize": "12px"}
+
+layout = html.Div([
+    dcc.Link(html.Button("← Back to Input Form", style=button_style), href="/"),
+    html.H2("Scan History", style={"color": "#2E3A59", "textAlign": "center"}),
+    html.P("Every scan analyzed on the results page is catalogued here with its statistics, "
+           "so past inspections can be searched without reopening their workbooks.",
+           style={"textAlign": "center"}),
+    html.Div([
+        html.Div([html.Label("Client starts with"),
+                  dcc.Input(id="history-client", type="text", debounce=True)], style=filter_style),
+        html.Div([html.Label("Part or drawing starts with"),
+                  dcc.Input(id="history-part", type="text", debounce=True)], style=filter_style),
+        html.Div([html.Label("Minimum thickness below"),
+                  dcc.Input(id="history-below", type="number", debounce=True)], style=filter_style),
+        html.Div([html.Label("Inspected between"),
+                  dcc.DatePickerRange(id="history-dates", display_format="DD/MM/YYYY", clearable=True)],
+                 style=filter_style),
+    ], style={"display": "flex", "gap": "20px", "justifyContent": "center", "alignItems": "flex-end",
+              "marginBottom": "20px"}),
+    html.Div(id="history-status", style={"textAlign": "center", "marginBottom": "10px"}),
+    dash_table.DataTable(
+        id="history-table",
+        columns=[
+            {"name": "Inspected", "id": "date_inspection"},
+            {"name": "Report No", "id": "report_no"},
+            {"name": "Client", "id": "client_name"},
+            {"name": "Part", "id": "part_name"},
+            {"name": "Drawing", "id": "drawing_number"},
+            {"name": "Unit", "id": "unit"},
+            {"name": "Min", "id": "min_thickness", "type": "numeric", "format": {"specifier": ".2f"}},
+            {"name": "Mean", "id": "mean_thickness", "type": "numeric", "format": {"specifier": ".2f"}},
+            {"name": "Max", "id": "max_thickness", "type": "numeric", "format": {"specifier": ".2f"}},
+            {"name": "Min Threshold", "id": "min_threshold", "type": "numeric", "format": {"specifier": ".2f"}},
+            {"name": "Below Min", "id": "below_min_coverage", "type": "numeric", "format": {"specifier": ".1%"}},
+            {"name": "Cells", "id": "valid_cells", "type": "numeric"},
+        ],
+        sort_action="native",
+        page_size=25,
+        style_table={"overflowX": "auto"},
+        style_cell={"padding": "6px", "textAlign": "left", "fontSize": "13px"},
+        style_header={"fontWeight": "bold", "backgroundColor": "#f0f0f0"},
+        style_data_conditional=[{
+            "if": {"filter_query": "{below_min_coverage} > 0"},
+            "backgroundColor": "#FDECEA"
+        }],
+    ),
+], style={"padding": "20px"})
+
+
+def register_callbacks(app):
+    @app.callback(
+        [Output("history-table", "data"),
+         Output("history-status", "children")],
+        [Input("history-client", "value"),
+         Input("history-part", "value"),
+         Input("history-below", "value"),
+         Input("history-dates", "start_date"),
+         Input("history-dates", "end_date")]
+    )
+    def update_history(client, part, below, since, until):
+        """Catalogued scans matching the filters."""
+        started = time.perf_counter()
+        try:
+            rows = scan_catalog.search(client=(client or "").strip(), part=(part or "").strip(), below=below,
+                                       since=since, until=until, limit=HISTORY_LIMIT)
+        except Exception as e:
+            logger.exception("Scan catalogue search failed")
+            return [], f"Error: {e}"
+        elapsed = (time.perf_counter() - started) * 1000
+        more = " (narrow the filters to see more)" if len(rows) == HISTORY_LIMIT else ""
+        return rows, f"{len(rows)} scans in {elapsed:.0f} ms{more}"
@@ -1,6 +1,8 @@
-from dash import html, Output, Input, callback, dcc, State
+from dash import html, Output, Input, callback, dcc, State, no_update
 from components.UIComponents import UIComponents
 MEASUREMENT_UNIT = "mm"
+# Fields that change the visualization and analysis; edits to the rest never reach analysis-store
+ANALYSIS_FIELDS = ["unit", "OD", "TA", "HE", "TH", "NT", "DT", "TT", "threshold_type"]
 """Create the main application layout."""
 layout = html.Div([
         html.H1(
@@ -139,6 +141,11 @@ layout = html.Div([
                 )
             ],
             style={"textAlign": "center", "marginTop": "20px", "display": "none"}  # Hidden by default
+        ),
+
+        html.Div(
+            dcc.Link("Search past inspections", href="/history", style={"fontSize": "14px"}),
+            style={"textAlign": "center", "marginTop": "15px"}
         )
     ],
         style={
@@ -298,6 +305,7 @@ def register_callbacks(app):
     
     @callback(
     [Output("data-store", "data"), 
+     Output("analysis-store", "data"),
      Output("validation-message", "children"),
      Output("next-button-container", "style", allow_duplicate=True),
      Output("form-status-message", "children", allow_duplicate=True)],
@@ -323,16 +331,19 @@ def register_callbacks(app):
      Input("design-thickness", "value"),
      Input("threshold-thickness", "value"), 
      Input("threshold-type-toggle", "value")],
+    [State("data-store", "data"),
+     State("analysis-store", "data")],
     prevent_initial_call=True)
     def update_store(report_no, client_name, address, date, po_number, date_inspection,
                     make, model, sr_no, calibration_due_date, part_name, material, drawing_number,
                     unit, outer_dia, test_area, height, total_height, nominal_thickness, design_thickness, 
-                    thickness_threshold, threshold_type):
+                    thickness_threshold, threshold_type, stored_data, stored_analysis):
         """Update data store and control Next button visibility based on input validation."""
-        # Default styles - button hidden
-        button_style = {"textAlign": "center", "marginTop": "20px", "display": "none"}
-        status_message = "Please fill in all required fields to proceed"
-        
+        button_style, validation_msg, status_msg = validate_form(
+            report_no, client_name, part_name, outer_dia, test_area, height, total_height,
+            nominal_thickness, design_thickness, thickness_threshold, threshold_type
+        )
+
         # Store all form values in a dictionary (even if some are incomplete)
         all_data = {
             # Company and report info
@@ -367,45 +378,64 @@ def register_callbacks(app):
             "TT": thickness_threshold, 
             "threshold_type": threshold_type
         }
-        
-        # Check if critical fields for visualization are filled
-        critical_fields = [outer_dia, test_area, height, total_height, nominal_thickness, design_thickness, thickness_threshold]
-        if not all(critical_fields):
-            return all_data, "Please fill in all measurement fields", button_style, status_message
-        
-        try:
-            # Validate critical inputs are positive numbers
-            values = [float(x) for x in critical_fields[:-1]]  # Exclude threshold_type
-            if not all(v > 0 for v in values):
-                return all_data, "All measurement values must be positive numbers", button_style, status_message
-            elif float(height) > float(total_height):
-                return all_data, "Total Height must be greater than calculated height", button_style, status_message
+        analysis_data = {field: all_data[field] for field in ANALYSIS_FIELDS}
 
-            if threshold_type in ['nominal', 'design', 'custom']:
-                try:
-                    threshold_value = float(thickness_threshold)
-                    if not 0 <= threshold_value <= 100:
-                        return all_data, "Threshold Percentage must be between 0 and 100", button_style, status_message
-                except ValueError:
-                    return all_data, "Threshold Percentage must be a valid number", button_style, status_message
-            else:  # Should not reach here, but for safety
-                return all_data, "Invalid Threshold Type selected", button_style, status_message
+        # Only write the stores whose contents actually changed, so unchanged stores
+        # do not re-trigger the visualization and results callbacks downstream
+        return (
+            all_data if all_data != stored_data else no_update,
+            analysis_data if analysis_data != stored_analysis else no_update,
+            validation_msg,
+            button_style,
+            status_msg
+        )
 
-            # All validations passed - show the button and update the message
-            button_style = {"textAlign": "center", "marginTop": "20px", "display": "block"}
-            
-            # Additional data validation for completeness (not blocking but informative)
-            missing_fields = []
-            if not report_no: missing_fields.append("Report No")
-            if not client_name: missing_fields.append("Client Name")
-            if not part_name: missing_fields.append("Part Name")
-            
-            if missing_fields:
-                status_msg = f"Note: {', '.join(missing_fields)} not filled. You can still proceed."
-            else:
-                status_msg = "All fields are complete. You can proceed!"
-            
-            return all_data, "", button_style, status_msg
 
-        except ValueError:
-            return all_data, "All measurement inputs must be valid numbers", button_style, status_message
\ No newline at end of file
+def validate_form(report_no, client_name, part_name, outer_dia, test_area, height, total_height,
+                  nominal_thickness, design_thickness, thickness_threshold, threshold_type):
+    """Validate the form and return the Next button style, validation message and status message."""
+    # Default styles - button hidden
+    button_style = {"textAlign": "center", "marginTop": "20px", "display": "none"}
+    status_message = "Please fill in all required fields to proceed"
+    
+    # Check if critical fields for visualization are filled
+    critical_fields = [outer_dia, test_area, height, total_height, nominal_thickness, design_thickness, thickness_threshold]
+    if not all(critical_fields):
+        return button_style, "Please fill in all measurement fields", status_message
+    
+    try:
+        # Validate critical inputs are positive numbers
+        values = [float(x) for x in critical_fields[:-1]]  # Exclude threshold_type
+        if not all(v > 0 for v in values):
+            return button_style, "All measurement values must be positive numbers", status_message
+        elif float(height) > float(total_height):
+            return button_style, "Total Height must be greater than calculated height", status_message
+
+        if threshold_type in ['nominal', 'design', 'custom']:
+            try:
+                threshold_value = float(thickness_threshold)
+                if not 0 <= threshold_value <= 100:
+                    return button_style, "Threshold Percentage must be between 0 and 100", status_message
+            except ValueError:
+                return button_style, "Threshold Percentage must be a valid number", status_message
+        else:  # Should not reach here, but for safety
+            return button_style, "Invalid Threshold Type selected", status_message
+
+        # All validations passed - show the button and update the message
+        button_style = {"textAlign": "center", "marginTop": "20px", "display": "block"}
+        
+        # Additional data validation for completeness (not blocking but informative)
+        missing_fields = []
+        if not report_no: missing_fields.append("Report No")
+        if not client_name: missing_fields.append("Client Name")
+        if not part_name: missing_fields.append("Part Name")
+        
+        if missing_fields:
+            status_msg = f"Note: {', '.join(missing_fields)} not filled. You can still proceed."
+        else:
+            status_msg = "All fields are complete. You can proceed!"
+        
+        return button_style, "", status_msg
+
+    except ValueError:
+        return button_style, "All measurement inputs must be valid numbers", status_message
\ No newline at end of file
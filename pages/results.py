@@ -4,9 +4,29 @@ from dash import dcc, html, callback, Input, Output, State, dash_table
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Any
+from typing import Dict, Iterator, List, Tuple, Any
 import dash_bootstrap_components as dbc
 import colorsys
+import csv
+import io
+import itertools
+import logging
+import os
+import tempfile
+from urllib.parse import urlencode
+from flask import Response, abort, request, stream_with_context
+from openpyxl import Workbook
+from components.LogManager import LogManager
+from components.DataProcessor import DataProcessor
+from components.ThicknessIndex import ThicknessIndex
+from components.AnalysisContext import AnalysisContext
+from components.BandPool import BandPool
+from components.MemoryBudget import MemoryBudgetExceeded, memory_budget
+from components.Profiler import profiler
+from components.Assessment import Assessment
+from components.ScanCatalog import scan_catalog
+
+logger = logging.getLogger(__name__)
 
 # --- Define Fixed Range Zone Structure and Colors ---
 # 4 Zones within Min-Max + Below Min + Above Max
@@ -21,6 +41,10 @@ ZONE_DEFINITIONS_FIXED = [
 ]
 # Ensure the number of colors matches 2 + NUM_MAIN_ZONES
 assert len(ZONE_DEFINITIONS_FIXED) == NUM_MAIN_ZONES + 2
+# Rough peak bytes per measured cell of one analysis (statistics plus the critical areas table)
+ANALYSIS_BYTES_PER_CELL = 400
+# Rough peak bytes per cell of the measured rows (full circumference) of one window assessment
+ASSESSMENT_BYTES_PER_CELL = 80
 
 # Function to lighten hex colors (remains the same)
 def lighten_color(hex_color, factor=0.7):
@@ -55,9 +79,9 @@ modern_style = {
     "table_header": { "backgroundColor": "#e9ecef", "fontWeight": "bold", "textAlign": "left" },
     "color_distribution_bar_container": { "width": "100%", "overflow": "hidden", "marginBottom": "15px", "borderRadius": "8px", "border": "1px solid #ddd", "display": "flex", "height": "35px", "lineHeight": "35px", "fontSize": "14px" },
     "warning_alert": { "display": "none", "marginBottom": "15px", "color": DARK_GRAY, "backgroundColor": WARNING_COLOR, "borderColor": WARNING_COLOR, "borderRadius": "8px", "padding": "10px 15px" },
+    "export_link": { "color": PRIMARY_COLOR, "fontSize": "14px", "fontWeight": "600", "marginLeft": "15px", "textDecoration": "none" },
     "error_alert": { "display": "none", "marginBottom": "15px", "color": "white", "backgroundColor": "#dc3545", "borderColor": "#dc3545", "borderRadius": "8px", "padding": "10px 15px" }, # For critical errors
 }
-unit = "mm"
 # Dynamically add styles for each fixed zone definition
 for zone_def in ZONE_DEFINITIONS_FIXED:
     hex_color = zone_def['color']
@@ -82,7 +106,13 @@ layout = html.Div(
                          html.H3("Results and Analysis", style=modern_style["header"]),
                          html.Div([
                              dcc.Link(html.Button("← Back to Input Form", id="back-button", style=modern_style["back_button"]), href='/'),
-                             dbc.Button("Print Results", id="print-button", style=modern_style["button"]),
+                             html.Div([
+                                 # Streamed from the server, so the files are not limited by what the browser holds
+                                 html.A("Download XLSX", id="export-xlsx", href="", style=modern_style["export_link"]),
+                                 html.A("Critical Areas CSV", id="export-critical-csv", href="", style=modern_style["export_link"]),
+                                 html.A("Zone Summary CSV", id="export-summary-csv", href="", style=modern_style["export_link"]),
+                                 dbc.Button("Print Results", id="print-button", style=modern_style["button"]),
+                             ], style={"display": "flex", "alignItems": "center"}),
                          ], style={"textAlign": "left", "display": "flex", "justify-content": "space-between"}),
                      ]),
                      html.Div([ # Main Content Area
@@ -97,6 +127,10 @@ layout = html.Div(
                              ], className='col-md-6'),
                              html.Div([
                                  html.H3(id='distribution-header', children="Thickness Distribution by Zone", style=modern_style["section_header"]), # Dynamic Header
+                                 # Live Min/Max threshold slider, answered from the cached statistics index
+                                 html.Div(dcc.RangeSlider(id='threshold-slider', min=0, max=1, value=[0, 1], allowCross=False,
+                                                          updatemode='drag', tooltip={'placement': 'bottom'}),
+                                          className="mb-3"),
                                  html.Div(id='color-distribution', className="p-3", style=modern_style["stats_section"])
                              ], className='col-md-6'),
                          ], className='row mb-4'),
@@ -153,6 +187,18 @@ layout = html.Div(
                                  style_table={'overflowX': 'auto'},
                              )
                          ], className='row mt-4'),
+
+                         # Row for the area-averaged (inspection window) assessment
+                         html.Div([
+                             html.H3("Area-Averaged Thickness Assessment", className="text-center mt-4", style=modern_style["section_header"]),
+                             html.Div([
+                                 html.Label("Axial length", className="me-2"),
+                                 dcc.Input(id='assessment-axial-length', type='number', min=0, debounce=True, className="me-4"),
+                                 html.Label("Circumferential length", className="me-2"),
+                                 dcc.Input(id='assessment-circumferential-length', type='number', min=0, debounce=True),
+                             ], className="mb-3", style={"display": "flex", "alignItems": "center", "justifyContent": "center"}),
+                             html.Div(id='assessment-results', className="p-3", style=modern_style["stats_section"])
+                         ], className='row mt-4'),
                      ], className="content"),
                  ], style=modern_style["container"]),
         html.Div(id="dummy-print-output", style={'display': 'none'})
@@ -165,31 +211,18 @@ class ResultAnalyzerFixedRange:
     """Analyzes visualization data using zones defined by a fixed Min-Max range."""
 
     @staticmethod
-    def calculate_fixed_range_zones(
-        property_value: np.ndarray,
-        min_threshold: float,
-        max_threshold: float,
-        num_main_zones: int, # e.g., 4
-        zone_definitions: List[Dict[str, str]] # Should have num_main_zones + 2 entries
-    ) -> Tuple[List[Dict[str, Any]], np.ndarray, List[float]]:
+    def calculate_zone_ranges(context: AnalysisContext) -> Tuple[List[Dict[str, Any]], List[float]]:
         """
-        Calculates masks and details for zones based on a fixed Min-Max range.
-
-        Args:
-            property_value (np.ndarray): Input thickness data array.
-            min_threshold (float): User-specified minimum boundary.
-            max_threshold (float): User-specified maximum boundary.
-            num_main_zones (int): How many zones to create between Min and Max.
-            zone_definitions (List): Defines names and colors for all zones (Below, Main 1..N, Above).
+        Calculates the value range of each zone (Below Min, Main 1..N, Above Max) for the
+        thresholds of the given context, labelled in its unit.
 
         Returns:
-            Tuple: (List of zone dictionaries, valid_mask, list of calculated threshold values in {unit})
-                   Zone dict: 'name', 'color', 'threshold_value_range_str_mm', 'mask'.
-                   Threshold values: Boundaries between the main zones [thresh1, thresh2, ...].
+            Tuple: (List of range dictionaries, list of threshold values between the main zones)
+                   Range dict: 'low', 'high', 'low_inclusive', 'high_inclusive', 'empty',
+                   'threshold_value_range_str_mm'.
         """
-        zones = []
-        valid_mask = property_value != -1
-        global unit
+        min_threshold, max_threshold = context.min_threshold, context.max_threshold
+        num_main_zones, unit = context.num_main_zones, context.unit
         # Calculate threshold values within the main range
         # linspace includes start and end, so need num_main_zones + 1 points for N zones
         try:
@@ -197,20 +230,16 @@ class ResultAnalyzerFixedRange:
             # The thresholds *between* zones are the inner values
             intermediate_thresholds = threshold_values_mm[1:-1].tolist() # [thresh1, thresh2, thresh3] for 4 zones
         except Exception as e:
-             print(f"Error calculating thresholds: {e}")
+             logger.warning("Error calculating thresholds: %s", e)
              # Handle case where linspace fails (e.g., Max=Min) - handled later by validation
              intermediate_thresholds = []
 
-
-        current_zones = []
+        def zone_range(low, high, low_inclusive, high_inclusive, range_str, empty=False):
+            return {'low': low, 'high': high, 'low_inclusive': low_inclusive, 'high_inclusive': high_inclusive,
+                    'empty': empty, 'threshold_value_range_str_mm': range_str}
 
         # 1. Below Min Zone
-        mask_below = (property_value < min_threshold) & valid_mask
-        range_str_below = f"< {min_threshold:.2f} {unit}"
-        current_zones.append({
-            'name': zone_definitions[0]['name'], 'color': zone_definitions[0]['color'],
-            'threshold_value_range_str_mm': range_str_below, 'mask': mask_below
-        })
+        ranges = [zone_range(-np.inf, min_threshold, True, False, f"< {min_threshold:.2f} {unit}")]
 
         # 2. Main Zones (Zone 1 to N)
         last_thresh = min_threshold
@@ -219,39 +248,80 @@ class ResultAnalyzerFixedRange:
             # If intermediate_thresholds is shorter than expected (e.g. Max=Min), this handles it
             if i < len(intermediate_thresholds):
                  current_thresh = intermediate_thresholds[i]
-                 range_str = f"{last_thresh:.2f} {unit} - <= {current_thresh:.2f} {unit}"
-                 mask = (property_value >= last_thresh) & (property_value <= current_thresh) & valid_mask
+                 current = zone_range(last_thresh, current_thresh, True, True,
+                                      f"{last_thresh:.2f} {unit} - <= {current_thresh:.2f} {unit}")
             else: # This handles the *last* main zone, ensuring it goes up to Max
                  current_thresh = max_threshold
                  # If Max == Min, the first zone covers the single value. This handles subsequent zones.
                  if i == 0: # First main zone covers the single point if Max=Min
-                     mask = (property_value >= last_thresh) & (property_value <= current_thresh) & valid_mask
                      range_str = f"== {last_thresh:.2f} {unit}" if last_thresh == current_thresh else f"{last_thresh:.2f} {unit} - <= {current_thresh:.2f} {unit}"
+                     current = zone_range(last_thresh, current_thresh, True, True, range_str)
                  else: # For zones 2,3,4 if Max=Min, their masks should be empty
-                     mask = np.zeros_like(property_value, dtype=bool)
-                     range_str = f"N/A (Range Collapsed)"
+                     current = zone_range(last_thresh, current_thresh, True, True, "N/A (Range Collapsed)", empty=True)
 
-                 # Special mask for the very last main zone to include Max exactly
+                 # Special range for the very last main zone to include Max exactly
                  if i == num_main_zones - 1 and last_thresh != current_thresh:
-                      mask = (property_value > last_thresh) & (property_value <= current_thresh) & valid_mask
-                      range_str = f"> {last_thresh:.2f} {unit} - <= {current_thresh:.2f} {unit}"
-                 elif i == num_main_zones - 1 and last_thresh == current_thresh: # Max=Min case for last zone
-                     pass # Mask already handled by i==0 case above
+                      current = zone_range(last_thresh, current_thresh, False, True,
+                                           f"> {last_thresh:.2f} {unit} - <= {current_thresh:.2f} {unit}")
 
-            current_zones.append({
-                'name': zone_definitions[i+1]['name'], 'color': zone_definitions[i+1]['color'],
-                'threshold_value_range_str_mm': range_str, 'mask': mask
-            })
+            ranges.append(current)
             last_thresh = current_thresh
 
-
         # 3. Above Max Zone
-        mask_above = (property_value > max_threshold) & valid_mask
-        range_str_above = f"> {max_threshold:.2f} {unit}"
-        current_zones.append({
-            'name': zone_definitions[-1]['name'], 'color': zone_definitions[-1]['color'],
-            'threshold_value_range_str_mm': range_str_above, 'mask': mask_above
-        })
+        ranges.append(zone_range(max_threshold, np.inf, False, True, f"> {max_threshold:.2f} {unit}"))
+
+        return ranges, intermediate_thresholds
+
+    @staticmethod
+    def range_mask(values: np.ndarray, zone_range: Dict[str, Any]) -> np.ndarray:
+        """Cells of values (NaN = unmeasured) that fall within a zone range."""
+        if zone_range['empty']:
+            return np.zeros(values.shape, dtype=bool)
+        low, high = zone_range['low'], zone_range['high']
+        with np.errstate(invalid='ignore'):
+            above_low = values >= low if zone_range['low_inclusive'] else values > low
+            below_high = values <= high if zone_range['high_inclusive'] else values < high
+        # Comparisons with NaN are False, so unmeasured cells never fall in a zone
+        return above_low & below_high
+
+    @staticmethod
+    def calculate_fixed_range_zones(
+        property_value: np.ndarray,
+        context: AnalysisContext,
+        workers: int = None
+    ) -> Tuple[List[Dict[str, Any]], np.ndarray, List[float]]:
+        """
+        Calculates masks and details for zones based on a fixed Min-Max range.
+
+        Args:
+            property_value (np.ndarray): Input thickness data array.
+            context (AnalysisContext): Unit, Min/Max thresholds and zone definitions
+                (Below, Main 1..N, Above) of this request.
+            workers (int): Threads for the row bands; defaults to CYLIVIZ_ANALYSIS_WORKERS.
+
+        Returns:
+            Tuple: (List of zone dictionaries, valid_mask, list of calculated threshold values in context.unit)
+                   Zone dict: 'name', 'color', 'threshold_value_range_str_mm', 'mask'.
+                   Threshold values: Boundaries between the main zones [thresh1, thresh2, ...].
+        """
+        zone_ranges, intermediate_thresholds = ResultAnalyzerFixedRange.calculate_zone_ranges(context)
+        valid_mask = np.empty(property_value.shape, dtype=bool)
+        masks = np.empty((len(zone_ranges),) + property_value.shape, dtype=bool)
+
+        # Each band writes only its own rows of the shared masks
+        def fill_band(band_values, band):
+            valid_mask[band] = ~np.isnan(band_values)
+            for k, zone_range in enumerate(zone_ranges):
+                masks[k, band] = ResultAnalyzerFixedRange.range_mask(band_values, zone_range)
+
+        BandPool.map(fill_band, property_value, workers)
+
+        current_zones = []
+        for zone_def, zone_range, mask in zip(context.zone_definitions, zone_ranges, masks):
+            current_zones.append({
+                'name': zone_def['name'], 'color': zone_def['color'],
+                'threshold_value_range_str_mm': zone_range['threshold_value_range_str_mm'], 'mask': mask
+            })
 
         return current_zones, valid_mask, intermediate_thresholds
 
@@ -259,26 +329,33 @@ class ResultAnalyzerFixedRange:
     @staticmethod
     def calculate_statistics(
         property_value: np.ndarray,
-        min_threshold: float,
-        max_threshold: float,
-        num_main_zones: int,
-        zone_definitions: List[Dict[str, str]]
+        context: AnalysisContext,
+        index: ThicknessIndex = None,
+        workers: int = None
     ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
         Calculates coverage, counts, and average thickness for each fixed-range zone, plus overall stats.
-        """
-        zones_data, valid_mask, _ = ResultAnalyzerFixedRange.calculate_fixed_range_zones(
-            property_value, min_threshold, max_threshold, num_main_zones, zone_definitions
-        )
 
-        valid_data = property_value[valid_mask]
-        total_valid_cells = np.sum(valid_mask)
+        With a ThicknessIndex, zone statistics are answered with binary searches, so a cached index
+        makes repeated calls with new thresholds O(log n). Without one, the grid is scanned once in
+        row bands on the thread pool and the per-band counts, sums and moments are merged.
+        """
+        if index is not None:
+            overall_stats = index.overall_stats
+            total_valid = index.size
+        else:
+            zone_ranges, _ = ResultAnalyzerFixedRange.calculate_zone_ranges(context)
+            band_results = BandPool.map(
+                lambda band_values, band: ResultAnalyzerFixedRange._band_statistics(band_values, zone_ranges),
+                property_value, workers
+            )
+            overall_stats = ResultAnalyzerFixedRange._merge_overall_stats(property_value, band_results)
+            total_valid = overall_stats['total_valid_cells']
         zone_stats = []
 
-        if total_valid_cells == 0:
-            overall_stats = {'min': 0, 'max': 0, 'mean': 0, 'median': 0, 'std': 0, 'total_valid_cells': 0}
+        if total_valid == 0:
             # Populate empty stats based on zone_definitions
-            for i, zone_def in enumerate(zone_definitions):
+            for i, zone_def in enumerate(context.zone_definitions):
                  zone_stats.append({
                     'name': zone_def['name'], 'color': zone_def['color'],
                     'threshold_value_range_str_mm': "N/A",
@@ -286,82 +363,395 @@ class ResultAnalyzerFixedRange:
                 })
             return zone_stats, overall_stats
 
-        # Calculate stats for each zone
-        for zone in zones_data:
-            count = np.sum(zone['mask'])
-            coverage = count / total_valid_cells if total_valid_cells > 0 else 0.0
-            zone_values = property_value[zone['mask']]
-            avg_thickness = np.mean(zone_values) if count > 0 else 0.0
+        zone_ranges, _ = ResultAnalyzerFixedRange.calculate_zone_ranges(context)
 
+        # Calculate stats for each zone
+        for k, (zone_def, zone_range) in enumerate(zip(context.zone_definitions, zone_ranges)):
+            if zone_range['empty']:
+                stats = {'count': 0, 'coverage': 0.0, 'avg_thickness': 0.0}
+            elif index is not None:
+                stats = index.range_stats(zone_range['low'], zone_range['high'],
+                                          zone_range['low_inclusive'], zone_range['high_inclusive'])
+            else:
+                count = sum(result['zone_counts'][k] for result in band_results)
+                total = sum(result['zone_sums'][k] for result in band_results)
+                stats = {'count': count, 'coverage': count / total_valid,
+                         'avg_thickness': total / count if count > 0 else 0.0}
             zone_stats.append({
-                'name': zone['name'],
-                'color': zone['color'],
-                'threshold_value_range_str_mm': zone['threshold_value_range_str_mm'],
-                'count': count,
-                'coverage': coverage,
-                'avg_thickness': avg_thickness
+                'name': zone_def['name'],
+                'color': zone_def['color'],
+                'threshold_value_range_str_mm': zone_range['threshold_value_range_str_mm'],
+                **stats
             })
 
-        # Overall statistics (still useful)
-        overall_stats = {
-            'min': np.min(valid_data) if valid_data.size > 0 else 0,
-            'max': np.max(valid_data) if valid_data.size > 0 else 0,
-            'mean': np.mean(valid_data) if valid_data.size > 0 else 0,
-            'median': np.median(valid_data) if valid_data.size > 0 else 0,
-            'std': np.std(valid_data) if valid_data.size > 0 else 0,
-            'total_valid_cells': total_valid_cells
+        return zone_stats, overall_stats
+
+    @staticmethod
+    def _band_statistics(band_values: np.ndarray, zone_ranges: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Zone counts and sums plus count, mean, squared deviations, min and max of one band."""
+        valid = band_values[~np.isnan(band_values)].astype(float)
+        zone_counts, zone_sums = [], []
+        for zone_range in zone_ranges:
+            in_zone = valid[ResultAnalyzerFixedRange.range_mask(valid, zone_range)]
+            zone_counts.append(int(in_zone.size))
+            zone_sums.append(float(in_zone.sum()))
+        mean = float(valid.mean()) if valid.size > 0 else 0.0
+        return {
+            'zone_counts': zone_counts, 'zone_sums': zone_sums,
+            'count': int(valid.size), 'mean': mean,
+            'm2': float(((valid - mean) ** 2).sum()),
+            'min': float(valid.min()) if valid.size > 0 else np.inf,
+            'max': float(valid.max()) if valid.size > 0 else -np.inf
         }
 
-        return zone_stats, overall_stats
+    @staticmethod
+    def _merge_overall_stats(property_value: np.ndarray, band_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Combine per-band moments (Chan et al.'s parallel variance) into the overall statistics."""
+        count, mean, m2 = 0, 0.0, 0.0
+        for result in band_results:
+            if result['count'] == 0:
+                continue
+            combined = count + result['count']
+            delta = result['mean'] - mean
+            mean += delta * result['count'] / combined
+            m2 += result['m2'] + delta ** 2 * count * result['count'] / combined
+            count = combined
+        if count == 0:
+            return {'min': 0, 'max': 0, 'mean': 0, 'median': 0, 'std': 0, 'total_valid_cells': 0}
+        return {
+            'min': min(result['min'] for result in band_results),
+            'max': max(result['max'] for result in band_results),
+            'mean': mean,
+            # The median is the one order statistic; a selection over the valid values is O(n)
+            'median': float(np.nanmedian(property_value)),
+            'std': float(np.sqrt(m2 / count)),
+            'total_valid_cells': count
+        }
 
     @staticmethod
     def find_critical_areas(
         property_value: np.ndarray,
         angle_matrix: np.ndarray,
-        min_threshold: float,
-        max_threshold: float,
-        num_main_zones: int,
-        zone_definitions: List[Dict[str, str]]
+        context: AnalysisContext,
+        row_offset: int = 0,
+        workers: int = None
     ) -> List[Dict[str, Any]]:
         """
         Finds locations Below Min or in Zone 1 (lowest segment within the range).
-        """
-        zones_data, _, _ = ResultAnalyzerFixedRange.calculate_fixed_range_zones(
-            property_value, min_threshold, max_threshold, num_main_zones, zone_definitions
-        )
 
-        if not zones_data or len(zones_data) < 2: # Need at least Below Min and Zone 1 definitions
+        Candidate cells are collected per row band on the thread pool and merged in band order, so
+        the result (row-major, then stably sorted by value) matches a single whole-array pass.
+        row_offset is added to reported rows when property_value is the measured block of a Scan.
+        """
+        zone_ranges, _ = ResultAnalyzerFixedRange.calculate_zone_ranges(context)
+        if len(zone_ranges) < 2: # Need at least Below Min and Zone 1 definitions
             return []
 
-        # Combine masks for "Below Min" and "Zone 1"
-        critical_mask_below = zones_data[0]['mask'] # Below Min mask
-        critical_mask_zone1 = zones_data[1]['mask'] # Zone 1 mask
-        combined_critical_mask = critical_mask_below | critical_mask_zone1
+        def band_candidates(band_values, band):
+            below_mask = ResultAnalyzerFixedRange.range_mask(band_values, zone_ranges[0])
+            critical_mask = below_mask | ResultAnalyzerFixedRange.range_mask(band_values, zone_ranges[1])
+            row_idx, col_idx = np.nonzero(critical_mask)
+            return row_idx + band.start, col_idx, band_values[row_idx, col_idx], below_mask[row_idx, col_idx]
 
-        if not np.any(combined_critical_mask):
+        candidates = BandPool.map(band_candidates, property_value, workers)
+        if not candidates:
             return []
+        row_idx, col_idx, values, is_below = (np.concatenate(parts) for parts in zip(*candidates))
+        if row_idx.size == 0:
+            return []
+
+        # Sort stably by value, so equal values keep their row-major order
+        order = np.argsort(values, kind='stable')
+        below_name = context.zone_definitions[0]['name']
+        zone1_name = context.zone_definitions[1]['name']
 
         critical_areas = []
-        rows, cols = property_value.shape
-        for i in range(rows):
-            for j in range(cols):
-                if combined_critical_mask[i, j]:
-                    # Determine category based on which mask was true
-                    category = zones_data[0]['name'] if critical_mask_below[i, j] else zones_data[1]['name']
-                    critical_areas.append({
-                        "Row": i,
-                        "Column": j,
-                        "Angle": int(angle_matrix[i, j]) if angle_matrix is not None else 'N/A',
-                        "Value": property_value[i, j],
-                        "Category": category
-                    })
-
-        critical_areas.sort(key=lambda x: x["Value"])
+        for i, j, value, below in zip(row_idx[order].tolist(), col_idx[order].tolist(),
+                                      values[order].tolist(), is_below[order].tolist()):
+            critical_areas.append({
+                "Row": i + row_offset,
+                "Column": j,
+                "Angle": int(angle_matrix[i, j]) if angle_matrix is not None else 'N/A',
+                "Value": value,
+                "Category": below_name if below else zone1_name
+            })
         return critical_areas
 
+    @staticmethod
+    def iter_critical_areas(
+        property_value: np.ndarray,
+        context: AnalysisContext,
+        total_cols: int,
+        row_offset: int = 0,
+        band_rows: int = 256
+    ) -> Iterator[Tuple[int, int, int, float, str]]:
+        """
+        Yields (row, column, angle, value, category) for every Below Min / Zone 1 cell in scan order.
+
+        Works through property_value one band of rows at a time, so memory stays bounded by the
+        band size however many cells are critical. Angles spread total_cols over 360 degrees.
+        """
+        angles = np.linspace(0, 360, total_cols, endpoint=False)[:property_value.shape[1]].astype(int)
+        zone_ranges, _ = ResultAnalyzerFixedRange.calculate_zone_ranges(context)
+        below_name = context.zone_definitions[0]['name']
+        zone1_name = context.zone_definitions[1]['name']
+
+        for start in range(0, property_value.shape[0], band_rows):
+            band = property_value[start:start + band_rows]
+            below_mask = ResultAnalyzerFixedRange.range_mask(band, zone_ranges[0])
+            zone1_mask = ResultAnalyzerFixedRange.range_mask(band, zone_ranges[1])
+            row_idx, col_idx = np.nonzero(below_mask | zone1_mask)
+            is_below = below_mask[row_idx, col_idx]
+            values = band[row_idx, col_idx]
+            for i, j, value, below in zip(row_idx.tolist(), col_idx.tolist(), values.tolist(), is_below.tolist()):
+                yield start + i + row_offset, j, int(angles[j]), value, below_name if below else zone1_name
+
+def build_zone_distribution(zone_stats: List[Dict[str, Any]], overall_stats: Dict[str, Any], unit: str) -> Tuple[html.Div, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Build the distribution bar/table and the area summary rows for a set of zone statistics."""
+    dist_bar_segments = []
+    dist_table_rows = []
+    summary_table_data = []
+    summary_table_styles = []
+
+    dist_table_rows.append(html.Thead(html.Tr([
+            html.Th("Zone", style=modern_style["table_header"]),
+            html.Th(f"Thickness Range ({unit})", style=modern_style["table_header"]),
+            html.Th("Coverage", style=modern_style["table_header"]),
+            html.Th("Count", style=modern_style["table_header"])
+        ])))
+
+    dist_table_body_rows = []
+    # Iterate through zone_stats which are in the correct order (Below, 1..N, Above)
+    for zone in zone_stats:
+        color = zone['color']
+        coverage = zone['coverage']
+        safe_key = color.replace('#', '')
+        bar_style_key = f"dist_bar_{safe_key}"
+        row_style_key = f"category_row_{safe_key}"
+
+        if coverage > 0:
+            dist_bar_segments.append(
+                html.Div(
+                    style={**modern_style.get(bar_style_key, {}), "width": f"{coverage * 100:.1f}%"},
+                    children=f"{coverage:.1%}"
+                )
+            )
+
+        dist_table_body_rows.append(html.Tr([
+            html.Td(zone['name'], style=modern_style.get(row_style_key, {})),
+            html.Td(zone['threshold_value_range_str_mm']),
+            html.Td(f"{coverage:.1%}"),
+            html.Td(f"{zone['count']}")
+        ]))
+
+        # Data for area summary table
+        summary_table_data.append({
+            "category": zone['name'],
+            "threshold_value_range": zone['threshold_value_range_str_mm'],
+            "coverage": coverage,
+            "count": zone['count'],
+            "avg_thickness": zone['avg_thickness'],
+        })
+
+        summary_table_styles.append({
+            'if': {'filter_query': f'{{category}} = "{zone["name"]}"'},
+            'style': modern_style.get(row_style_key, {})
+        })
+
+    # Add total row to summary table data
+    summary_table_data.append({
+        "category": "Total Valid", # Changed label slightly
+        "threshold_value_range": "Overall",
+        "coverage": 1.0 if overall_stats['total_valid_cells'] > 0 else 0.0,
+        "count": overall_stats['total_valid_cells'],
+        "avg_thickness": overall_stats['mean'],
+    })
+    summary_table_styles.append({
+         'if': {'filter_query': '{category} = "Total Valid"'},
+         'style': {'fontWeight': 'bold', 'borderTop': f'2px solid {DARK_GRAY}'}
+    })
+
+    color_distribution_component = html.Div([
+        html.Div(dist_bar_segments, style=modern_style["color_distribution_bar_container"]),
+        html.Table(dist_table_rows + [html.Tbody(dist_table_body_rows)], className="table table-sm table-borderless")
+    ])
+
+    return color_distribution_component, summary_table_data, summary_table_styles
+
+
+def build_assessment_table(result: Dict[str, Any], unit: str, axial_length: float, circumferential_length: float) -> html.Table:
+    """Table of the lowest area-averaged thickness and critical thickness profile averages."""
+    header = html.Thead(html.Tr([
+        html.Th("Measure", style=modern_style["table_header"]),
+        html.Th(f"Thickness ({unit})", style=modern_style["table_header"]),
+        html.Th("Location", style=modern_style["table_header"])
+    ]))
+    missing = [html.Td("No window has enough measured cells"), html.Td("-")]
+    area = result.get("area")
+    axial = result.get("axial_profile")
+    circumferential = result.get("circumferential_profile")
+    window = f"{axial_length:g} x {circumferential_length:g} {unit} ({result['window_rows']} x {result['window_cols']} cells)"
+    rows = [
+        html.Tr([html.Td(f"Lowest average over a {window} window")] + (
+            [html.Td(f"{area['average']:.2f}"), html.Td(f"From row {area['row']}, {area['angle']:.1f}°")] if area else missing)),
+        html.Tr([html.Td("Minimum within that window")] + (
+            [html.Td(f"{area['minimum']:.2f}"), html.Td("")] if area else missing)),
+        html.Tr([html.Td(f"Lowest longitudinal profile average over {axial_length:g} {unit}")] + (
+            [html.Td(f"{axial['average']:.2f}"), html.Td(f"From row {axial['row']}")] if axial else missing)),
+        html.Tr([html.Td(f"Lowest circumferential profile average over {circumferential_length:g} {unit}")] + (
+            [html.Td(f"{circumferential['average']:.2f}"), html.Td(f"From {circumferential['angle']:.1f}°")] if circumferential else missing)),
+    ]
+    return html.Table([header, html.Tbody(rows)], className="table table-sm table-borderless")
+
+
+# --- Exports ---
+# Largest number of data rows on one XLSX worksheet (the format allows 1,048,576 including the header)
+XLSX_MAX_ROWS = 1_048_575
+EXPORT_CHUNK_ROWS = 10_000
+
+
+def export_request() -> Tuple[str, Any, AnalysisContext]:
+    """Scan and analysis context named by the query string of an export request."""
+    grid_key = request.args.get("key", "")
+    try:
+        min_val, max_val = float(request.args["min"]), float(request.args["max"])
+    except (KeyError, ValueError):
+        abort(400, "min and max thresholds are required")
+    if max_val <= min_val:
+        abort(400, "max must be greater than min")
+    scan = DataProcessor.get_scan(grid_key)
+    if scan is None:
+        abort(404, "Scan data is no longer available. Please reopen the visualization page.")
+    context = AnalysisContext(request.args.get("unit", "mm"), min_val, max_val, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED)
+    return grid_key, scan, context
+
+
+def zone_summary_rows(grid_key: str, scan, context: AnalysisContext) -> List[List[Any]]:
+    """Header and rows of the zone summary, including the total row."""
+    index = ThicknessIndex.for_scan(grid_key, scan)
+    zone_stats, overall_stats = ResultAnalyzerFixedRange.calculate_statistics(scan.measured, context, index=index)
+    rows = [["Zone Category", f"Thickness Range ({context.unit})", "Coverage (%)", "Cell Count", f"Average Thickness ({context.unit})"]]
+    for zone in zone_stats:
+        rows.append([zone['name'], zone['threshold_value_range_str_mm'], round(zone['coverage'] * 100, 2),
+                     int(zone['count']), round(float(zone['avg_thickness']), 4)])
+    rows.append(["Total Valid", "Overall", 100.0 if overall_stats['total_valid_cells'] > 0 else 0.0,
+                 int(overall_stats['total_valid_cells']), round(float(overall_stats['mean']), 4)])
+    return rows
+
+
+def critical_area_header(context: AnalysisContext) -> List[str]:
+    return ["Row", "Column", "Angle (deg)", f"Thickness ({context.unit})", "Zone Category"]
+
+
+def critical_area_rows(scan, context: AnalysisContext) -> Iterator[Tuple[int, int, int, float, str]]:
+    """Critical cells of a scan in scan order, with thickness rounded past float32 noise."""
+    for row, col, angle, value, category in ResultAnalyzerFixedRange.iter_critical_areas(
+            scan.measured, context, scan.cols, scan.row_offset):
+        yield row, col, angle, round(value, 4), category
+
+
+def iter_csv(rows) -> Iterator[str]:
+    """Encode rows as CSV text, a chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_xlsx(grid_key: str, scan, context: AnalysisContext) -> Iterator[bytes]:
+    """Write the results workbook with openpyxl's write-only mode, then stream the file."""
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet("Zone Summary")
+    for row in zone_summary_rows(grid_key, scan, context):
+        summary.append(row)
+
+    # Write-only sheets flush rows to disk as they are appended; long lists spill onto more sheets
+    sheet, sheet_rows, sheet_count = None, XLSX_MAX_ROWS, 0
+    for row in critical_area_rows(scan, context):
+        if sheet_rows == XLSX_MAX_ROWS:
+            sheet_count += 1
+            sheet = workbook.create_sheet("Critical Areas" if sheet_count == 1 else f"Critical Areas ({sheet_count})")
+            sheet.append(critical_area_header(context))
+            sheet_rows = 0
+        sheet.append(list(row))
+        sheet_rows += 1
+    if sheet is None:
+        workbook.create_sheet("Critical Areas").append(critical_area_header(context))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "results.xlsx")
+        workbook.save(path)
+        with open(path, "rb") as xlsx_file:
+            while True:
+                chunk = xlsx_file.read(64 * 1024)
+                if not chunk:
+                    break
+                yield chunk
+
+
+def attachment(body, mimetype: str, filename: str) -> Response:
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def register_routes(server):
+    @server.route("/export/critical-areas.csv")
+    def export_critical_areas_csv():
+        """All Below Min / Zone 1 cells, streamed from the analyzer in scan order."""
+        grid_key, scan, context = export_request()
+        logger.info("Exporting critical areas CSV for %s (%s)", grid_key, context)
+        rows = itertools.chain(
+            [critical_area_header(context)],
+            critical_area_rows(scan, context)
+        )
+        return attachment(iter_csv(rows), "text/csv", "critical_areas.csv")
+
+    @server.route("/export/zone-summary.csv")
+    def export_zone_summary_csv():
+        grid_key, scan, context = export_request()
+        return attachment(iter_csv(zone_summary_rows(grid_key, scan, context)), "text/csv", "zone_summary.csv")
+
+    @server.route("/export/results.xlsx")
+    def export_results_xlsx():
+        """Zone summary and critical areas as one workbook."""
+        grid_key, scan, context = export_request()
+        logger.info("Exporting results workbook for %s (%s)", grid_key, context)
+        return attachment(iter_xlsx(grid_key, scan, context),
+                          "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "results.xlsx")
+
+
 # --- Callbacks ---
 def register_callbacks(app):
 
+    @app.callback(
+        [Output('export-xlsx', 'href'),
+         Output('export-critical-csv', 'href'),
+         Output('export-summary-csv', 'href')],
+        [Input('threshold-slider', 'value')],
+        [State('prop-store', 'data'),
+         State('data-store', 'data')],
+        prevent_initial_call=True
+    )
+    def update_export_links(slider_value, stored_data, info_data):
+        """Point the download links at the thresholds currently shown."""
+        if not stored_data or not slider_value or not stored_data.get('grid_key'):
+            return "", "", ""
+        query = urlencode({
+            "key": stored_data['grid_key'],
+            "min": slider_value[0],
+            "max": slider_value[1],
+            "unit": (info_data or {}).get("unit", "mm")
+        })
+        return (f"/export/results.xlsx?{query}",
+                f"/export/critical-areas.csv?{query}",
+                f"/export/zone-summary.csv?{query}")
+
     @app.callback(
         [Output('thickness-stats', 'children'),
          Output('color-distribution', 'children'),
@@ -372,12 +762,18 @@ def register_callbacks(app):
          Output('input-error', 'children'),      # Output for input errors
          Output('input-error', 'style'),         # Style for input errors
          Output('general-warning', 'children'),  # Output for general warnings
-         Output('general-warning', 'style')],    # Style for warnings
+         Output('general-warning', 'style'),     # Style for warnings
+         Output('threshold-slider', 'min'),
+         Output('threshold-slider', 'max'),
+         Output('threshold-slider', 'step'),
+         Output('threshold-slider', 'value')],
         [Input('prop-store', 'data'),
-         Input('data-store','data')],
+         Input('analysis-store', 'data')],
+        [State('data-store', 'data')],
         prevent_initial_call=False
     )
-    def update_results(stored_data, info_data):
+    @profiler.profiled("update_results")
+    def update_results(stored_data, analysis_data, info_data):
         # Default empty state
         empty_div = html.Div("No data available")
         no_display = {'display': 'none'}
@@ -385,17 +781,20 @@ def register_callbacks(app):
         default_dist_header = "Thickness Distribution by Zone"
 
         if not stored_data or not info_data:
-            return empty_div, empty_div, default_dist_header, [], [], [], "No data received from previous step.", error_display, "", no_display
+            return empty_div, empty_div, default_dist_header, [], [], [], "No data received from previous step.", error_display, "", no_display, 0, 1, None, [0, 1]
 
         # --- 1. Extract Data ---
-        property_value = np.array(stored_data.get('property_value', []))
+        # The scan stays on the server; the store only carries its key
+        scan = DataProcessor.get_scan(stored_data.get('grid_key'))
+        if scan is None:
+            return empty_div, empty_div, default_dist_header, [], [], [], "Scan data is no longer available. Please reopen the visualization page.", error_display, "", no_display, 0, 1, None, [0, 1]
         nominal_thickness = stored_data.get("T") # Still potentially useful for context
         min_val = stored_data.get("TT") # Get user-defined Min
         max_val = stored_data.get("T") # Get user-defined Max
-        global unit
+        unit = info_data.get("unit", "N/A")
         # --- Input Validation ---
         error_messages = []
-        if property_value.size == 0:
+        if scan.measured.size == 0:
             error_messages.append("Thickness data array is empty.")
         if min_val is None:
             error_messages.append("Minimum threshold (Min) not provided.")
@@ -411,7 +810,7 @@ def register_callbacks(app):
 
         if error_messages:
             error_str = "Input Errors: " + " | ".join(error_messages)
-            return empty_div, empty_div, default_dist_header, [], [], [], error_str, error_display, "", no_display
+            return empty_div, empty_div, default_dist_header, [], [], [], error_str, error_display, "", no_display, 0, 1, None, [0, 1]
 
         # --- Passed Validation ---
         input_error_style = no_display
@@ -433,33 +832,49 @@ def register_callbacks(app):
         part_name = info_data.get("part_name", "N/A")
         material = info_data.get("material", "N/A")
         drawing_number = info_data.get("drawing_number", "N/A")
-        unit = info_data.get("unit", "N/A")
+        # Everything the analysis needs travels with this request, never through module state
+        context = AnalysisContext(unit, min_val, max_val, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED)
+        # Only the measured block is analyzed; the unmeasured expansion region is skipped
+        property_value = scan.measured
         rows, cols = property_value.shape
 
         # --- 2. Perform Analysis using Fixed Range ---
-        try:
-            zone_stats, overall_stats = ResultAnalyzerFixedRange.calculate_statistics(
-                property_value, min_val, max_val, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED
-            )
+        with LogManager.scan_context(stored_data.get("scan_id", "-")):
+            try:
+                with memory_budget.reserve(property_value.size * ANALYSIS_BYTES_PER_CELL, "Analysis of this scan"):
+                    index = ThicknessIndex.for_scan(stored_data['grid_key'], scan)
+                    zone_stats, overall_stats = ResultAnalyzerFixedRange.calculate_statistics(
+                        property_value, context, index=index
+                    )
 
-            # Create angle matrix
-            angle_matrix = None
-            if overall_stats['total_valid_cells'] > 0 and cols > 0:
-                 try:
-                     theta = np.linspace(0, 360, cols, endpoint=False)
-                     z = np.arange(rows)
-                     theta_grid, _ = np.meshgrid(theta, z)
-                     angle_matrix = theta_grid
-                 except Exception as e:
-                     print(f"Error creating angle matrix: {e}")
-
-            critical_areas_data = ResultAnalyzerFixedRange.find_critical_areas(
-                 property_value, angle_matrix, min_val, max_val, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED
-            )
-        except Exception as e:
-             print(f"Error during analysis: {e}")
-             analysis_error_str = f"Analysis Error: {e}"
-             return empty_div, empty_div, default_dist_header, [], [], [], analysis_error_str, error_display, "", no_display
+                    # Create angle matrix (angles are spread over the full circumference)
+                    angle_matrix = None
+                    if overall_stats['total_valid_cells'] > 0 and cols > 0:
+                         try:
+                             theta = np.linspace(0, 360, scan.cols, endpoint=False)[:cols]
+                             z = np.arange(rows)
+                             theta_grid, _ = np.meshgrid(theta, z)
+                             angle_matrix = theta_grid
+                         except Exception as e:
+                             logger.warning("Error creating angle matrix: %s", e)
+
+                    critical_areas_data = ResultAnalyzerFixedRange.find_critical_areas(
+                         property_value, angle_matrix, context,
+                         row_offset=scan.row_offset
+                    )
+            except MemoryBudgetExceeded as e:
+                 logger.warning("Analysis not admitted: %s", e)
+                 return empty_div, empty_div, default_dist_header, [], [], [], f"Server busy: {e}", error_display, "", no_display, 0, 1, None, [0, 1]
+            except Exception as e:
+                 logger.exception("Error during analysis")
+                 analysis_error_str = f"Analysis Error: {e}"
+                 return empty_div, empty_div, default_dist_header, [], [], [], analysis_error_str, error_display, "", no_display, 0, 1, None, [0, 1]
+
+            # The catalogue is a convenience; a failure to record never blocks the results
+            try:
+                scan_catalog.record(stored_data['grid_key'], scan, info_data, overall_stats, zone_stats, min_val, max_val)
+            except Exception:
+                logger.exception("Could not record the scan in the catalogue")
 
         # --- 3. Build UI Components ---
 
@@ -501,73 +916,7 @@ def register_callbacks(app):
         ])
 
         # 3.2 Color Distribution Bar and Table
-        dist_bar_segments = []
-        dist_table_rows = []
-        summary_table_data = []
-        summary_table_styles = []
-
-        dist_table_rows.append(html.Thead(html.Tr([
-                html.Th("Zone", style=modern_style["table_header"]),
-                html.Th("Thickness Range ({unit})", style=modern_style["table_header"]),
-                html.Th("Coverage", style=modern_style["table_header"]),
-                html.Th("Count", style=modern_style["table_header"])
-            ])))
-
-        dist_table_body_rows = []
-        # Iterate through zone_stats which are in the correct order (Below, 1..N, Above)
-        for zone in zone_stats:
-            color = zone['color']
-            coverage = zone['coverage']
-            safe_key = color.replace('#', '')
-            bar_style_key = f"dist_bar_{safe_key}"
-            row_style_key = f"category_row_{safe_key}"
-
-            if coverage > 0:
-                dist_bar_segments.append(
-                    html.Div(
-                        style={**modern_style.get(bar_style_key, {}), "width": f"{coverage * 100:.1f}%"},
-                        children=f"{coverage:.1%}"
-                    )
-                )
-
-            dist_table_body_rows.append(html.Tr([
-                html.Td(zone['name'], style=modern_style.get(row_style_key, {})),
-                html.Td(zone['threshold_value_range_str_mm']),
-                html.Td(f"{coverage:.1%}"),
-                html.Td(f"{zone['count']}")
-            ]))
-
-            # Data for area summary table
-            summary_table_data.append({
-                "category": zone['name'],
-                "threshold_value_range": zone['threshold_value_range_str_mm'],
-                "coverage": coverage,
-                "count": zone['count'],
-                "avg_thickness": zone['avg_thickness'],
-            })
-
-            summary_table_styles.append({
-                'if': {'filter_query': f'{{category}} = "{zone["name"]}"'},
-                'style': modern_style.get(row_style_key, {})
-            })
-
-        # Add total row to summary table data
-        summary_table_data.append({
-            "category": "Total Valid", # Changed label slightly
-            "threshold_value_range": "Overall",
-            "coverage": 1.0 if overall_stats['total_valid_cells'] > 0 else 0.0,
-            "count": overall_stats['total_valid_cells'],
-            "avg_thickness": overall_stats['mean'],
-        })
-        summary_table_styles.append({
-             'if': {'filter_query': '{category} = "Total Valid"'},
-             'style': {'fontWeight': 'bold', 'borderTop': f'2px solid {DARK_GRAY}'}
-        })
-
-        color_distribution_component = html.Div([
-            html.Div(dist_bar_segments, style=modern_style["color_distribution_bar_container"]),
-            html.Table(dist_table_rows + [html.Tbody(dist_table_body_rows)], className="table table-sm table-borderless")
-        ])
+        color_distribution_component, summary_table_data, summary_table_styles = build_zone_distribution(zone_stats, overall_stats, unit)
 
         # 3.3 Warnings (e.g., data outside measured range, if T provided)
         warning_message = ""
@@ -579,6 +928,11 @@ def register_callbacks(app):
 
         warning_style = {**modern_style["warning_alert"], 'display': 'block'} if warning_message else no_display
 
+        # 3.4 Slider spans both the thresholds and the measured data
+        slider_min = float(min(min_val, overall_stats['min']))
+        slider_max = float(max(max_val, overall_stats['max']))
+        slider_settings = (slider_min, slider_max, (slider_max - slider_min) / 200 or None, [min_val, max_val])
+
         # --- 4. Return Components ---
         return (
             thickness_stats_component,
@@ -590,8 +944,69 @@ def register_callbacks(app):
             input_error_msg,    # Empty if no errors
             input_error_style,  # no_display if no errors
             warning_message,
-            warning_style
+            warning_style,
+            *slider_settings
         )
+
+    @app.callback(
+        [Output('color-distribution', 'children', allow_duplicate=True),
+         Output('distribution-header', 'children', allow_duplicate=True),
+         Output('area-summary-table', 'data', allow_duplicate=True),
+         Output('area-summary-table', 'style_data_conditional', allow_duplicate=True)],
+        [Input('threshold-slider', 'value')],
+        [State('prop-store', 'data'),
+         State('data-store', 'data')],
+        prevent_initial_call=True
+    )
+    def update_zone_distribution(slider_value, stored_data, info_data):
+        """Recompute zone statistics for the slider thresholds using the cached index only."""
+        if not stored_data or not slider_value:
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+
+        scan = DataProcessor.get_scan(stored_data.get('grid_key'))
+        min_val, max_val = slider_value
+        if scan is None or max_val <= min_val:
+            return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+
+        unit = (info_data or {}).get("unit", "N/A")
+        context = AnalysisContext(unit, min_val, max_val, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED)
+        index = ThicknessIndex.for_scan(stored_data['grid_key'], scan)
+        zone_stats, overall_stats = ResultAnalyzerFixedRange.calculate_statistics(
+            scan.measured, context, index=index
+        )
+        color_distribution_component, summary_table_data, summary_table_styles = build_zone_distribution(zone_stats, overall_stats, unit)
+        distribution_header = f"Distribution within {min_val:.2f}{unit} - {max_val:.2f}{unit} Range"
+        return color_distribution_component, distribution_header, summary_table_data, summary_table_styles
+
+    @app.callback(
+        Output('assessment-results', 'children'),
+        [Input('assessment-axial-length', 'value'),
+         Input('assessment-circumferential-length', 'value'),
+         Input('prop-store', 'data')],
+        [State('data-store', 'data')]
+    )
+    def update_assessment(axial_length, circumferential_length, stored_data, info_data):
+        """Lowest area-averaged thickness over windows of the entered axial and circumferential lengths."""
+        if not axial_length or not circumferential_length or axial_length <= 0 or circumferential_length <= 0:
+            return "Enter the axial and circumferential lengths of the assessment window."
+        scan = DataProcessor.get_scan((stored_data or {}).get('grid_key'))
+        if scan is None or not info_data:
+            return "No data available"
+        unit = info_data.get("unit", "mm")
+        try:
+            # The expanded grid spans Total Height along the axis and the full circumference
+            axial_pitch = float(info_data["TH"]) / scan.rows
+            circumferential_pitch = np.pi * float(info_data["OD"]) / scan.cols
+            with LogManager.scan_context(stored_data.get("scan_id", "-")):
+                with memory_budget.reserve(scan.measured.shape[0] * scan.cols * ASSESSMENT_BYTES_PER_CELL, "The window assessment"):
+                    result = Assessment.assess(scan, axial_length, circumferential_length, axial_pitch, circumferential_pitch)
+        except MemoryBudgetExceeded as e:
+            return f"Server busy: {e}"
+        except (KeyError, ValueError, TypeError) as e:
+            logger.warning("Assessment failed: %s", e)
+            return f"Assessment Error: {e}"
+        return build_assessment_table(result, unit, axial_length, circumferential_length)
+
     app.clientside_callback(
         """
         function(n_clicks) {
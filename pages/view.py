@@ -1,11 +1,45 @@
+import dash
 import plotly.graph_objects as go
 import numpy as np
-from dash import html, Output, Input, callback, dcc, callback_context, State
+from dash import html, Output, Input, callback, dcc, callback_context, State, Patch
 from components.UIComponents import UIComponents
 from components.DataProcessor import DataProcessor
 from components.Visualizer import Visualizer
 from components.Mapper import Mapper
+import gzip
 import time
+import logging
+from components.LogManager import LogManager
+from components.FileRegistry import file_registry
+from components.TileRenderer import TileRenderer
+from components.FigureCache import FigureCache, figure_cache
+from components.MemoryBudget import MemoryBudgetExceeded, memory_budget
+from components.Profiler import profiler
+from components.RegionIndex import RegionIndex
+from components.ScanCache import scan_cache
+from components.AnalysisContext import AnalysisContext
+from pages.results import ResultAnalyzerFixedRange, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED
+from flask import Response, abort, request
+
+logger = logging.getLogger(__name__)
+
+# Grids with at least this many cells are sent as uint8 palette indices, with values looked up on hover
+COLOR_INDEX_MIN_CELLS = 250_000
+# Grids with at least this many cells use the decimated Mesh3d engine for the 3D view
+MESH_3D_MIN_CELLS = 1_000_000
+# Grids with at least this many cells draw the 2D view from server-rendered PNG tiles
+TILE_MIN_CELLS = 4_000_000
+# Rough peak bytes per grid cell while a figure is built and compressed, reserved from the memory budget
+FIGURE_BYTES_PER_CELL = {
+    ("2d", ""): 300, ("2d", "quantized"): 16, ("2d", "tiled"): 16,
+    ("3d", ""): 600, ("3d", "quantized"): 400, ("3d", "mesh"): 250
+}
+# Seconds the browser may reuse a fetched figure before revalidating it by ETag
+FIGURE_MAX_AGE = 86400
+# Rough peak bytes per grid cell while the threshold colours of a figure are computed
+COLOR_LAYER_BYTES_PER_CELL = 16
+# Rough peak bytes per measured cell while the region index or its zone tables are built
+REGION_BYTES_PER_CELL = 64
 
 
 layout = html.Div([
@@ -48,6 +82,24 @@ layout = html.Div([
                     }
                 ),
                 href=f'/results',
+            ),
+            dcc.Link(
+                html.Button(
+                'Compare Inspections',
+                id="compare-button",
+                style={
+                        "backgroundColor": "#f0f0f0",
+                        "border": "1px solid #ccc",
+                        "borderRadius": "4px",
+                        "padding": "8px 15px",
+                        "cursor": "pointer",
+                        "fontSize": "14px",
+                        "fontWeight": "600",
+                        "color": "#333",
+                        "marginLeft": "10px",
+                    }
+                ),
+                href='/compare',
             )
         ],id="results-button-container",  style={ "display": "none"}),
     ], style={
@@ -64,6 +116,16 @@ layout = html.Div([
         multiple=False,
         style={"margin-bottom": "20px", "text-align": "center", "marginTop": "20px"}
     ),
+    # Short server-side handle of the uploaded file; the workbook itself is only sent once
+    dcc.Store(id="upload-handle"),
+    # Tiny page state used to toggle visibility without sending the figure back to the server
+    dcc.Store(id="view-state"),
+    # URLs of the cached figures for the current scan, keyed by view type, and the selected view
+    dcc.Store(id="figure-store"),
+    dcc.Store(id="view-mode", data="2d"),
+    dcc.Store(id="figure-request"),
+    # Visible axis ranges of a tiled 2D view
+    dcc.Store(id="tile-window"),
     
     # Select Excel - Hidden until file is uploaded
     html.Div([
@@ -76,6 +138,17 @@ layout = html.Div([
                 "margin": "auto",
                 "borderRadius": "8px"
             }
+        ),
+        # Tall vessels keep one shell course per sheet; two or more selected here are shown as one cylinder
+        dcc.Dropdown(
+            id='course-dropdown',
+            multi=True,
+            placeholder="Stitch shell courses (select sheets bottom course first)",
+            style={
+                "width": "400px",
+                "margin": "10px auto 0",
+                "borderRadius": "8px"
+            }
         )
     ], id="dropdown-container", style={"display": "none", "marginBottom": "20px"}),
 
@@ -115,8 +188,14 @@ layout = html.Div([
     html.Div([
         dcc.Graph(
             id="graph",
+            # Heatmaps get no selection tools by default; box select drives the region statistics
+            config={"modeBarButtonsToAdd": ["select2d"]},
             style={"height": "70vh", "width": "100%", "backgroundColor": "#FFFFFF"}
-        )
+        ),
+        # Exact value under the cursor, for figures sent without hover text
+        html.Div(id="hover-value", style={"textAlign": "center", "minHeight": "20px"}),
+        # Statistics of the area box-selected on the 2D view
+        html.Div(id="region-stats", style={"textAlign": "center", "minHeight": "20px"})
     ], id="graph-container", style={"display": "none", "flex": "1"}),
     
     # Results button - Hidden until visualization is shown
@@ -129,152 +208,476 @@ layout = html.Div([
 ], style={'minHeight': '100vh', 'width': '100%', 'display': 'flex', 'flexDirection': 'column'})
 
 
+def tiled_2d_figure(grid_key, scan, thickness, threshold_thickness, x_range=None, y_range=None):
+    """Tiled 2D figure showing the given axis ranges, or the whole grid."""
+    thickness, threshold_thickness = float(thickness), float(threshold_thickness)
+    color_indices = TileRenderer.color_indices(grid_key, scan, thickness, threshold_thickness)
+    images = TileRenderer.layout_images(grid_key, scan, thickness, threshold_thickness, x_range, y_range)
+    sample_rows, sample_cols = TileRenderer.hover_samples(scan, x_range, y_range)
+    return Visualizer.create_2d_tiled_figure_dict(scan, color_indices, images, sample_rows, sample_cols, grid_key)
+
+
+def build_figure(view_type, variant, grid_key, scan, radius, thickness, threshold_thickness):
+    """Build the figure dict for a view with the engine named by variant."""
+    if view_type == '3d' and variant == "mesh":
+        return Visualizer.create_3d_mesh_figure_dict(scan, radius, thickness, threshold_thickness)
+    if view_type == '3d':
+        return Visualizer.create_3d_figure_dict(
+            scan, radius, thickness, threshold_thickness, quantize=variant == "quantized"
+        )
+    if variant == "tiled":
+        return tiled_2d_figure(grid_key, scan, thickness, threshold_thickness)
+    return Visualizer.create_2d_figure_dict(scan, thickness, threshold_thickness, quantize=variant == "quantized")
+
+
+def register_routes(server):
+    @server.route("/figures/<figure_id>.json")
+    def serve_figure(figure_id):
+        """Cached figure JSON, compressed as the client accepts and kept by the browser."""
+        encoded = figure_cache.get(figure_id)
+        if encoded is None:
+            abort(404)
+        if request.if_none_match.contains(encoded["etag"]):
+            response = Response(status=304)
+        elif encoded["br"] is not None and "br" in request.accept_encodings:
+            response = Response(encoded["br"], mimetype="application/json")
+            response.headers["Content-Encoding"] = "br"
+        elif "gzip" in request.accept_encodings:
+            response = Response(encoded["gzip"], mimetype="application/json")
+            response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = Response(gzip.decompress(encoded["gzip"]), mimetype="application/json")
+        response.set_etag(encoded["etag"])
+        response.headers["Vary"] = "Accept-Encoding"
+        # The ID names the scan, view and thresholds, so the browser reuses its copy without asking;
+        # the ETag revalidates it once it expires
+        response.headers["Cache-Control"] = f"private, max-age={FIGURE_MAX_AGE}"
+        return response
+
+    @server.route("/tiles/<int:level>/<int:tile_x>/<int:tile_y>.png")
+    def serve_tile(level, tile_x, tile_y):
+        """PNG tile of the colour-mapped 2D grid, rendered from the cached scan on first request."""
+        grid_key = request.args.get("key", "")
+        try:
+            thickness, threshold_thickness = float(request.args["t"]), float(request.args["tt"])
+        except (KeyError, ValueError):
+            abort(400)
+        png = TileRenderer.tile_png(
+            grid_key, DataProcessor.get_scan(grid_key), thickness, threshold_thickness, level, tile_x, tile_y
+        )
+        if png is None:
+            abort(404)
+        response = Response(png, mimetype="image/png")
+        # The URL names the scan, thresholds and tile, so its content never changes
+        response.headers["Cache-Control"] = "public, max-age=86400"
+        return response
+
+
 def register_callbacks(app):
-    # Create callback for managing component visibility
     @app.callback(
+        [Output("upload-handle", "data"),
+         Output("upload-data", "contents"),
+         Output("status-message", "children", allow_duplicate=True)],
+        [Input("upload-data", "contents")],
+        prevent_initial_call=True
+    )
+    def ingest_upload(contents):
+        """Register the uploaded file on the server and clear it from the browser."""
+        if not contents:
+            return dash.no_update, dash.no_update, dash.no_update
+        try:
+            return file_registry.register(contents), None, dash.no_update
+        except MemoryBudgetExceeded as e:
+            logger.warning("Upload rejected: %s", e)
+            return None, None, f"Server busy: {e}"
+
+    # Visibility only depends on small values, so it is resolved in the browser
+    app.clientside_callback(
+        """
+        function(handle, sheet_value, view_state) {
+            var dropdown_style = {"display": "none", "marginBottom": "20px"};
+            var buttons_style = {"display": "none", "justifyContent": "center", "gap": "20px"};
+            var graph_style = {"display": "none", "flex": "1"};
+            var results_style = {"textAlign": "center", "display": "none"};
+            var instructions_style = {"display": "block"};
+
+            // If file is uploaded, show dropdown
+            if (handle) {
+                dropdown_style["display"] = "block";
+                instructions_style = {"display": "none"};
+
+                // If sheet is selected, show the view buttons, and the graph once one is rendered
+                if (sheet_value !== null && sheet_value !== undefined) {
+                    buttons_style["display"] = "flex";
+                    if (view_state && view_state.has_figure) {
+                        graph_style["display"] = "block";
+                        results_style["display"] = "block";
+                    }
+                }
+            }
+            return [dropdown_style, buttons_style, graph_style, results_style, instructions_style];
+        }
+        """,
         [Output("dropdown-container", "style"),
          Output("view-buttons-container", "style"),
          Output("graph-container", "style"),
          Output("results-button-container", "style"),
          Output("instructions-container", "style")],
-        [Input("upload-data", "contents"),
+        [Input("upload-handle", "data"),
          Input("dropdown", "value"),
-         Input("graph", "figure")]
+         Input("view-state", "data")]
+    )
+
+    app.clientside_callback(
+        """
+        function(options) {
+            return options || [];
+        }
+        """,
+        Output("course-dropdown", "options"),
+        Input("dropdown", "options")
+    )
+
+    # Toggle views in the browser; only ask the server for a view that was never built
+    app.clientside_callback(
+        """
+        function(n_clicks_2d, n_clicks_3d, figures) {
+            var triggered = dash_clientside.callback_context.triggered;
+            var view_type = (triggered.length && triggered[0].prop_id === "btn-3d.n_clicks") ? "3d" : "2d";
+            var request = (figures && figures[view_type]) ? dash_clientside.no_update : {"view": view_type, "requested": Date.now()};
+            return [view_type, request];
+        }
+        """,
+        [Output("view-mode", "data"),
+         Output("figure-request", "data")],
+        [Input("btn-2d", "n_clicks"),
+         Input("btn-3d", "n_clicks")],
+        [State("figure-store", "data")],
+        prevent_initial_call=True
+    )
+
+    app.clientside_callback(
+        """
+        async function(view_type, figures) {
+            view_type = view_type || "2d";
+            var no_update = dash_clientside.no_update;
+            if (!figures || !figures[view_type]) {
+                return [no_update, no_update, no_update];
+            }
+            // Figures already fetched come from the browser cache, so toggling views needs no round trip
+            var entry = figures[view_type];
+            var responses = await Promise.all([entry].concat(entry.colors ? [entry.colors] : []).map(function(part) {
+                return fetch(part.url);
+            }));
+            if (responses.some(function(response) { return response.status === 404; })) {
+                // The server no longer holds this figure; ask for it to be built again
+                return [no_update, "Rebuilding " + view_type.toUpperCase() + " visualization...", {"view": view_type, "requested": Date.now()}];
+            }
+            if (!responses.every(function(response) { return response.ok; })) {
+                return [no_update, "Error: could not load the figure.", no_update];
+            }
+            var parts = await Promise.all(responses.map(function(response) { return response.json(); }));
+            var figure = parts[0];
+            if (parts.length > 1) {
+                // The figure is shared by all thresholds; their colours are merged over its cell trace
+                var trace = figure.data[0], colors = parts[1];
+                Object.keys(colors).forEach(function(key) {
+                    trace[key] = key === "colorbar" ? Object.assign({}, trace.colorbar, colors.colorbar) : colors[key];
+                });
+            }
+            return [figure, "Displaying " + view_type.toUpperCase() + " visualization. You can now view detailed results.", no_update];
+        }
+        """,
+        [Output("graph", "figure"),
+         Output("status-message", "children", allow_duplicate=True),
+         Output("figure-request", "data", allow_duplicate=True)],
+        [Input("view-mode", "data"),
+         Input("figure-store", "data")],
+        prevent_initial_call=True
     )
-    def manage_component_visibility(contents, sheet_value, figure):
-        """Control visibility of components based on user actions"""
-        # Default states - all visualization components hidden
-        dropdown_style = {"display": "none", "marginBottom": "20px"}
-        buttons_style = {"display": "none", "justifyContent": "center", "gap": "20px"}
-        graph_style = {"display": "none", "flex": "1"}
-        results_style = {"textAlign": "center","display": "none"}
-        instructions_style = {"display": "block"}
-        
-        # If file is uploaded, show dropdown
-        if contents:
-            dropdown_style["display"] = "block"
-            instructions_style = {"display": "none"}
-            
-            # If sheet is selected (not the default "Select Excel" option)
-            if sheet_value != None:
-                buttons_style["display"] = "flex"
-                
-                # Check if figure data exists (initial empty figure has 0 or 1 traces)
-                try:
-                    if len(figure.get('data', [])) > 0:
-                        graph_style["display"] = "block"
-                        results_style["display"] = "block"
-                except:
-                    pass
-        
-        return dropdown_style, buttons_style, graph_style, results_style, instructions_style
 
     @app.callback(
         [Output('dropdown', 'options'),
-         Output("graph", "figure"),
+         Output("figure-store", "data"),
          Output("status-message", "children"),
-         Output("prop-store", "data")],
-        [Input("upload-data", "contents"),
-         Input("btn-2d", "n_clicks"),
-         Input("btn-3d", "n_clicks"),
+         Output("prop-store", "data"),
+         Output("view-state", "data")],
+        [Input("upload-handle", "data"),
          Input('dropdown', 'value'),
-         Input("data-store", "data")],
+         Input("analysis-store", "data"),
+         Input("figure-request", "data"),
+         Input("course-dropdown", "value")],
+        [State("view-mode", "data"),
+         State("view-state", "data")],
         prevent_initial_call=True
     )
-    def update_visualization(contents, n_clicks_2d, n_clicks_3d, sheet_value, data):
-        """Update visualization based on user inputs and uploaded data."""
+    @profiler.profiled("update_visualization")
+    def update_visualization(handle, sheet_value, data, figure_request, course_values, view_mode, view_state):
+        """Build the figure for the selected view, or patch the figures the browser already holds."""
         ctx = callback_context
         trigger_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
-        
-        # Initialize with empty figure
-        empty_figure = go.Figure()
-        empty_figure.update_layout(
-            title="No data to display",
-            xaxis=dict(title="X"),
-            yaxis=dict(title="Y"),
-            template="plotly_white"
-        )
+        no_figure = {"has_figure": False}
         
         # Check for input form data
         if not data:
-            return [], empty_figure, "Please go back and fill the input form first.", {}
+            return [], {}, "Please go back and fill the input form first.", {}, no_figure
             
         # Check if file is uploaded
-        if not contents:
-            return [], empty_figure, "Please upload an Excel file.", {}
+        if not handle:
+            return [], {}, "Please upload an Excel file.", {}, no_figure
             
-        try:
-            # Get parameters from input form
-            outer_dia = data["OD"]
-            test_area = data["TA"]
-            height = data["HE"]
-            total_height = data["TH"]
-            nominal_thickness = int(data["NT"])
-            design_thickness = int(data["DT"])
-            thickness_threshold = int(data["TT"])
-            threshold_type = str(data["threshold_type"])
-
-
-            # If just uploaded or sheet changed, process the Excel file
-            if trigger_id in ["upload-data", "dropdown"]:
-                if sheet_value is None:
-                    df, sheet_options = DataProcessor.process_excel_data(contents, 0)
-                    return sheet_options, empty_figure, "Select a sheet to continue.", {}
+        # Two or more courses replace the single selected sheet
+        courses = [int(value) for value in course_values or []]
+        stitched = len(courses) > 1
+        scan_id = f"{handle}/{'+'.join(map(str, courses))}" if stitched else f"{handle}/{sheet_value}"
+        with LogManager.scan_context(scan_id):
+            try:
+                # Get parameters from input form
+                outer_dia = data["OD"]
+                test_area = data["TA"]
+                height = data["HE"]
+                total_height = data["TH"]
+                nominal_thickness = int(data["NT"])
+                design_thickness = int(data["DT"])
+                thickness_threshold = int(data["TT"])
+                threshold_type = str(data["threshold_type"])
+
+
+                if stitched:
+                    # The sheet list is already in the dropdown; the courses are read without caching each sheet
+                    sheet_options = dash.no_update
+                    grid_key, scan = DataProcessor.load_courses(
+                        handle, courses, int(outer_dia), int(test_area), int(height), int(total_height)
+                    )
                 else:
-                    df, sheet_options = DataProcessor.process_excel_data(contents, int(sheet_value))
-            else:
-                # For visualization type changes, reuse the sheet value
-                sheet_value = "0" if sheet_value is None else sheet_value
-                df, sheet_options = DataProcessor.process_excel_data(contents, int(sheet_value))
-            
-            if threshold_type != None:
-                print(threshold_type)
-                if threshold_type == "nominal":
-                    thickness = nominal_thickness
-                elif threshold_type == "design":
-                    thickness = design_thickness
+                    # If just uploaded or sheet changed, process the Excel file
+                    if trigger_id in ["upload-handle", "dropdown"]:
+                        if sheet_value is None:
+                            df, sheet_options = DataProcessor.load_sheet(handle, 0)
+                            return sheet_options, {}, "Select a sheet to continue.", {}, no_figure
+                    else:
+                        # For visualization type changes, reuse the sheet value
+                        sheet_value = "0" if sheet_value is None else sheet_value
+                    # Parsing and expansion are cached by file hash, sheet and geometry
+                    df, sheet_options = DataProcessor.load_sheet(handle, int(sheet_value))
+                    # Process data for visualization
+                    grid_key, scan = DataProcessor.load_scan(
+                        handle,
+                        int(sheet_value),
+                        int(outer_dia),
+                        int(test_area),
+                        int(height),
+                        int(total_height)
+                    )
+
+                if threshold_type != None:
+                    logger.debug("Threshold type: %s", threshold_type)
+                    if threshold_type == "nominal":
+                        thickness = nominal_thickness
+                    elif threshold_type == "design":
+                        thickness = design_thickness
+                    else:
+                        thickness = scan.max_value if stitched else np.max(df)
+                radius = int(outer_dia) // 2
+                quantize = scan.rows * scan.cols >= COLOR_INDEX_MIN_CELLS
+                use_mesh = scan.rows * scan.cols >= MESH_3D_MIN_CELLS
+                tiled = scan.rows * scan.cols >= TILE_MIN_CELLS
+
+                # A figure request names the missing view; otherwise build the selected one
+                if trigger_id == "figure-request" and figure_request:
+                    view_type = figure_request["view"]
                 else:
-                    thickness = np.max(df) 
-            # Process data for visualization
-            expanded_df = DataProcessor.expand_data(
-                df,
-                int(outer_dia),
-                int(test_area),
-                int(height),
-                int(total_height)
-            )
+                    view_type = view_mode or '2d'
 
-            property_value = expanded_df.to_numpy()[::-1]
-            rows, cols = property_value.shape
-            radius = int(outer_dia) // 2
-    
-            # Determine view type based on button click
-            if trigger_id == "btn-3d" or (not trigger_id and n_clicks_3d):
-                view_type = '3d'
-            else:
-                view_type = '2d'  # Default to 2D view
-
-            # Create visualization
-            if view_type == '3d':
-                fig = Visualizer.create_3d_figure(
-                    property_value, radius, rows, cols, 
-                    thickness, thickness_threshold
-                )
-            else:
-                fig = Visualizer.create_2d_figure(
-                    df.to_numpy(), property_value, rows, cols, 
-                    thickness, thickness_threshold
-                )
+                custom_colorscale, zmin, zmax, tickvals, ticktext, max_data_value = Visualizer.set_color_ranges(scan.measured, thickness_threshold, thickness, percent_gap=25)
+                prop_store = {
+                    "grid_key": grid_key,
+                    "scan_id": scan_id,
+                    "T": thickness,  
+                    "TT": thickness_threshold,
+                    "map":Mapper.mapper(custom_colorscale,tickvals)
+                }
+                success_message = f"Displaying {view_type.upper()} visualization. You can now view detailed results."
+                # Figures of the other view can be kept only for the same scan and thresholds
+                thresholds = [float(thickness), float(thickness_threshold)]
+                same_scan = bool(view_state) and view_state.get("key") == grid_key and view_state.get("thresholds") == thresholds
+                built_views = view_state.get("views", []) if same_scan else []
 
-            success_message = f"Displaying {view_type.upper()} visualization. You can now view detailed results."
-            custom_colorscale, zmin, zmax, tickvals, ticktext, max_data_value = Visualizer.set_color_ranges(property_value, thickness_threshold, thickness, percent_gap=25)
-            return sheet_options, fig, success_message, {
-                "property_value": property_value, 
-                "T": thickness,  
-                "TT": thickness_threshold,
-                "map":Mapper.mapper(custom_colorscale,tickvals)
-            }
+                # Figures are built and compressed once per scan and view; the browser fetches them by
+                # URL and keeps its copy
+                if view_type == '3d':
+                    variant = "mesh" if use_mesh else ("quantized" if quantize else "")
+                else:
+                    variant = "tiled" if tiled else ("quantized" if quantize else "")
+                # Mesh blocks follow the colour zones and tile URLs carry the thresholds, so those
+                # figures are built per threshold; the others only change colour and are recoloured
+                recolour = variant not in ("mesh", "tiled")
+                figure_id = FigureCache.figure_id(grid_key, view_type, variant, None if recolour else thresholds)
+                def build():
+                    peak = FIGURE_BYTES_PER_CELL[(view_type, variant)] * scan.rows * scan.cols
+                    with memory_budget.reserve(peak, f"The {view_type.upper()} view of this scan"):
+                        return build_figure(view_type, variant, grid_key, scan, radius, thickness, thickness_threshold)
+
+                encoded = figure_cache.get_or_build(figure_id, build)
+                fig = {"url": f"/figures/{figure_id}.json", "etag": encoded["etag"]}
+                if recolour:
+                    colors_id = FigureCache.figure_id(grid_key, view_type, f"{variant}+colors", thresholds)
+                    def build_colors():
+                        with memory_budget.reserve(COLOR_LAYER_BYTES_PER_CELL * scan.rows * scan.cols, "The colours of this scan"):
+                            return Visualizer.color_layer(view_type, scan, thickness, thickness_threshold, quantize=variant == "quantized")
+                    colors = figure_cache.get_or_build(colors_id, build_colors)
+                    fig["colors"] = {"url": f"/figures/{colors_id}.json", "etag": colors["etag"]}
+
+                # Keep the other view when it belongs to the same scan, otherwise start over
+                if same_scan and trigger_id == "figure-request":
+                    figures = Patch()
+                    figures[view_type] = fig
+                    views = sorted(set(built_views) | {view_type})
+                else:
+                    figures = {view_type: fig}
+                    views = [view_type]
+
+                return sheet_options, figures, success_message, prop_store, {"has_figure": True, "key": grid_key, "thresholds": thresholds, "views": views, "tiled": tiled}
             
-        except Exception as e:
-            print(str(e), thickness)
-            return [], empty_figure, f"Error: {str(e)}", {}
\ No newline at end of file
+            except MemoryBudgetExceeded as e:
+                logger.warning("Visualization not admitted (sheet=%s): %s", sheet_value, e)
+                return dash.no_update, dash.no_update, f"Server busy: {e}", dash.no_update, dash.no_update
+            except Exception as e:
+                logger.exception("Visualization failed (trigger=%s, sheet=%s)", trigger_id, sheet_value)
+                return [], {}, f"Error: {str(e)}", {}, no_figure
+
+    @app.callback(
+        [Output("graph", "figure", allow_duplicate=True),
+         Output("tile-window", "data")],
+        [Input("graph", "relayoutData"),
+         Input("prop-store", "data")],
+        [State("tile-window", "data"),
+         State("view-mode", "data"),
+         State("view-state", "data")],
+        prevent_initial_call=True
+    )
+    def update_tiles(relayout_data, prop_data, window, view_mode, view_state):
+        """Swap in the tiles and hover samples for the part of a tiled 2D view that is visible."""
+        if (view_mode or '2d') != '2d' or not view_state or not view_state.get("tiled") or not prop_data:
+            return dash.no_update, dash.no_update
+        grid_key = prop_data.get("grid_key")
+        scan = DataProcessor.get_scan(grid_key)
+        if scan is None:
+            return dash.no_update, dash.no_update
+
+        # relayoutData only holds what the last zoom or pan changed, so keep the window across events
+        window = dict(window) if window and window.get("key") == grid_key else {"key": grid_key}
+        changed = False
+        for axis in ("xaxis", "yaxis"):
+            relayout = relayout_data or {}
+            if relayout.get(f"{axis}.autorange") or relayout.get("autosize"):
+                window[axis] = None
+                changed = True
+            elif f"{axis}.range[0]" in relayout:
+                window[axis] = [relayout[f"{axis}.range[0]"], relayout[f"{axis}.range[1]"]]
+                changed = True
+        if callback_context.triggered_id == "graph" and not changed:
+            return dash.no_update, dash.no_update
+
+        thickness, threshold_thickness = float(prop_data["T"]), float(prop_data["TT"])
+        x_range, y_range = window.get("xaxis"), window.get("yaxis")
+        color_indices = TileRenderer.color_indices(grid_key, scan, thickness, threshold_thickness)
+        images = TileRenderer.layout_images(grid_key, scan, thickness, threshold_thickness, x_range, y_range)
+        sample_rows, sample_cols = TileRenderer.hover_samples(scan, x_range, y_range)
+        logger.debug("Showing %d tiles for window %s", len(images), window)
+        return Visualizer.patch_tile_window(scan, color_indices, images, sample_rows, sample_cols), window
+
+    @app.callback(
+        Output("hover-value", "children"),
+        [Input("graph", "hoverData"),
+         Input("graph", "clickData")],
+        [State("prop-store", "data"),
+         State("view-mode", "data")],
+        prevent_initial_call=True
+    )
+    def show_hover_value(hover_data, click_data, prop_data, view_mode):
+        """Look up the exact thickness under the cursor, or at the clicked point, on the server."""
+        if callback_context.triggered_id and "clickData" in callback_context.triggered[0]["prop_id"]:
+            hover_data = click_data
+        if not hover_data or not prop_data:
+            return ""
+        scan = DataProcessor.get_scan(prop_data.get("grid_key"))
+        if scan is None:
+            return ""
+
+        point = hover_data["points"][0]
+        if view_mode == '3d':
+            theta, height = np.arctan2(point["y"], point["x"]), point["z"]
+        else:
+            theta, height = point["x"], point["y"]
+        row, col = scan.cell_at(theta, height)
+        value = scan.value_at(row, col)
+        angle = col * scan.degrees_per_col
+        value_text = "Not Measured" if np.isnan(value) else f"{value:.2f}"
+        course = scan.course_at(row)
+        course_text = f", Course: {course}" if course else ""
+        return f"Angle: {angle // 1} Row: {row}, Column: {col}, Value: {value_text}{course_text}"
+
+    @app.callback(
+        Output("region-stats", "children"),
+        [Input("graph", "selectedData")],
+        [State("prop-store", "data"),
+         State("analysis-store", "data"),
+         State("view-mode", "data")],
+        prevent_initial_call=True
+    )
+    def show_region_stats(selected_data, prop_data, analysis_data, view_mode):
+        """Minimum, mean and zone coverage of the box selected on the 2D view, from the region index."""
+        if not selected_data or "range" not in selected_data or not prop_data or view_mode == '3d':
+            return ""
+        grid_key = prop_data.get("grid_key")
+        scan = DataProcessor.get_scan(grid_key)
+        if scan is None:
+            return ""
+        # Same zones as the results page: Min is the threshold thickness and Max the reference thickness
+        min_val, max_val = prop_data.get("TT"), prop_data.get("T")
+        unit = (analysis_data or {}).get("unit", "")
+
+        with LogManager.scan_context(prop_data.get("scan_id", "-")):
+            def reserved(build, label):
+                # Tables are built on the first selection only; later ones are lookups
+                def run():
+                    with memory_budget.reserve(REGION_BYTES_PER_CELL * scan.measured.size, label):
+                        return build()
+                return run
+
+            try:
+                index = scan_cache.get_or_compute(
+                    ("region", grid_key), reserved(lambda: RegionIndex(scan.measured), "Indexing this scan")
+                )
+                zone_tables = None
+                if min_val is not None and max_val is not None and max_val > min_val:
+                    context = AnalysisContext(unit, min_val, max_val, NUM_MAIN_ZONES, ZONE_DEFINITIONS_FIXED)
+                    zone_tables = scan_cache.get_or_compute(
+                        ("region-zones", grid_key, float(min_val), float(max_val)),
+                        reserved(lambda: index.zone_tables(
+                            zone["mask"] for zone in ResultAnalyzerFixedRange.calculate_fixed_range_zones(scan.measured, context)[0]
+                        ), "Indexing the zones of this scan")
+                    )
+                row0, row1, col0, col1 = RegionIndex.selection_cells(scan, selected_data["range"]["x"], selected_data["range"]["y"])
+                stats = index.stats(scan, row0, row1, col0, col1, zone_tables)
+            except MemoryBudgetExceeded as e:
+                return f"Server busy: {e}"
+            except Exception as e:
+                logger.exception("Region statistics failed")
+                return f"Error: {e}"
+
+        # Same angle step as the figures and the hover; columns past either end wrap around
+        start_angle, end_angle = (col0 % scan.cols) * scan.degrees_per_col, ((col1 - 1) % scan.cols) * scan.degrees_per_col
+        where = f"Rows {row0}-{row1 - 1}, {start_angle:.1f}° to {end_angle:.1f}°"
+        if col0 < 0 or col1 > scan.cols:
+            where += " (wraps past 360°)"
+        if stats["measured"] == 0:
+            return f"{where}: no measured cells."
+        parts = [where, f"Measured {stats['measured']} of {stats['cells']} cells",
+                 f"Min {stats['min']:.2f} {unit}", f"Mean {stats['mean']:.2f} {unit}"]
+        for k, (zone_def, count) in enumerate(zip(ZONE_DEFINITIONS_FIXED, stats["zone_counts"])):
+            # Below Min is always shown, the other zones only when present
+            if count or k == 0:
+                parts.append(f"{zone_def['name']} {100 * count / stats['measured']:.1f}%")
+        return " | ".join(parts)
@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# The app records scans in its catalogue and writes logs, tiles and profiles; keep the tests' output
+# out of the real directories. Set before any test imports main.
+SCRATCH_DIR = tempfile.mkdtemp(prefix="cyliviz-tests-")
+for name, directory in (("CYLIVIZ_CATALOG_DIR", "catalog"), ("CYLIVIZ_LOG_DIR", "logs"),
+                        ("CYLIVIZ_TILE_DIR", "tiles"), ("CYLIVIZ_PROFILE_DIR", "profiles")):
+    os.environ[name] = os.path.join(SCRATCH_DIR, directory)
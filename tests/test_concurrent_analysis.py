@@ -0,0 +1,7 @@
+from benchmarks.stress_concurrent_analysis import stress
+
+
+def test_concurrent_sessions_never_mix():
+    # Scaled down from the benchmark; each request has its own unit and thresholds
+    failures, _ = stress(workers=8, requests=48)
+    assert failures == []
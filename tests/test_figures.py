@@ -0,0 +1,10 @@
+import pytest
+from benchmarks.bench_figures import FIGURE_PATHS, serialized, synthetic_scan
+
+
+@pytest.mark.parametrize("case", sorted(FIGURE_PATHS))
+def test_dict_figure_matches_graph_objects(case):
+    # The dict path must render exactly like go.Figure once both are serialized
+    build_go, build_dict = FIGURE_PATHS[case]
+    scan = synthetic_scan(30, 40)
+    assert serialized(build_dict(scan)) == serialized(build_go(scan))